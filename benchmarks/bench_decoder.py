@@ -0,0 +1,57 @@
+"""Compare the specialized decoders in ocsf.repository.decoder with dacite.
+
+Usage:
+    python benchmarks/bench_decoder.py [REPO_PATH] [-n ROUNDS]
+"""
+
+import argparse
+import json
+import timeit
+import dacite
+
+from pathlib import Path
+from typing import Any
+
+from ocsf.schema import keys_to_names
+from ocsf.repository import AnyDefinition, decode, path_defn_t
+
+
+def load(root: Path) -> list[tuple[type[AnyDefinition], str]]:
+    files: list[tuple[type[AnyDefinition], str]] = []
+    for path in sorted(root.rglob("*.json")):
+        try:
+            kind = path_defn_t(path.relative_to(root))
+        except ValueError:
+            continue
+        with open(path) as file:
+            files.append((kind, file.read()))
+    return files
+
+
+def with_dacite(files: list[tuple[type[AnyDefinition], str]]) -> list[Any]:
+    return [dacite.from_dict(kind, keys_to_names(json.loads(raw))) for kind, raw in files]
+
+
+def with_decoder(files: list[tuple[type[AnyDefinition], str]]) -> list[Any]:
+    return [decode(kind, json.loads(raw)) for kind, raw in files]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", nargs="?", default="tests/ocsf-schema")
+    parser.add_argument("-n", "--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    files = load(Path(args.path))
+    assert with_dacite(files) == with_decoder(files), "Decoder output doesn't match dacite"
+
+    baseline = min(timeit.repeat(lambda: with_dacite(files), number=1, repeat=args.rounds))
+    decoder = min(timeit.repeat(lambda: with_decoder(files), number=1, repeat=args.rounds))
+
+    print(f"files:   {len(files)}")
+    print(f"dacite:  {baseline * 1000:8.2f} ms")
+    print(f"decoder: {decoder * 1000:8.2f} ms ({baseline / decoder:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Compare merge() with cached field tables against looking up type hints on
+every call.
+
+The merges are those DictionaryOp makes: each attribute of each object, event,
+include and profile with its entry in dictionary.json. The uncached variant
+reproduces the previous behavior, where merge() (and each of its recursive
+calls for enum members and the like) called get_type_hints().
+
+With --copies, also count what merge() deep copies during a full compile: the
+number of deepcopy() calls and the number of objects they copy.
+
+Usage:
+    python benchmarks/bench_merge.py [REPO_PATH] [-n ROUNDS] [--copies]
+"""
+
+import argparse
+import copy
+import timeit
+
+from typing import Any, Callable, Optional
+
+import ocsf.compile.merge as merge_module
+
+from ocsf.repository import read_repo, AttrDefn, DefnWithAttrs, DictionaryDefn, Repository, SpecialFiles
+from ocsf.compile.compiler import Compilation
+from ocsf.compile.merge import merge
+from ocsf.compile.protoschema import clone
+
+
+def load(repo: Repository) -> list[tuple[AttrDefn, AttrDefn]]:
+    dictionary = repo[SpecialFiles.DICTIONARY.value].data
+    assert isinstance(dictionary, DictionaryDefn) and dictionary.attributes is not None
+
+    pairs: list[tuple[AttrDefn, AttrDefn]] = []
+    for file in repo.files():
+        if isinstance(file.data, DefnWithAttrs) and file.data.attributes is not None:
+            for name, attr in file.data.attributes.items():
+                right = dictionary.attributes.get(name)
+                if isinstance(attr, AttrDefn) and isinstance(right, AttrDefn):
+                    pairs.append((attr, right))
+    return pairs
+
+
+def run(pairs: list[tuple[AttrDefn, AttrDefn]], rounds: int) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        # merge() modifies its left side, so start from fresh copies each time
+        lefts = [clone(left) for left, _ in pairs]
+        elapsed = timeit.timeit(lambda: [merge(left, right) for left, (_, right) in zip(lefts, pairs)], number=1)
+        best = min(best, elapsed)
+    return best
+
+
+def count_copies(repo: Repository) -> tuple[int, int]:
+    calls = 0
+    objects = 0
+
+    def deepcopy(value: Any, memo: Optional[dict[int, Any]] = None) -> Any:
+        nonlocal calls, objects
+        memo = {} if memo is None else memo
+        calls += 1
+        result = copy.deepcopy(value, memo)
+        # deepcopy() adds one entry per copied object, plus a list of the
+        # originals it keeps alive
+        objects += max(len(memo) - 1, 0)
+        return result
+
+    merge_module.deepcopy = deepcopy
+    try:
+        Compilation(repo).build()
+    finally:
+        merge_module.deepcopy = copy.deepcopy
+    return calls, objects
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", nargs="?", default="tests/ocsf-schema")
+    parser.add_argument("-n", "--rounds", type=int, default=10)
+    parser.add_argument("--copies", action="store_true", help="count deep copies made by merge() in a full compile")
+    args = parser.parse_args()
+
+    repo = read_repo(args.path)
+    pairs = load(repo)
+
+    cached = run(pairs, args.rounds)
+
+    fields: Callable[..., merge_module._FieldTable] = merge_module._fields
+    merge_module._fields = merge_module._build_table
+    try:
+        uncached = run(pairs, args.rounds)
+    finally:
+        merge_module._fields = fields
+
+    print(f"merges:   {len(pairs)}")
+    print(f"uncached: {uncached * 1000:8.2f} ms")
+    print(f"cached:   {cached * 1000:8.2f} ms ({uncached / cached:.1f}x)")
+
+    if args.copies:
+        calls, objects = count_copies(repo)
+        print(f"deepcopy calls: {calls} (full compile)")
+        print(f"objects copied: {objects} (full compile)")
+
+
+if __name__ == "__main__":
+    main()
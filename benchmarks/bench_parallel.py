@@ -0,0 +1,53 @@
+"""Compare applying a compilation plan serially and with worker processes.
+
+Only Compilation.compile() (applying the plan) is timed; reading the
+repository and analyzing and ordering operations are the same for every run.
+Speedup depends on the number of CPUs available and the size of the
+repository: on small repositories the cost of forking workers and copying
+modified files back can outweigh the gain.
+
+Usage:
+    python benchmarks/bench_parallel.py [REPO_PATH] [--jobs 1 2 4] [--repeat 3]
+"""
+
+import argparse
+import os
+import time
+
+from ocsf.repository import read_repo
+from ocsf.compile.compiler import Compilation
+
+
+def measure(path: str, jobs: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        compilation = Compilation(read_repo(path), jobs=jobs)
+        compilation.order()
+
+        start = time.perf_counter()
+        compilation.compile()
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", nargs="?", default="tests/ocsf-schema")
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"CPUs: {os.cpu_count()}")
+    print(f"{'jobs':>5} {'time (ms)':>10} {'speedup':>8}")
+
+    serial = None
+    for jobs in args.jobs:
+        elapsed = measure(args.path, jobs, args.repeat)
+        if serial is None:
+            serial = elapsed
+        print(f"{jobs:>5} {elapsed * 1000:>10.1f} {serial / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
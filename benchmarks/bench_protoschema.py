@@ -0,0 +1,72 @@
+"""Compare copy-on-write ProtoSchema with eagerly deep-copying every file.
+
+The eager variant reproduces the previous behavior, where any access to a file
+in the ProtoSchema (including reads during analysis) deep-copied it out of the
+repository.
+
+Usage:
+    python benchmarks/bench_protoschema.py [REPO_PATH]
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from copy import deepcopy
+from typing import Callable
+
+import ocsf.compile.compiler as compiler
+
+from ocsf.repository import read_repo, DefinitionFile, RepoPath
+from ocsf.compile.compiler import Compilation
+from ocsf.compile.protoschema import ProtoSchema
+
+
+class EagerProtoSchema(ProtoSchema):
+    def __getitem__(self, path: RepoPath) -> DefinitionFile:
+        if path not in self._files:
+            if path in self.repo:
+                self._files[path] = deepcopy(self.repo[path])
+            else:
+                raise KeyError(f"File {path} not found in repository")
+        return self._files[path]
+
+    def read(self, path: RepoPath, journal: bool = True) -> DefinitionFile:
+        return self[path]
+
+
+def measure(path: str, stage: Callable[[Compilation], object]) -> tuple[float, int]:
+    repo = read_repo(path)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    stage(Compilation(repo))
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", nargs="?", default="tests/ocsf-schema")
+    args = parser.parse_args()
+
+    stages: dict[str, Callable[[Compilation], object]] = {
+        "analyze": lambda c: c.analyze(),
+        "build": lambda c: c.build(),
+    }
+
+    print(f"{'stage':<10} {'variant':<15} {'time (ms)':>10} {'peak (KiB)':>12}")
+    for name, stage in stages.items():
+        for variant, proto in (("eager deepcopy", EagerProtoSchema), ("copy-on-write", ProtoSchema)):
+            compiler.ProtoSchema = proto
+            elapsed, peak = measure(args.path, stage)
+            print(f"{name:<10} {variant:<15} {elapsed * 1000:>10.1f} {peak / 1024:>12.0f}")
+
+    compiler.ProtoSchema = ProtoSchema
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""Time each stage of compiling a repository and compare against a baseline.
+
+Cases:
+    read_repo         read_repo() of the repository
+    analyze           Compilation.analyze()
+    order             Compilation.order(), after analyze()
+    compile           Compilation.compile(), after order()
+    build             Compilation.build() from scratch
+    merge_attributes  merge() of each attribute with its dictionary entry
+    merge_extends     merge() of each object and event with its base
+    merge_overwrite   merge(overwrite=True) of each object and event with its base
+
+Each case is run --repeat times and the fastest time is kept. Results can be
+written as JSON with --output and compared against earlier results with
+--baseline: any case more than --tolerance slower than its baseline is
+reported as a regression, and the exit status is 1.
+
+With --scale, a synthetic repository (see ocsf.repository.synthetic) that
+many times the size of the bundled schema is generated and used instead of
+REPO_PATH.
+
+Timings are only comparable on the same machine and Python version, so
+baselines aren't checked in; save one before making a change.
+
+Usage:
+    python benchmarks/bench_suite.py [REPO_PATH] [--scale 10] [--repeat 5] [--cases build merge_extends]
+        [--output results.json] [--baseline baseline.json] [--tolerance 0.2]
+"""
+
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+
+from typing import Any, Callable
+
+from ocsf.repository import read_repo, Repository, AttrDefn, DefnWithAttrs, DictionaryDefn, SpecialFiles
+from ocsf.repository.synthetic import SyntheticOptions, write_repo
+from ocsf.compile.compiler import Compilation
+from ocsf.compile.merge import merge
+from ocsf.compile.planners.extends import ExtendsOp
+from ocsf.compile.protoschema import clone
+
+_FORMAT_VERSION = 1
+
+# (path, repository) -> untimed setup, which returns the function to time
+Case = Callable[[str, Repository], Callable[[], Callable[[], Any]]]
+
+
+def _analyzed(repo: Repository) -> Compilation:
+    compilation = Compilation(repo)
+    compilation.analyze()
+    return compilation
+
+
+def _ordered(repo: Repository) -> Compilation:
+    compilation = _analyzed(repo)
+    compilation.order()
+    return compilation
+
+
+def _attribute_pairs(repo: Repository) -> list[tuple[AttrDefn, AttrDefn]]:
+    dictionary = repo[SpecialFiles.DICTIONARY.value].data
+    assert isinstance(dictionary, DictionaryDefn) and dictionary.attributes is not None
+
+    pairs: list[tuple[AttrDefn, AttrDefn]] = []
+    for file in repo.files():
+        if isinstance(file.data, DefnWithAttrs) and file.data.attributes is not None:
+            for name, attr in file.data.attributes.items():
+                right = dictionary.attributes.get(name)
+                if isinstance(attr, AttrDefn) and isinstance(right, AttrDefn):
+                    pairs.append((attr, right))
+    return pairs
+
+
+def _base_pairs(repo: Repository) -> list[tuple[Any, Any]]:
+    pairs: list[tuple[Any, Any]] = []
+    for phase in Compilation(repo).analyze():
+        for ops in phase.values():
+            for op in ops:
+                if isinstance(op, ExtendsOp) and op.prerequisite is not None:
+                    pairs.append((repo[op.target].data, repo[op.prerequisite].data))
+    return pairs
+
+
+def _merges(pairs: list[tuple[Any, Any]], **kwargs: Any) -> Callable[[], Callable[[], Any]]:
+    def setup() -> Callable[[], Any]:
+        # Merge into fresh copies each time, as merge() modifies its left side
+        lefts = [clone(left) for left, _ in pairs]
+
+        def run() -> None:
+            for left, (_, right) in zip(lefts, pairs):
+                merge(left, right, **kwargs)
+
+        return run
+
+    return setup
+
+
+CASES: dict[str, Case] = {
+    "read_repo": lambda path, repo: lambda: lambda: read_repo(path),
+    "analyze": lambda path, repo: lambda: Compilation(repo).analyze,
+    "order": lambda path, repo: lambda: _analyzed(repo).order,
+    "compile": lambda path, repo: lambda: _ordered(repo).compile,
+    "build": lambda path, repo: lambda: Compilation(repo).build,
+    "merge_attributes": lambda path, repo: _merges(_attribute_pairs(repo)),
+    "merge_extends": lambda path, repo: _merges(_base_pairs(repo)),
+    "merge_overwrite": lambda path, repo: _merges(_base_pairs(repo), overwrite=True),
+}
+
+
+def measure(setup: Callable[[], Callable[[], Any]], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        run = setup()
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def compare(results: dict[str, float], baseline: dict[str, float], tolerance: float) -> list[str]:
+    """Print results next to the baseline, and return the cases that are more
+    than tolerance (a fraction) slower than it."""
+    regressions: list[str] = []
+
+    print(f"{'case':<18} {'time (ms)':>10} {'baseline':>10} {'change':>8}")
+    for case, elapsed in results.items():
+        if case not in baseline:
+            print(f"{case:<18} {elapsed * 1000:>10.2f} {'-':>10} {'-':>8}")
+            continue
+
+        change = elapsed / baseline[case] - 1
+        flag = ""
+        if change > tolerance:
+            regressions.append(case)
+            flag = "  REGRESSION"
+        print(f"{case:<18} {elapsed * 1000:>10.2f} {baseline[case] * 1000:>10.2f} {change:>+7.1%}{flag}")
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", nargs="?", default="tests/ocsf-schema")
+    parser.add_argument("--scale", type=float, help="benchmark a synthetic repository this many times the usual size")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare the results with this JSON file from --output")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown, as a fraction (default 0.2)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as synthetic:
+        path = args.path
+        if args.scale is not None:
+            path = synthetic
+            write_repo(path, SyntheticOptions().scaled(args.scale))
+
+        repo = read_repo(path)
+        results = {case: measure(CASES[case](path, repo), args.repeat) for case in args.cases}
+
+    if args.output is not None:
+        with open(args.output, "w") as file:
+            json.dump(
+                {
+                    "version": _FORMAT_VERSION,
+                    "python": platform.python_version(),
+                    "repo": args.path if args.scale is None else f"synthetic x{args.scale:g}",
+                    "repeat": args.repeat,
+                    "results": results,
+                },
+                file,
+                indent=2,
+            )
+
+    baseline: dict[str, float] = {}
+    if args.baseline is not None:
+        with open(args.baseline) as file:
+            saved = json.load(file)
+        if saved.get("version") != _FORMAT_VERSION:
+            raise ValueError(f"Unsupported baseline format in {args.baseline}")
+        baseline = saved["results"]
+
+    regressions = compare(results, baseline, args.tolerance)
+    if len(regressions) > 0:
+        print(
+            f"\n{len(regressions)} case(s) slower than the baseline by more than {args.tolerance:.0%}: "
+            + ", ".join(regressions),
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
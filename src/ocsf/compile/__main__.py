@@ -1,55 +1,156 @@
-from ocsf.schema import to_json
+"""Compile an OCSF schema repository from the command line.
+
+Usage:
+    ocsf-compile build REPO [-o schema.json] [--profiles P ...] [--extensions E ...]
+        [--jobs N] [--cache-dir DIR] [--target NAME] [--timings]
+    ocsf-compile serve REPO [--port 8080 | --socket PATH] [--interval 1.0]
+
+`build` writes the compiled schema (or, with --target, one object or event
+class) as JSON to a file or stdout. `serve` keeps the compiled schema in
+memory and serves it over HTTP; see ocsf.compile.daemon.
+
+The exit status is 0 on success, 1 if the repository can't be read or
+compiled, and 2 for invalid arguments.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from dataclasses import asdict
+from typing import Optional, TextIO
+
 from ocsf.repository import read_repo
 
 from .compiler import Compilation
+from .daemon import CompileDaemon
+from .options import CompilationOptions
+from .profiling import Profiler
+
+
+def _options(args: argparse.Namespace) -> CompilationOptions:
+    return CompilationOptions(
+        profiles=args.profiles,
+        extensions=args.extensions,
+        ignore_profiles=args.ignore_profiles,
+        ignore_extensions=args.ignore_extensions,
+        prefix_extensions=args.prefix_extensions,
+        set_object_types=args.set_object_types,
+    )
+
+
+def _build(args: argparse.Namespace) -> None:
+    profiler = Profiler() if args.timings else None
+    repo = read_repo(args.repo, jobs=args.jobs)
+    compilation = Compilation(repo, _options(args), jobs=args.jobs, cache_dir=args.cache_dir, profiler=profiler)
+
+    target = compilation.build_target(args.target) if args.target is not None else None
+    if target is None:
+        compilation.compile(track=False)
+
+    def dump(out: TextIO) -> None:
+        if target is not None:
+            # As it appears in ocsf.schema.to_dict(), which only renames the schema's own keys
+            json.dump(asdict(target), out)
+        else:
+            compilation.write(out)
+
+    if args.output is None:
+        dump(sys.stdout)
+        sys.stdout.write("\n")
+    else:
+        # Definitions are converted as they are written, so write to a temporary
+        # file and only replace the output once that succeeds
+        temp = f"{args.output}.{os.getpid()}.tmp"
+        try:
+            with open(temp, "w") as out:
+                dump(out)
+            os.replace(temp, args.output)
+        except BaseException:
+            if os.path.exists(temp):
+                os.unlink(temp)
+            raise
+
+    if profiler is not None:
+        print(profiler.report().summary(), file=sys.stderr)
+
 
+def _serve(args: argparse.Namespace) -> None:
+    daemon = CompileDaemon(args.repo, _options(args), interval=args.interval, cache_dir=args.cache_dir)
+    daemon.start()
+    if daemon.error is not None:
+        print(f"Compilation failed: {daemon.error}", file=sys.stderr)
 
-PATH = "/Users/jfisher/Source/ocsf/ocsf-schema"
+    if args.socket is not None:
+        server = daemon.unix_server(args.socket)
+        address = args.socket
+    else:
+        tcp = daemon.server(args.host, args.port)
+        server, address = tcp, f"{args.host}:{tcp.server_port}"
+    print(f"Serving {args.repo} on {address}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        daemon.stop()
 
-repo = read_repo(PATH, preserve_raw_data=True)
-compiler = Compilation(repo)
 
-# TARGET = "events/iam/authentication.json"
-#TARGET = "events/base_event.json"
-TARGET = "objects/process.json"
-#TARGET = "extensions/windows/events/prefetch_query.json"
-# TARGET = "includes/classification.json"
-from pprint import pprint
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="ocsf-compile", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
 
-analysis = compiler.analyze()
-order = compiler.order()
-compile = compiler.compile()
-schema = compiler.build()
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("repo", help="the root directory of the schema repository")
+    common.add_argument("--profiles", nargs="*", help="the profiles to enable (default: all)")
+    common.add_argument("--ignore-profiles", nargs="*", help="profiles to leave out")
+    common.add_argument("--extensions", nargs="*", help="the extension directories to compile (default: all)")
+    common.add_argument("--ignore-extensions", nargs="*", help="extension directories to leave out")
+    common.add_argument(
+        "--no-prefix-extensions",
+        dest="prefix_extensions",
+        action="store_false",
+        help="don't prefix the names of extension objects and classes with the extension name",
+    )
+    common.add_argument(
+        "--no-object-types",
+        dest="set_object_types",
+        action="store_false",
+        help="leave references to objects in the type of attributes, rather than object_type",
+    )
+    common.add_argument("--cache-dir", help="cache compiled definitions in this directory between runs")
 
-print(f"TARGET: {TARGET}")
-print("ORDER")
-prereqs: set[str] = set()
+    build = commands.add_parser("build", parents=[common], help="compile the schema to JSON")
+    build.add_argument("-o", "--output", help="the file to write (default: stdout)")
+    build.add_argument("-j", "--jobs", type=int, help="the number of worker processes (default: none)")
+    build.add_argument("--target", help="only compile this object or event class, by name, key or path")
+    build.add_argument("--timings", action="store_true", help="print the time of each step to stderr")
+    build.set_defaults(run=_build)
 
+    serve = commands.add_parser("serve", parents=[common], help="serve the schema over HTTP, recompiling on changes")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8080)
+    serve.add_argument("--socket", help="serve on this Unix socket instead of TCP")
+    serve.add_argument("--interval", type=float, default=1.0, help="seconds between checks for changes")
+    serve.set_defaults(run=_serve)
 
-def find_op(target: str):
-    for o in order:
-        if o.target == target and o.target not in prereqs:
-            if o.prerequisite is not None and o.prerequisite not in prereqs:
-                prereqs.add(o.prerequisite)
-                find_op(o.prerequisite)
-            # pprint(o)
-    return None
+    return parser
 
 
-find_op(TARGET)
+def main(argv: Optional[list[str]] = None) -> int:
+    args = _parser().parse_args(argv)
+    try:
+        args.run(args)
+    except Exception as e:
+        message = str(e) if not isinstance(e, KeyError) else e.args[0]
+        print(f"ocsf-compile: error: {message}", file=sys.stderr)
+        return 1
+    return 0
 
-for o in order:
-    if o.target in prereqs or o.target == TARGET:
-        pprint(o)
-        if o.target in compile:
-            for op, change in compile[o.target]:
-                if op == o:
-                    pprint(change)
 
-# print()
-# print("COMPILE")
-#
-# for prereq in prereqs:
-#    if prereq in compile:
-#        pprint(compile[prereq])
-# pprint(compile[TARGET])
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+"""A persistent cache of compiled definitions.
+
+Each file the compiler modifies (or creates) is cached under a key that hashes
+everything its compiled result depends on: the compilation options, the
+file's own definition and operations, and those of every file in its closure
+(see ocsf.compile.incremental.closure) along with the files their operations
+read. A file whose key is found in the cache doesn't need to be compiled; only
+the files whose closure changed, and the files they depend on, are compiled
+again. See Compilation(cache_dir=...).
+
+Entries are stored one per file in the cache directory, named by their key.
+Reading an entry marks it as recently used, and the least recently used entries
+are removed whenever the directory grows past its size limit.
+
+State shared by all of a planner's operations isn't part of the key. Each entry
+records a digest of the planners' fingerprints (see Planner.fingerprint())
+instead, and cached entries are only used if it matches the compilation's.
+"""
+
+import hashlib
+import os
+import pickle
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from ocsf.schema import OcsfModel
+from ocsf.repository import DefinitionFile, Pathlike, Repository, RepoPath, RepoPaths, SpecialFiles, as_path, extension
+
+from .merge import MergeResult
+from .incremental import FileOperations, modifiers, op_key, walk
+
+# Bump this when the layout of entries or the compiler's output changes.
+_CACHE_VERSION = 1
+
+DEFAULT_CACHE_SIZE = 256 * 1024 * 1024
+"""The default size limit of a cache directory, in bytes."""
+
+
+@dataclass
+class CacheEntry:
+    """The compiled result of one file."""
+
+    file: Optional[DefinitionFile]
+    """The compiled file, or None if it wasn't modified while compiling."""
+    creator: Optional[tuple[Any, ...]]
+    """The op_key() of the operation that created the file, if it isn't in the repository."""
+    results: list[MergeResult]
+    """The results of the operations on the file, in plan order."""
+    models: dict[tuple[str, str], OcsfModel]
+    """The parts of the schema that come from the file, by (section, key)."""
+    fingerprints: str
+    """A digest of the planners' fingerprints when the file was compiled."""
+
+
+def digest_parts(*parts: str) -> str:
+    """A hex digest of a sequence of strings."""
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part.encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def fingerprint_digest(fingerprints: list[Any]) -> str:
+    """A digest of Planner.fingerprint() for each planner of a compilation."""
+    return digest_parts(repr(fingerprints))
+
+
+def cache_keys(
+    repo: Repository, operations: list[FileOperations], paths: Iterable[RepoPath], salt: str = ""
+) -> dict[RepoPath, str]:
+    """Compute the cache key of each of paths.
+
+    Args:
+        repo: The repository being compiled.
+        operations: The operations from Compilation.analyze().
+        paths: The paths to compute keys for.
+        salt: Anything else the compiled results depend on, like the options.
+    """
+    modified = modifiers(operations)
+
+    # A digest of each file's definition and the operations that modify it
+    digests: dict[RepoPath, str] = {}
+
+    def digest(path: RepoPath) -> str:
+        if path not in digests:
+            data = repr(repo[path].data) if path in repo else "absent"
+            ops = repr([op_key(op) for op in modified.get(path, ())])
+            digests[path] = digest_parts(path, data, ops)
+        return digests[path]
+
+    keys: dict[RepoPath, str] = {}
+    for path in paths:
+        inputs = walk(modified, [path])
+
+        # Files that are only read, like categories.json, and the
+        # extension.json of files in an extension
+        for dep in list(inputs):
+            for op in modified.get(dep, ()):
+                if op.prerequisite is not None:
+                    inputs.add(op.prerequisite)
+        for dep in list(inputs):
+            extn = extension(dep)
+            if extn is not None:
+                inputs.add(as_path(RepoPaths.EXTENSIONS.value, extn, SpecialFiles.EXTENSION.value))
+
+        keys[path] = digest_parts(str(_CACHE_VERSION), salt, path, *(digest(dep) for dep in sorted(inputs)))
+
+    return keys
+
+
+class CompileCache:
+    def __init__(self, cache_dir: Pathlike, max_bytes: int = DEFAULT_CACHE_SIZE):
+        """Args:
+        cache_dir: The directory to store entries in. It is created if needed.
+        max_bytes: The size limit of the directory. The least recently used
+            entries are removed when it is exceeded.
+        """
+        self._dir = Path(cache_dir)
+        self._max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> Path:
+        return self._dir / f"{key}.pickle"
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Get the entry for a key, if it is cached."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as file:
+                version, entry = pickle.load(file)
+            # Mark the entry as recently used
+            os.utime(path)
+        except Exception:
+            # Missing, corrupt, or incompatible entries are misses.
+            version, entry = None, None
+
+        if version != _CACHE_VERSION or not isinstance(entry, CacheEntry):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return entry
+
+    def put(self, key: str, entry: CacheEntry) -> None:
+        """Add or replace the entry for a key."""
+        self._dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "wb") as file:
+            pickle.dump((_CACHE_VERSION, entry), file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    def size(self) -> int:
+        """The total size of the entries in the cache, in bytes."""
+        return sum(stat.st_size for _, stat in self._entries())
+
+    def _entries(self) -> list[tuple[Path, os.stat_result]]:
+        found: list[tuple[Path, os.stat_result]] = []
+        if self._dir.is_dir():
+            for path in self._dir.glob("*.pickle"):
+                try:
+                    found.append((path, path.stat()))
+                except FileNotFoundError:
+                    # Removed by another process
+                    continue
+        return found
+
+    def prune(self) -> int:
+        """Remove the least recently used entries until the cache is within its
+        size limit. Returns the number of entries removed."""
+        entries = self._entries()
+        size = sum(stat.st_size for _, stat in entries)
+        removed = 0
+
+        for path, stat in sorted(entries, key=lambda entry: entry[1].st_mtime_ns):
+            if size <= self._max_bytes:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            size -= stat.st_size
+            removed += 1
+
+        return removed
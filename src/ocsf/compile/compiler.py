@@ -1,7 +1,21 @@
-from typing import Optional
+import asyncio
 
-from ocsf.schema import OcsfSchema
-from ocsf.repository import Repository, RepoPath
+from concurrent.futures import Executor
+from contextlib import AbstractContextManager, nullcontext
+from dataclasses import dataclass, replace
+from functools import partial, wraps
+from typing import Any, Callable, Iterable, Optional, TypeVar, cast
+
+from ocsf.schema import OcsfModel, OcsfSchema, OcsfObject, OcsfEvent
+from ocsf.repository import (
+    DefinitionFile,
+    EventDefn,
+    ObjectDefn,
+    Pathlike,
+    Repository,
+    RepoPath,
+    extensionless,
+)
 from .options import CompilationOptions
 from .protoschema import ProtoSchema
 from .planners.planner import Operation, Planner
@@ -22,6 +36,13 @@ from .planners.object_type import ObjectTypePlanner
 from .planners.uid_names import IdSiblingPlanner
 from .planners.datetime import DateTimePlanner
 from .merge import MergeResult
+from .convert import to_model
+from .stream import Writable, write_schema
+from .parallel import apply_parallel
+from .incremental import affected, closure, modifies, op_key
+from .cache import DEFAULT_CACHE_SIZE, CacheEntry, CompileCache, cache_keys, fingerprint_digest
+from .profiling import Profiler
+from .inflight import InFlight
 
 FileOperations = dict[RepoPath, list[Operation]]
 CompilationOperations = list[FileOperations]
@@ -31,14 +52,240 @@ FileMutations = list[tuple[Operation, MergeResult]]
 CompilationMutations = dict[RepoPath, FileMutations]
 
 
+@dataclass
+class PlannerStats:
+    """Counters for one planner's work in Compilation.analyze()."""
+
+    phase: int
+    planner: str
+    offered: int = 0
+    """Files passed to the planner's analyze()."""
+    skipped: int = 0
+    """Files not passed to analyze() because of the planner's kinds or prefixes."""
+    operations: int = 0
+    """Operations the planner returned."""
+
+
+class CycleError(ValueError):
+    """Raised when the prerequisites of operations form a cycle."""
+
+    def __init__(self, cycles: list[list[RepoPath]]):
+        self.cycles = cycles
+        super().__init__("Cycles found in prerequisites: " + "; ".join(" -> ".join(cycle) for cycle in cycles))
+
+
+def _order_phase(phase: FileOperations) -> tuple[CompilationPlan, list[CompilationPlan], list[list[RepoPath]]]:
+    """Order the operations of one phase so that the operations on a file's
+    prerequisites come before the operations that need them.
+
+    Returns the plan, the plan split into levels of operations that only depend
+    on operations in earlier levels, and any cycles of prerequisites found.
+    """
+    plan: CompilationPlan = []
+    cycles: list[list[RepoPath]] = []
+    depth: dict[RepoPath, int] = {}
+
+    # Paths whose operations have been (or are being) planned, and those that are finished
+    planned: set[RepoPath] = set()
+    done: set[RepoPath] = set()
+
+    # Operations that write their prerequisite (see Operation.writes_prerequisite)
+    # write a file other than their target. Operations planned after them that
+    # read that file have to be in a later level: written path -> targets of the
+    # operations that wrote it so far, and target -> targets it has to follow.
+    writers: dict[RepoPath, list[RepoPath]] = {}
+    follows: dict[RepoPath, set[RepoPath]] = {}
+    # True if an operation reads a file written by an operation whose target
+    # can't be put in an earlier level
+    unordered = False
+
+    for root in phase:
+        if root in planned:
+            continue
+
+        # A depth first walk of prerequisites with an explicit stack of
+        # (path, index of the next operation to plan)
+        planned.add(root)
+        stack: list[tuple[RepoPath, int]] = [(root, 0)]
+        while len(stack) > 0:
+            path, i = stack[-1]
+            ops = phase[path]
+
+            if i == len(ops):
+                stack.pop()
+                done.add(path)
+                depth[path] = max(
+                    (
+                        depth[op.prerequisite] + 1
+                        for op in ops
+                        if op.prerequisite in done and op.prerequisite != path and op.prerequisite in phase
+                    ),
+                    default=0,
+                )
+                for writer in follows.get(path, ()):
+                    if writer in done:
+                        depth[path] = max(depth[path], depth[writer] + 1)
+                    else:
+                        # The writer is further up the stack, so it depends on this path
+                        unordered = True
+                continue
+
+            prerequisite = ops[i].prerequisite
+            if prerequisite is not None and prerequisite in phase and prerequisite != path:
+                if prerequisite not in planned:
+                    # Plan the prerequisite first, then come back to this operation
+                    planned.add(prerequisite)
+                    stack.append((prerequisite, 0))
+                    continue
+
+                if prerequisite not in done:
+                    # The prerequisite is still being planned, further up the stack
+                    paths = [p for p, _ in stack]
+                    cycles.append(paths[paths.index(prerequisite) :] + [prerequisite])
+
+            if prerequisite is not None:
+                for writer in writers.get(prerequisite, ()):
+                    if writer != path:
+                        if path not in follows:
+                            follows[path] = set()
+                        follows[path].add(writer)
+                if ops[i].writes_prerequisite:
+                    if prerequisite not in writers:
+                        writers[prerequisite] = []
+                    writers[prerequisite].append(path)
+
+            plan.append(ops[i])
+            stack[-1] = (path, i + 1)
+
+    if len(cycles) > 0 or unordered:
+        # Operations in a cycle can only be applied in plan order
+        return plan, [[op] for op in plan], cycles
+
+    levels: list[CompilationPlan] = []
+    for op in plan:
+        while len(levels) <= depth[op.target]:
+            levels.append([])
+        levels[depth[op.target]].append(op)
+
+    return plan, levels, cycles
+
+
+def _apply_needed(
+    proto: ProtoSchema,
+    plan: CompilationPlan,
+    needed: set[RepoPath],
+    created: dict[tuple[Any, ...], tuple[RepoPath, DefinitionFile]],
+) -> dict[int, MergeResult]:
+    """Apply the operations in plan that modify the needed files, by id().
+
+    Files that were created by an earlier compilation, keyed by the op_key() of
+    the operation that created them, are added to proto (and removed from
+    created) when that operation comes up in the plan, so that they are in the
+    same order as if they had been compiled.
+    """
+    results: dict[int, MergeResult] = {}
+    for op in plan:
+        proto.writer = op
+        if modifies(op, needed):
+            results[id(op)] = op.apply(proto)
+        elif op_key(op) in created:
+            path, file = created.pop(op_key(op))
+            proto[path] = file
+    proto.writer = None
+    return results
+
+
+def _assemble(
+    plan: CompilationPlan, results: dict[int, MergeResult], previous: Callable[[RepoPath, int], MergeResult]
+) -> CompilationMutations:
+    """Collect the mutations of a plan from the results of the operations that
+    were applied and, for the others, previous(target, n): the result of the
+    nth operation on the target in an earlier compilation."""
+    mutations: CompilationMutations = {}
+    for op in plan:
+        if op.target not in mutations:
+            mutations[op.target] = []
+        if id(op) in results:
+            mutations[op.target].append((op, results[id(op)]))
+        else:
+            # The target's operations are the same as before, in the same order
+            mutations[op.target].append((op, previous(op.target, len(mutations[op.target]))))
+    return mutations
+
+
+_Method = TypeVar("_Method", bound=Callable[..., Any])
+
+
+def _step(name: str) -> Callable[[_Method], _Method]:
+    """Measure a method of Compilation as a step, if it has a profiler."""
+
+    def decorate(method: _Method) -> _Method:
+        @wraps(method)
+        def measured(self: "Compilation", *args: Any, **kwargs: Any) -> Any:
+            with self.measure("step", name):
+                return method(self, *args, **kwargs)
+
+        return cast(_Method, measured)
+
+    return decorate
+
+
+def _dispatch(phase: list[Planner], kinds: Iterable[type]) -> dict[type, list[Planner]]:
+    """Map each kind of definition to the planners in a phase that handle it."""
+    table: dict[type, list[Planner]] = {}
+    for kind in kinds:
+        table[kind] = [planner for planner in phase if planner.kinds is None or issubclass(kind, planner.kinds)]
+    return table
+
+
 class Compilation:
-    def __init__(self, repo: Repository, options: CompilationOptions = CompilationOptions()):
+    def __init__(
+        self,
+        repo: Repository,
+        options: CompilationOptions = CompilationOptions(),
+        jobs: Optional[int] = None,
+        cache_dir: Optional[Pathlike] = None,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+        profiler: Optional[Profiler] = None,
+    ):
+        """Args:
+        repo: The repository to compile.
+        options: Options for the compilation.
+        jobs: The number of worker processes to apply operations with. Defaults
+            to applying operations serially. See ocsf.compile.parallel.
+        cache_dir: A directory in which to cache compiled definitions between
+            runs. Only files whose inputs have changed since they were cached
+            are compiled. See ocsf.compile.cache.
+        cache_size: The size limit of cache_dir, in bytes.
+        profiler: A Profiler to record the time spent in each step, phase,
+            planner and kind of operation. See ocsf.compile.profiling.
+        """
         self._operations: Optional[CompilationOperations] = None
         self._plan: Optional[CompilationPlan] = None
+        # The plan split into levels that can be applied in parallel, and the
+        # cycles of prerequisites found, when the plan was made by order()
+        self._levels: Optional[list[CompilationPlan]] = None
+        self._cycles: Optional[list[list[RepoPath]]] = None
+        self._jobs = jobs
+        self._profiler = profiler
+        # Where each phase ends in the plan, when the plan was made by order()
+        self._phase_ends: Optional[list[int]] = None
         self._mutations: Optional[CompilationMutations] = None
         self._schema: Optional[OcsfSchema] = None
+        self._stats: Optional[list[PlannerStats]] = None
+        self._fingerprints: Optional[list[Any]] = None
+        self._recompiled: Optional[set[RepoPath]] = None
+        self._cache = CompileCache(cache_dir, cache_size) if cache_dir is not None else None
+        # Converted parts of the schema by path, when compiled with a cache
+        self._models: Optional[dict[RepoPath, dict[tuple[str, str], OcsfModel]]] = None
         self._repo = repo
         self._proto = ProtoSchema(repo)
+        self._builds: InFlight[OcsfSchema] = InFlight()
+
+        # Planners fill in defaults (like the list of extensions) on their
+        # options, so give them a copy to keep the caller's options intact.
+        self._options = options
+        options = replace(options)
 
         # [phase: [planner, planner, ...]]
         self._planners: list[list[Planner]] = [
@@ -62,28 +309,118 @@ class Compilation:
             ],
         ]
 
+    @property
+    def proto(self) -> ProtoSchema:
+        """The working state of the compilation."""
+        return self._proto
+
+    @property
+    def levels(self) -> Optional[list[CompilationPlan]]:
+        """The plan from the last call to order(), split into levels. The
+        operations in a level only depend on operations in earlier levels, so
+        they can be applied in any order (or at the same time)."""
+        return self._levels
+
+    @property
+    def cycles(self) -> Optional[list[list[RepoPath]]]:
+        """Cycles of prerequisites found by the last call to order(). Each is a
+        list of paths, starting and ending with the same path."""
+        return self._cycles
+
+    def fingerprints(self) -> list[Any]:
+        """Planner.fingerprint() of each planner, in phase order."""
+        return [planner.fingerprint() for phase in self._planners for planner in phase]
+
+    def shared_paths(self) -> list[RepoPath]:
+        """The files that the planners read for state shared by their
+        operations (see Planner.shared_paths())."""
+        paths = (path for phase in self._planners for planner in phase for path in planner.shared_paths())
+        return list(dict.fromkeys(paths))
+
+    def adopt_mutations(self, mutations: CompilationMutations) -> None:
+        """Record the changes made by applying this compilation's plan to its
+        proto some other way than compile(), as by compile_variants()."""
+        self._mutations = mutations
+        self._fingerprints = self.fingerprints()
+
+    @property
+    def stats(self) -> Optional[list[PlannerStats]]:
+        """Per-planner counters from the last call to analyze()."""
+        return self._stats
+
+    def measure(self, category: str, name: str) -> AbstractContextManager[None]:
+        """Measure a block with the compilation's profiler, if it has one. See
+        Profiler.measure()."""
+        if self._profiler is None:
+            return nullcontext()
+        return self._profiler.measure(category, name)
+
+    @_step("analyze")
     def analyze(self) -> CompilationOperations:
+        files = list(self._repo.files())
+
+        # Group files by the kind of their definition so that each planner is
+        # only offered the files it handles.
+        by_kind: dict[type, list[int]] = {}
+        for i, file in enumerate(files):
+            kind = type(file.data)
+            if kind not in by_kind:
+                by_kind[kind] = []
+            by_kind[kind].append(i)
+
         operations: CompilationOperations = []
-        for phase in self._planners:
+        stats: list[PlannerStats] = []
+        for n, phase in enumerate(self._planners):
+            candidates: dict[Planner, list[int]] = {planner: [] for planner in phase}
+            for kind, planners in _dispatch(phase, by_kind.keys()).items():
+                for planner in planners:
+                    candidates[planner].extend(by_kind[kind])
+
             found: FileOperations = {}
             for planner in phase:
-                for file in self._repo.files():
-                    ops = planner.analyze(file)
+                stat = PlannerStats(n, type(planner).__name__)
+                stats.append(stat)
+
+                # Offer files in repository order, as the order of operations
+                # on each target depends on it
+                for i in sorted(candidates[planner]):
+                    file = files[i]
+                    if planner.prefixes is not None and not file.path.startswith(planner.prefixes):
+                        continue
+
+                    stat.offered += 1
+                    if self._profiler is None:
+                        ops = planner.analyze(file)
+                    else:
+                        with self._profiler.measure("analyze", stat.planner):
+                            ops = planner.analyze(file)
                     if ops is not None:
                         if isinstance(ops, Operation):
                             ops = [ops]
 
+                        stat.operations += len(ops)
                         for op in ops:
                             if op.target not in found:
                                 found[op.target] = []
                             found[op.target].append(op)
 
+                stat.skipped = len(files) - stat.offered
+
             operations.append(found)
 
         self._operations = operations
+        self._stats = stats
         return operations
 
-    def order(self, operations: Optional[CompilationOperations] = None) -> CompilationPlan:
+    @_step("order")
+    def order(self, operations: Optional[CompilationOperations] = None, allow_cycles: bool = False) -> CompilationPlan:
+        """Order the operations from analyze() so that the operations on each
+        file's prerequisites are applied first.
+
+        Raises a CycleError if prerequisites form a cycle, unless allow_cycles
+        is True, in which case operations in the cycle are applied in the order
+        they are found (see the cycles property).
+        """
         if operations is not None:
             self._operations = operations
 
@@ -92,48 +429,427 @@ class Compilation:
             assert self._operations is not None
 
         plan: CompilationPlan = []
-
-        def follow(path: RepoPath, phase: FileOperations, planned: set[RepoPath]):
-            if path in planned or path not in phase:
-                return
-            planned.add(path)
-            for op in phase[path]:
-                if op.prerequisite is not None and op.prerequisite not in planned:
-                    follow(op.prerequisite, phase, planned)
-                plan.append(op)
+        levels: list[CompilationPlan] = []
+        cycles: list[list[RepoPath]] = []
+        ends: list[int] = []
 
         for phase in self._operations:
-            planned: set[RepoPath] = set()
-            for path, _ in phase.items():
-                follow(path, phase, planned)
+            phase_plan, phase_levels, phase_cycles = _order_phase(phase)
+            plan.extend(phase_plan)
+            ends.append(len(plan))
+            levels.extend(phase_levels)
+            cycles.extend(phase_cycles)
+
+        self._cycles = cycles
+        if len(cycles) > 0 and not allow_cycles:
+            raise CycleError(cycles)
 
         self._plan = plan
+        self._levels = levels
+        self._phase_ends = ends
         return plan
 
-    def compile(self, plan: Optional[CompilationPlan] = None) -> CompilationMutations:
+    def compile(self, plan: Optional[CompilationPlan] = None, track: bool = True) -> CompilationMutations:
+        """Apply the plan from order() (or plan) and return the changes made by
+        each operation, by target.
+
+        Args:
+            plan: The operations to apply, instead of the plan from order().
+            track: If False, operations don't collect the fields they change,
+                so each MergeResult in the mutations is empty. This is faster
+                and uses less memory; build(), build_dict() and write() compile
+                this way unless compile() has already been called.
+        """
+        self._proto.track = track
         if plan is not None:
             self._plan = plan
+            self._levels = None
+            self._cycles = None
+            self._phase_ends = None
 
         if self._plan is None:
             self.order()
             assert self._plan is not None
 
+        if self._cache is not None and plan is None:
+            with self.measure("step", "compile"):
+                return self._compile_cached()
+
+        with self.measure("step", "compile"):
+            self._mutations = self._apply()
+        self._fingerprints = self.fingerprints()
+        return self._mutations
+
+    def _apply(self) -> CompilationMutations:
+        assert self._plan is not None
         mutations: CompilationMutations = {}
-        for op in self._plan:
-            if op.target not in mutations:
-                mutations[op.target] = []
-            result = op.apply(self._proto)
-            mutations[op.target].append((op, result))
 
-        self._mutations = mutations
+        if self._jobs is not None and self._jobs > 1 and self._levels is not None:
+            results: dict[int, MergeResult] = {}
+            for level, level_results in zip(self._levels, apply_parallel(self._proto, self._levels, self._jobs)):
+                for op, result in zip(level, level_results):
+                    results[id(op)] = result
+
+            for op in self._plan:
+                if op.target not in mutations:
+                    mutations[op.target] = []
+                mutations[op.target].append((op, results[id(op)]))
+
+        else:
+            for n, ops in enumerate(self._phases()):
+                self._apply_phase(n, ops, mutations)
+
+        return mutations
+
+    def _phases(self) -> list[CompilationPlan]:
+        """The plan split into its phases, or the whole plan if it wasn't made
+        by order()."""
+        assert self._plan is not None
+        phases: list[CompilationPlan] = []
+        start = 0
+        for end in self._phase_ends or [len(self._plan)]:
+            phases.append(self._plan[start:end])
+            start = end
+        return phases
+
+    def _apply_phase(self, n: int, ops: CompilationPlan, mutations: CompilationMutations) -> None:
+        """Apply the operations of the nth phase serially, adding their results
+        to mutations."""
+        proto = self._proto
+        profiler = self._profiler
+        with self.measure("phase", f"phase {n}"):
+            for op in ops:
+                if op.target not in mutations:
+                    mutations[op.target] = []
+                proto.writer = op
+                if profiler is None:
+                    result = op.apply(proto)
+                else:
+                    with profiler.measure("apply", type(op).__name__):
+                        result = op.apply(proto)
+                mutations[op.target].append((op, result))
+            proto.writer = None
+
+    def _compile_cached(self) -> CompilationMutations:
+        """Compile the files that aren't in the cache, and take the rest from it."""
+        assert self._cache is not None and self._operations is not None and self._plan is not None
+
+        # Every file that may be modified or created while compiling
+        paths = list(self._repo.paths())
+        paths.extend(target for phase in self._operations for target in phase if target not in self._repo)
+        paths = list(dict.fromkeys(paths))
+
+        keys = cache_keys(self._repo, self._operations, paths, repr((self._options, self._proto.track)))
+        entries: dict[RepoPath, CacheEntry] = {}
+        for path in paths:
+            entry = self._cache.get(keys[path])
+            if entry is not None:
+                entries[path] = entry
+
+        if len(entries) == 0:
+            self._mutations = self._apply()
+            self._fingerprints = self.fingerprints()
+            self._recompiled = set(self._proto.paths())
+            return self._store(self._mutations, keys, entries)
+
+        needed = closure(self._operations, [path for path in paths if path not in entries])
+
+        # Start with the cached files that don't need to be compiled again
+        created: dict[tuple[Any, ...], tuple[RepoPath, DefinitionFile]] = {}
+        complete = True
+        for path, entry in entries.items():
+            if path in needed or entry.file is None:
+                continue
+            if path in self._repo:
+                self._proto[path] = entry.file
+            elif entry.creator is not None:
+                created[entry.creator] = (path, entry.file)
+            else:
+                complete = False
+
+        results = _apply_needed(self._proto, self._plan, needed, created)
+
+        fingerprints = self.fingerprints()
+        digest = fingerprint_digest(fingerprints)
+        if len(created) > 0 or not complete or any(entry.fingerprints != digest for entry in entries.values()):
+            # State shared by every operation of a planner changed since some
+            # entries were cached, or a cached file couldn't be placed
+            fresh = Compilation(self._repo, self._options, self._jobs, profiler=self._profiler)
+            fresh.compile(track=self._proto.track)
+            self._adopt(fresh, set(fresh.proto.paths()), None)
+            assert self._mutations is not None
+            return self._store(self._mutations, keys, {})
+
+        self._mutations = _assemble(self._plan, results, lambda path, n: entries[path].results[n])
+        self._fingerprints = fingerprints
+        self._recompiled = needed
+        return self._store(self._mutations, keys, entries)
+
+    def _store(
+        self, mutations: CompilationMutations, keys: dict[RepoPath, str], entries: dict[RepoPath, CacheEntry]
+    ) -> CompilationMutations:
+        """Cache the compiled files that weren't found in the cache (entries),
+        and keep the converted parts of the schema for build()."""
+        assert self._cache is not None and self._fingerprints is not None
+        digest = fingerprint_digest(self._fingerprints)
+
+        models: dict[RepoPath, dict[tuple[str, str], OcsfModel]] = {}
+        for path, section, key, kind, defn in self._proto.sections():
+            if section == "version":
+                continue
+            if path not in models:
+                models[path] = {}
+            if path in entries and (section, key) in entries[path].models:
+                models[path][(section, key)] = entries[path].models[(section, key)]
+            else:
+                models[path][(section, key)] = to_model(kind, defn)
+
+        for path, key in keys.items():
+            if path in entries:
+                continue
+            creator = self._proto.creator(path)
+            entry = CacheEntry(
+                file=self._proto.read(path) if self._proto.is_copied(path) else None,
+                creator=op_key(creator) if creator is not None else None,
+                results=[result for _, result in mutations.get(path, [])],
+                models=models.get(path, {}),
+                fingerprints=digest,
+            )
+            self._cache.put(key, entry)
+
+        self._cache.prune()
+        self._models = models
         return mutations
 
     def build(self) -> OcsfSchema:
         if self._mutations is None:
-            self.compile()
+            self.compile(track=False)
             assert self._mutations is not None
 
         if self._schema is None:
-            self._schema = self._proto.schema()
+            models = self._models
+            with self.measure("step", "schema"):
+                if models is not None:
+                    self._schema = self._proto.schema(lambda path, section, key: models[path].get((section, key)))
+                else:
+                    self._schema = self._proto.schema()
 
         return self._schema
+
+    async def abuild(self, executor: Optional[Executor] = None) -> OcsfSchema:
+        """Build the schema like build(), without blocking the event loop.
+
+        Each step (analyze, order, each phase of compile, and converting the
+        schema) runs in executor, which defaults to the event loop's default
+        executor, and the event loop is free between them. With worker
+        processes (jobs) or a cache_dir, compile runs as a single step.
+
+        Concurrent calls share a single build. Cancelling a call cancels the
+        build once no other call is awaiting it; the build then stops after
+        the step that is running, and this compilation is left as it was.
+        """
+        if self._schema is not None:
+            return self._schema
+        return await self._builds.run(None, lambda: self._abuild(executor))
+
+    async def _abuild(self, executor: Optional[Executor]) -> OcsfSchema:
+        loop = asyncio.get_running_loop()
+
+        if self._mutations is None:
+            # Work on a separate compilation, so that a cancelled build (whose
+            # running step finishes in the background) doesn't touch this one
+            work = Compilation(self._repo, self._options, self._jobs, profiler=self._profiler)
+            work._cache = self._cache
+            await loop.run_in_executor(executor, work.analyze)
+            await loop.run_in_executor(executor, work.order)
+
+            if work._cache is not None or (work._jobs is not None and work._jobs > 1):
+                await loop.run_in_executor(executor, partial(work.compile, track=False))
+            else:
+                work._proto.track = False
+                mutations: CompilationMutations = {}
+                with work.measure("step", "compile"):
+                    for n, ops in enumerate(work._phases()):
+                        await loop.run_in_executor(executor, work._apply_phase, n, ops, mutations)
+                work.adopt_mutations(mutations)
+
+            schema = await loop.run_in_executor(executor, work.build)
+            recompiled = self._recompiled if work._cache is None else work._recompiled
+            self._adopt(work, set(), None)
+            self._models = work._models
+            self._recompiled = recompiled
+            self._schema = schema
+            return schema
+
+        return await loop.run_in_executor(executor, self.build)
+
+    def build_target(self, path_or_name: str) -> OcsfObject | OcsfEvent:
+        """Compile a single object or event class and return it exactly as
+        build() would.
+
+        Args:
+            path_or_name: The path of the class's file (like
+                "events/iam/authentication.json") or its name or key (like
+                "authentication" or "windows/registry_key_query").
+
+        Only the target and the files it depends on (see
+        ocsf.compile.incremental.closure), along with any files planners read
+        for their shared state (see Planner.shared_paths()), are compiled, in a
+        separate ProtoSchema. If this compilation has already been compiled,
+        the target is taken from it instead.
+
+        Raises a KeyError if no object or event class matches path_or_name, and
+        a ValueError if more than one does.
+        """
+        if path_or_name.endswith(".json"):
+            candidates = [extensionless(path_or_name)]
+        else:
+            # A key may be prefixed with an extension name, but the name never is
+            short = path_or_name.split("/")[-1]
+            paths = self._repo.find(short, EventDefn) + self._repo.find(short, ObjectDefn)
+            candidates = list(dict.fromkeys(extensionless(path) for path in paths))
+
+        if self._mutations is not None:
+            proto = self._proto
+        else:
+            target = Compilation(self._repo, self._options, profiler=self._profiler)
+            target.proto.track = False
+            operations = target.analyze()
+            plan = target.order()
+
+            _apply_needed(target._proto, plan, closure(operations, candidates + target.shared_paths()), {})
+            proto = target._proto
+
+        found: list[tuple[RepoPath, str, OcsfObject | OcsfEvent]] = []
+        for path, section, key, kind, defn in proto.sections(path for path in candidates if path in proto):
+            if section in ("objects", "classes"):
+                if path_or_name.endswith(".json") or path_or_name in (key, defn.name):
+                    model = to_model(kind, defn)
+                    assert isinstance(model, (OcsfObject, OcsfEvent))
+                    found.append((path, key, model))
+
+        if len(found) > 1:
+            # Prefer an exact match of the key over a match of the name
+            found = [entry for entry in found if entry[1] == path_or_name] or found
+
+        if len(found) == 0:
+            raise KeyError(f"Object or event class {path_or_name} not found")
+        if len(found) > 1:
+            raise ValueError(f"{path_or_name} is ambiguous: " + ", ".join(path for path, _, _ in found))
+
+        return found[0][2]
+
+    @property
+    def recompiled(self) -> Optional[set[RepoPath]]:
+        """The files that were compiled again by the last call to recompile(),
+        or that weren't taken from the cache by a compilation with a cache_dir."""
+        return self._recompiled
+
+    def recompile(self, changed_paths: Iterable[RepoPath]) -> OcsfSchema:
+        """Recompile the schema after the files at changed_paths were changed
+        in, added to, or removed from the repository, and return the new schema.
+
+        Only the files affected by the change, and the files they depend on,
+        are compiled again; see ocsf.compile.incremental. Other files, and
+        their parts of the schema, are reused from the previous compilation.
+        The result is identical to compiling the repository from scratch.
+        """
+        if self._mutations is None or self._operations is None or self._plan is None:
+            return self.build()
+
+        changed = set(changed_paths)
+        fresh = Compilation(self._repo, self._options, self._jobs, profiler=self._profiler)
+        fresh.proto.track = self._proto.track
+        operations = fresh.analyze()
+        plan = fresh.order()
+
+        old_paths = set(self._proto.paths())
+        found = affected(self._operations, operations, changed, old_paths | set(self._repo.paths()))
+        needed = closure(operations, found)
+
+        # Start with the compiled files that aren't affected. Files that were
+        # created while compiling are added when the operation that created
+        # them comes up in the plan, so that they are in the same order.
+        proto = fresh._proto
+        created: dict[tuple[Any, ...], tuple[RepoPath, DefinitionFile]] = {}
+        complete = True
+        for path in old_paths:
+            if path in needed or not self._proto.is_copied(path):
+                continue
+            if path in self._repo:
+                proto[path] = self._proto.read(path)
+            elif self._proto.creator(path) is not None:
+                created[op_key(self._proto.creator(path))] = (path, self._proto.read(path))
+            else:
+                complete = False
+
+        results = _apply_needed(proto, plan, needed, created)
+
+        fingerprints = fresh.fingerprints()
+        if fingerprints != self._fingerprints or len(created) > 0 or not complete:
+            # State shared by every operation of a planner changed (so
+            # everything is affected), or a created file couldn't be placed
+            fresh = Compilation(self._repo, self._options, self._jobs, profiler=self._profiler)
+            fresh.compile(track=self._proto.track)
+            self._adopt(fresh, set(fresh.proto.paths()), None)
+            return self.build()
+
+        previous = self._mutations
+        mutations = _assemble(plan, results, lambda path, n: previous[path][n][1])
+        fresh._mutations = mutations
+        fresh._fingerprints = fingerprints
+
+        self._adopt(fresh, needed, self._schema)
+        return self.build()
+
+    def _adopt(self, fresh: "Compilation", recompiled: set[RepoPath], previous: Optional[OcsfSchema]) -> None:
+        """Take over the state of a recompilation, reusing the parts of the
+        previous schema that come from files that weren't recompiled."""
+        schema: Optional[OcsfSchema] = None
+        if previous is not None:
+            # The file each part of the previous schema came from
+            owners: dict[tuple[str, str], RepoPath] = {}
+            for path, section, key, _, _ in self._proto.sections():
+                owners[(section, key)] = path
+
+            def reuse(path: RepoPath, section: str, key: str) -> Any:
+                if path in recompiled or owners.get((section, key)) != path:
+                    return None
+                return getattr(previous, section)[key]
+
+            schema = fresh._proto.schema(reuse)
+
+        self._proto = fresh._proto
+        self._planners = fresh._planners
+        self._operations = fresh._operations
+        self._plan = fresh._plan
+        self._levels = fresh._levels
+        self._phase_ends = fresh._phase_ends
+        self._cycles = fresh._cycles
+        self._stats = fresh._stats
+        self._mutations = fresh._mutations
+        self._fingerprints = fresh._fingerprints
+        self._schema = schema
+        self._models = None
+        self._recompiled = recompiled
+
+    def build_dict(self) -> dict[str, Any]:
+        """Build the schema as the JSON-ready dictionary that
+        ocsf.schema.to_dict would produce from build()."""
+        if self._mutations is None:
+            self.compile(track=False)
+            assert self._mutations is not None
+
+        with self.measure("step", "schema_dict"):
+            return self._proto.schema_dict()
+
+    def write(self, out: Writable) -> None:
+        """Compile the schema and stream it to out (a file, a socket's
+        makefile(), etc.) as JSON, one definition at a time. The output is
+        identical to ocsf.schema.to_json(self.build())."""
+        if self._mutations is None:
+            self.compile(track=False)
+            assert self._mutations is not None
+
+        with self.measure("step", "write"):
+            write_schema(self._proto, out)
@@ -0,0 +1,151 @@
+"""Convert compiled definitions into OCSF schema models.
+
+This replaces the `asdict` -> drop `None`s -> `dacite.from_dict` round trip
+with a single traversal of each definition. A converter is built once per
+model class from its type hints, and can produce either the model itself or
+the JSON-ready dictionary that `ocsf.schema.to_dict` would produce from it.
+
+Example:
+```python
+obj = to_model(OcsfObject, defn)
+data = to_json_dict(OcsfObject, defn)
+```
+"""
+
+from dataclasses import MISSING, fields, is_dataclass
+from types import NoneType, UnionType
+from typing import TYPE_CHECKING, Any, Callable, Optional, TypeVar, Union, cast, get_args, get_origin, get_type_hints
+
+from ocsf.schema import OcsfModel
+from ocsf.repository import DefinitionPart
+
+if TYPE_CHECKING:
+    from _typeshed import DataclassInstance
+
+ModelT = TypeVar("ModelT", bound=OcsfModel)
+
+# (value) -> converted value, for each of the two output modes
+_Convert = Callable[[Any], Any]
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _copy_list(value: Any) -> Any:
+    if isinstance(value, list):
+        return list(cast(list[Any], value))
+    return value
+
+
+class _Field:
+    def __init__(self, name: str, default: Callable[[], Any] | None, to_model: _Convert, to_json: _Convert):
+        self.name = name
+        self.default = default
+        self.to_model = to_model
+        self.to_json = to_json
+
+
+class _Converter:
+    def __init__(self, kind: type[OcsfModel]):
+        self.kind = kind
+        self.fields: list[_Field] = []
+
+    def _values(self, defn: Any, json: bool) -> dict[str, Any]:
+        if not isinstance(defn, DefinitionPart):
+            raise ValueError(f"Expected a definition for {self.kind.__name__}, got {type(defn).__name__}: {defn!r}")
+
+        values: dict[str, Any] = {}
+        for field in self.fields:
+            value = getattr(defn, field.name, None)
+            if value is None:
+                if field.default is None:
+                    raise ValueError(f'missing value for field "{field.name}" in {self.kind.__name__}')
+                value = field.default()
+            else:
+                value = field.to_json(value) if json else field.to_model(value)
+            values[field.name] = value
+        return values
+
+    def model(self, defn: Any) -> Any:
+        return self.kind(**self._values(defn, False))
+
+    def json(self, defn: Any) -> dict[str, Any]:
+        return self._values(defn, True)
+
+
+_converters: dict[type, _Converter] = {}
+
+
+def _build(hint: Any) -> tuple[_Convert, _Convert]:
+    """Build (to_model, to_json) functions for a type hint."""
+    origin = get_origin(hint)
+
+    if origin is Union or origin is UnionType:
+        members = [arg for arg in get_args(hint) if arg is not NoneType]
+        if len(members) == 1:
+            return _build(members[0])
+
+        models = [arg for arg in members if isinstance(arg, type) and is_dataclass(arg)]
+        if len(models) > 0:
+            return _build(models[0])
+        return _copy_list, _copy_list
+
+    if isinstance(hint, type) and is_dataclass(hint):
+        converter = _converter(cast(type[OcsfModel], hint))
+        return converter.model, converter.json
+
+    if origin is dict:
+        _, value = get_args(hint)
+        model, json = _build(value)
+
+        def dict_model(v: Any) -> Any:
+            if isinstance(v, DefinitionPart):
+                # e.g. profile annotations, which are an AttrDefn in the repository
+                return {k: x for k, x in vars(v).items() if x is not None}
+            return {k: model(x) for k, x in cast(dict[str, Any], v).items() if x is not None}
+
+        def dict_json(v: Any) -> Any:
+            if isinstance(v, DefinitionPart):
+                return {k: x for k, x in vars(v).items() if x is not None}
+            return {k: json(x) for k, x in cast(dict[str, Any], v).items() if x is not None}
+
+        return dict_model, dict_json
+
+    if origin is list:
+        return _copy_list, _copy_list
+
+    return _identity, _identity
+
+
+def _converter(kind: type[OcsfModel]) -> _Converter:
+    if kind in _converters:
+        return _converters[kind]
+
+    converter = _Converter(kind)
+    # Register before building fields in case a model refers to itself
+    _converters[kind] = converter
+
+    hints = get_type_hints(kind)
+    for field in fields(cast("type[DataclassInstance]", kind)):
+        default: Optional[Callable[[], Any]] = None
+        if field.default is not MISSING:
+            default = cast(Callable[[], Any], lambda value=field.default: value)
+        elif field.default_factory is not MISSING:
+            default = field.default_factory
+
+        to_model, to_json = _build(hints[field.name])
+        converter.fields.append(_Field(field.name, default, to_model, to_json))
+
+    return converter
+
+
+def to_model(kind: type[ModelT], defn: DefinitionPart) -> ModelT:
+    """Convert a compiled definition into an OCSF schema model."""
+    return cast(ModelT, _converter(kind).model(defn))
+
+
+def to_json_dict(kind: type[OcsfModel], defn: DefinitionPart) -> dict[str, Any]:
+    """Convert a compiled definition into a JSON-ready dictionary, as
+    ocsf.schema.to_dict would produce for the equivalent model."""
+    return _converter(kind).json(defn)
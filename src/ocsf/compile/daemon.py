@@ -0,0 +1,312 @@
+"""Keep a compiled schema in memory and serve it over HTTP.
+
+A CompileDaemon reads and compiles a repository once, then watches its files
+for changes and recompiles in the background (see Compilation.recompile()).
+The compiled schema is served as JSON, over TCP on localhost or a Unix socket:
+
+    GET /schema             The whole schema, as ocsf.schema.to_json() would write it
+    GET /<section>/<key>    One part of the schema, like /classes/authentication,
+                            /objects/process or /classes/win/registry_key_query
+    GET /status             The generation, ETag, compile time and last error
+
+Responses are serialized once per compilation and carry an ETag of their
+content, so clients can send If-None-Match and get a 304 Not Modified when
+nothing they asked for changed. Requests are answered from the last successful
+compilation while the next one is running. If a compilation fails (say, a file
+is saved half-written), the previous schema is still served and the error is
+reported in /status until the next successful compilation.
+
+Example:
+```sh
+ocsf-compile serve path/to/ocsf-schema --port 8080
+curl localhost:8080/classes/authentication
+```
+"""
+
+import hashlib
+import json
+import os
+import socketserver
+import threading
+import time
+
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+
+from ocsf.schema import OcsfSchema, to_dict
+from ocsf.repository import (
+    DefinitionFile,
+    Pathlike,
+    Repository,
+    RepoPath,
+    decode,
+    path_defn_t,
+    read_repo,
+    sanitize_path,
+    scan_repo,
+)
+
+from .compiler import Compilation
+from .options import CompilationOptions
+
+
+def _etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def _etag_matches(etag: str, if_none_match: Optional[str]) -> bool:
+    """True if an If-None-Match header lists etag, or is *. The comparison is
+    weak, so W/"x" matches "x"."""
+    if if_none_match is None:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+@dataclass
+class Snapshot:
+    """A compiled schema and its serialized parts."""
+
+    generation: int
+    """Counts the successful compilations, starting with 1."""
+    schema: OcsfSchema
+    data: dict[str, Any]
+    """The schema as ocsf.schema.to_dict() returns it."""
+    body: bytes
+    etag: str
+    compiled_at: float
+    seconds: float
+    """How long the compilation took."""
+    _parts: dict[tuple[str, str], tuple[bytes, str]] = field(default_factory=dict[tuple[str, str], tuple[bytes, str]])
+
+    def part(self, section: str, key: str) -> Optional[tuple[bytes, str]]:
+        """The JSON body and ETag of one part of the schema, or None if there
+        isn't one."""
+        found = self._parts.get((section, key))
+        if found is None:
+            entries = self.data.get(section)
+            if not isinstance(entries, dict) or key not in entries:
+                return None
+            body = json.dumps(entries[key]).encode()
+            found = (body, _etag(body))
+            self._parts[(section, key)] = found
+        return found
+
+
+class CompileDaemon:
+    def __init__(
+        self,
+        path: Pathlike,
+        options: CompilationOptions = CompilationOptions(),
+        interval: float = 1.0,
+        cache_dir: Optional[Pathlike] = None,
+    ):
+        """Args:
+        path: The root directory of the repository.
+        options: Options for the compilation.
+        interval: How often to check the repository for changes, in seconds.
+        cache_dir: A directory in which to cache compiled definitions between
+            runs of the daemon. See ocsf.compile.cache.
+        """
+        self._path = os.fspath(path)
+        self._options = options
+        self._interval = interval
+        self._cache_dir = cache_dir
+        self._repo: Optional[Repository] = None
+        self._compilation: Optional[Compilation] = None
+        self._snapshot: Optional[Snapshot] = None
+        self._error: Optional[str] = None
+        # (mtime, size) of each definition file when it was last read
+        self._stamps: dict[str, tuple[int, int]] = {}
+        # Paths changed in the repository that haven't been compiled yet
+        self._pending: set[RepoPath] = set()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+
+    @property
+    def snapshot(self) -> Optional[Snapshot]:
+        """The last successful compilation, if there has been one."""
+        return self._snapshot
+
+    @property
+    def error(self) -> Optional[str]:
+        """The error of the last compilation, if it failed."""
+        return self._error
+
+    def _scan(self) -> dict[str, tuple[int, int]]:
+        stamps: dict[str, tuple[int, int]] = {}
+        for file in scan_repo(self._path):
+            try:
+                stat = os.stat(file)
+            except FileNotFoundError:
+                continue
+            stamps[file] = (stat.st_mtime_ns, stat.st_size)
+        return stamps
+
+    def _publish(self, schema: OcsfSchema, seconds: float) -> None:
+        data = to_dict(schema)
+        body = json.dumps(data).encode()
+        generation = self._snapshot.generation + 1 if self._snapshot is not None else 1
+        self._snapshot = Snapshot(generation, schema, data, body, _etag(body), time.time(), seconds)
+
+    def check(self) -> bool:
+        """Compile the repository if it hasn't been compiled, or recompile it
+        if its files changed since the last check. Returns True if a new
+        schema was compiled."""
+        with self._lock:
+            start = time.perf_counter()
+            stamps = self._scan()
+
+            try:
+                if self._repo is None or self._compilation is None:
+                    self._stamps = stamps
+                    self._repo = read_repo(self._path)
+                    self._compilation = Compilation(self._repo, self._options, cache_dir=self._cache_dir)
+                    schema = self._compilation.build()
+                else:
+                    changed = [file for file, stamp in stamps.items() if self._stamps.get(file) != stamp]
+                    removed = [file for file in self._stamps if file not in stamps]
+                    if len(changed) == 0 and len(removed) == 0 and len(self._pending) == 0:
+                        return False
+
+                    # Forget files as they're read, so that a file that fails
+                    # to read is tried again at the next check
+                    for file in removed:
+                        path = sanitize_path(file)
+                        if path in self._repo:
+                            del self._repo[path]
+                        self._pending.add(path)
+                        del self._stamps[file]
+                    for file in changed:
+                        self._stamps.pop(file, None)
+                        path = sanitize_path(file)
+                        with open(file) as f:
+                            data = decode(path_defn_t(path), json.loads(f.read()))
+                        self._repo[path] = DefinitionFile(path, data=data)
+                        self._pending.add(path)
+                        self._stamps[file] = stamps[file]
+
+                    schema = self._compilation.recompile(self._pending)
+
+            except Exception as e:
+                self._error = f"{type(e).__name__}: {e}"
+                return False
+
+            self._pending.clear()
+            self._error = None
+            self._publish(schema, time.perf_counter() - start)
+            return True
+
+    def _watch(self) -> None:
+        while not self._stopped.wait(self._interval):
+            self.check()
+
+    def start(self) -> None:
+        """Compile the repository, and start checking it for changes in a
+        background thread."""
+        self.check()
+        self._stopped.clear()
+        self._watcher = threading.Thread(target=self._watch, name="ocsf-compile-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop(self) -> None:
+        """Stop checking the repository for changes."""
+        self._stopped.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+    def status(self) -> dict[str, Any]:
+        snapshot = self._snapshot
+        return {
+            "generation": snapshot.generation if snapshot is not None else 0,
+            "etag": snapshot.etag if snapshot is not None else None,
+            "compiled_at": snapshot.compiled_at if snapshot is not None else None,
+            "seconds": snapshot.seconds if snapshot is not None else None,
+            "error": self._error,
+        }
+
+    def server(self, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+        """An HTTP server for the schema on host and port. Call its
+        serve_forever() to handle requests. A port of 0 picks a free port; see
+        server.server_address."""
+        return _TCPServer((host, port), _handler(self, tcp=True))
+
+    def unix_server(self, socket_path: str) -> socketserver.UnixStreamServer:
+        """An HTTP server for the schema on a Unix socket at socket_path."""
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        return _UnixServer(socket_path, _handler(self, tcp=False))
+
+
+class _TCPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class _Handler(BaseHTTPRequestHandler):
+    daemon: CompileDaemon
+    # Keep connections open between requests
+    protocol_version = "HTTP/1.1"
+
+    def _send(self, status: HTTPStatus, body: bytes, etag: Optional[str] = None) -> None:
+        if etag is not None and _etag_matches(etag, self.headers.get("If-None-Match")):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if etag is not None:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status: HTTPStatus, message: str) -> None:
+        self._send(status, json.dumps({"error": message}).encode())
+
+    def do_GET(self) -> None:
+        path = self.path.split("?", 1)[0].strip("/")
+
+        if path == "status":
+            self._send(HTTPStatus.OK, json.dumps(self.daemon.status()).encode())
+            return
+
+        snapshot = self.daemon.snapshot
+        if snapshot is None:
+            self._error(HTTPStatus.SERVICE_UNAVAILABLE, self.daemon.error or "The schema hasn't been compiled yet")
+            return
+
+        if path == "schema":
+            self._send(HTTPStatus.OK, snapshot.body, snapshot.etag)
+            return
+
+        section, _, key = path.partition("/")
+        part = snapshot.part(section, key) if key != "" else None
+        if part is None:
+            self._error(HTTPStatus.NOT_FOUND, f"{self.path} not found")
+            return
+
+        self._send(HTTPStatus.OK, *part)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+def _handler(daemon: CompileDaemon, tcp: bool) -> type[_Handler]:
+    # Headers and body are written separately, so without TCP_NODELAY small
+    # responses wait on delayed ACKs. Unix sockets have nothing to disable.
+    return type("Handler", (_Handler,), {"daemon": daemon, "disable_nagle_algorithm": tcp})
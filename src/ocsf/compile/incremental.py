@@ -0,0 +1,142 @@
+"""Helpers for recompiling a schema after some of its files have changed.
+
+A file has to be recompiled if the files it was compiled from changed. The
+operations from analysis describe most of those dependencies: an operation on
+a target reads its prerequisite (the base of an `extends`, an `$include`, the
+dictionary, categories, an extension's copy of a file, etc). Changes that the
+operations don't describe are handled separately:
+
+ - A changed extension.json is read by operations on every file in the
+   extension, so all of them are affected.
+ - Operations that modify their prerequisite as well as their target (see
+   Operation.writes_prerequisite) tie the two files together.
+ - State shared by all of a planner's operations, like the map of extension
+   type names, is compared with Planner.fingerprint() after recompiling.
+
+See Compilation.recompile().
+"""
+
+from dataclasses import fields
+from typing import Any, Iterable
+
+from ocsf.repository import RepoPath, RepoPaths, SpecialFiles, extension
+
+from .planners.planner import Operation
+
+FileOperations = dict[RepoPath, list[Operation]]
+
+
+def op_key(op: Operation) -> tuple[Any, ...]:
+    """A key that is equal for equivalent operations from different analyses.
+
+    Fields that refer to a planner's shared state (like the map of a
+    PrefixTypeOp) are left out; that state is compared separately.
+    """
+    values = (getattr(op, field.name) for field in fields(op))
+    return (type(op), *(value for value in values if value is None or isinstance(value, (str, int, bool))))
+
+
+def stateful(op: Operation) -> bool:
+    """True if op refers to its planner's shared state (a field that op_key()
+    leaves out)."""
+    values = (getattr(op, field.name) for field in fields(op))
+    return any(value is not None and not isinstance(value, (str, int, bool)) for value in values)
+
+
+def _by_target(operations: list[FileOperations]) -> dict[RepoPath, list[tuple[int, tuple[Any, ...]]]]:
+    found: dict[RepoPath, list[tuple[int, tuple[Any, ...]]]] = {}
+    for n, phase in enumerate(operations):
+        for target, ops in phase.items():
+            if target not in found:
+                found[target] = []
+            found[target].extend((n, op_key(op)) for op in ops)
+    return found
+
+
+def affected(
+    old: list[FileOperations], new: list[FileOperations], changed: Iterable[RepoPath], paths: Iterable[RepoPath]
+) -> set[RepoPath]:
+    """Find the files whose compiled result may differ after the files in
+    changed were changed, given the analysis before (old) and after (new) the
+    change and all of the paths in the repository (before and after).
+    """
+    found: set[RepoPath] = set(changed)
+    paths = set(paths)
+
+    # Files whose operations changed, for example because a file they include
+    # was added or removed
+    old_ops = _by_target(old)
+    new_ops = _by_target(new)
+    for target in old_ops.keys() | new_ops.keys():
+        if old_ops.get(target) != new_ops.get(target):
+            found.add(target)
+
+    # Every file in an extension whose extension.json changed
+    for path in list(found):
+        extn = extension(path)
+        if extn is not None and path.endswith(SpecialFiles.EXTENSION.value):
+            prefix = "/".join((RepoPaths.EXTENSIONS.value, extn, ""))
+            found.update(p for p in paths | old_ops.keys() | new_ops.keys() if p.startswith(prefix))
+
+    # Everything that depends on an affected file, in either analysis
+    dependents: dict[RepoPath, set[RepoPath]] = {}
+    for operations in (old, new):
+        for phase in operations:
+            for target, ops in phase.items():
+                for op in ops:
+                    if op.prerequisite is not None and op.prerequisite != target:
+                        dependents.setdefault(op.prerequisite, set()).add(target)
+                        if op.writes_prerequisite:
+                            dependents.setdefault(target, set()).add(op.prerequisite)
+
+    stack = list(found)
+    while len(stack) > 0:
+        path = stack.pop()
+        for dependent in dependents.get(path, ()):
+            if dependent not in found:
+                found.add(dependent)
+                stack.append(dependent)
+
+    return found
+
+
+def modifiers(operations: list[FileOperations]) -> dict[RepoPath, list[Operation]]:
+    """Map each file to the operations that modify it, in analysis order."""
+    modified: dict[RepoPath, list[Operation]] = {}
+    for phase in operations:
+        for target, ops in phase.items():
+            modified.setdefault(target, []).extend(ops)
+            for op in ops:
+                if op.writes_prerequisite and op.prerequisite is not None:
+                    modified.setdefault(op.prerequisite, []).append(op)
+    return modified
+
+
+def closure(operations: list[FileOperations], targets: Iterable[RepoPath]) -> set[RepoPath]:
+    """Find the targets along with every file they depend on (directly or
+    indirectly) that is modified while compiling. Applying the operations that
+    modify just these files (see modifies()), in plan order, compiles the
+    targets exactly as a full compilation would.
+    """
+    return walk(modifiers(operations), targets)
+
+
+def walk(modified: dict[RepoPath, list[Operation]], targets: Iterable[RepoPath]) -> set[RepoPath]:
+    """closure(), given the result of modifiers()."""
+    found = set(targets)
+    stack = list(found)
+    while len(stack) > 0:
+        path = stack.pop()
+        for op in modified.get(path, ()):
+            if op.prerequisite is None or op.prerequisite in found:
+                continue
+            if op.prerequisite in modified or op.writes_prerequisite:
+                found.add(op.prerequisite)
+                stack.append(op.prerequisite)
+
+    return found
+
+
+def modifies(op: Operation, paths: set[RepoPath]) -> bool:
+    """True if op modifies any of paths."""
+    return op.target in paths or (op.writes_prerequisite and op.prerequisite in paths)
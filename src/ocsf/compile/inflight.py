@@ -0,0 +1,60 @@
+"""Share one run of a coroutine among concurrent callers.
+
+Example:
+```python
+builds: InFlight[OcsfSchema] = InFlight()
+# Concurrent calls with the same key await the same build
+schema = await builds.run(path, lambda: build(path))
+```
+"""
+
+import asyncio
+
+from typing import Any, Awaitable, Callable, Generic, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class InFlight(Generic[T]):
+    def __init__(self):
+        # (event loop, key) -> (task, number of callers awaiting it)
+        self._tasks: dict[tuple[Any, Hashable], tuple[asyncio.Task[T], int]] = {}
+
+    def __len__(self) -> int:
+        """The number of runs in progress."""
+        return len(self._tasks)
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        """Await the coroutine from factory(), or, if a run with the same key is
+        already in progress, its result.
+
+        Cancelling a caller only cancels the run if no other caller is still
+        awaiting it. Once a run is finished, the next call with its key starts
+        a new one.
+        """
+        slot = (asyncio.get_running_loop(), key)
+        # A finished task may not have run its done callback yet
+        if slot in self._tasks and not self._tasks[slot][0].done():
+            task, waiters = self._tasks[slot]
+        else:
+
+            async def call() -> T:
+                return await factory()
+
+            task, waiters = asyncio.ensure_future(call()), 0
+            task.add_done_callback(lambda _: self._finished(slot, task))
+        self._tasks[slot] = (task, waiters + 1)
+
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done() and self._tasks.get(slot, (None, 0))[1] == 1:
+                task.cancel()
+            raise
+        finally:
+            if slot in self._tasks and self._tasks[slot][0] is task:
+                self._tasks[slot] = (task, self._tasks[slot][1] - 1)
+
+    def _finished(self, slot: tuple[Any, Hashable], task: "asyncio.Task[T]") -> None:
+        if slot in self._tasks and self._tasks[slot][0] is task:
+            del self._tasks[slot]
@@ -1,12 +1,79 @@
 from copy import deepcopy
 from dataclasses import dataclass
-from typing import get_type_hints, cast, Optional, Any
+from types import UnionType
+from typing import get_args, get_origin, get_type_hints, cast, Optional, Any, Union
 
 from ocsf.repository.definitions import DefinitionPart
 
 FieldList = list[str | tuple[str, ...]]
 
 
+class _FieldTrie:
+    """allowed_fields or ignored_fields compiled into a prefix trie.
+
+    Walking the trie along a path (see _enter()) gives True if the field at
+    the path and everything nested under it may be updated, False if none of
+    it may, or the node to continue from if that depends on what comes next.
+    """
+
+    __slots__ = ("allow", "matched", "children")
+
+    def __init__(self, allow: bool):
+        # True for allowed_fields, False for ignored_fields
+        self.allow = allow
+        # True if a rule ends here
+        self.matched = False
+        self.children: dict[str, _FieldTrie] = {}
+
+
+# The result of walking a _FieldTrie along a path
+_Rules = Union[bool, _FieldTrie]
+
+_tries: dict[tuple[bool, tuple[tuple[str, ...], ...]], _FieldTrie] = {}
+
+
+def _compile_fields(fields: FieldList, allow: bool) -> _FieldTrie:
+    """The trie for a list of fields. Callers pass the same few lists over and
+    over, so tries are built once per list."""
+    rules = tuple(field if isinstance(field, tuple) else (field,) for field in fields)
+    key = (allow, rules)
+    trie = _tries.get(key)
+    if trie is None:
+        trie = _FieldTrie(allow)
+        for rule in rules:
+            node = trie
+            for name in rule:
+                if name not in node.children:
+                    node.children[name] = _FieldTrie(allow)
+                node = node.children[name]
+            node.matched = True
+        _tries[key] = trie
+    return trie
+
+
+def _enter(rules: _Rules, name: str) -> _Rules:
+    """Walk one step further along a path."""
+    if isinstance(rules, bool):
+        return rules
+
+    node = rules.children.get(name)
+    if node is None:
+        # No rule starts with the path
+        return not rules.allow
+    if node.matched:
+        # A rule is a prefix of the path, and so of everything nested under it
+        return rules.allow
+    return node
+
+
+def _permits(rules: _Rules) -> bool:
+    """True if the field at the end of the path walked so far may be updated."""
+    if isinstance(rules, bool):
+        return rules
+    # No rule is a prefix of the path itself
+    return not rules.allow
+
+
 @dataclass
 class MergeOptions:
     overwrite: Optional[bool] = None
@@ -22,16 +89,46 @@ class MergeOptions:
     """Add missing dictionary items from right to left if True"""
 
     copy: bool = True
-    """If True, always merge a copy of the right value rather than a reference"""
+    """If True, insert copies of right values into left rather than references.
+    Only the values actually inserted are copied."""
 
     overwrite_none: bool = False
     """If True, overwrite left with right even if right is None"""
 
     merge_lists: bool = True
-    """If True, merge lists by combining their unique elements"""
+    """If True, merge lists by combining their unique elements. Lists are merged
+    even in fields excluded by allowed_fields or ignored_fields."""
+
+    track: bool = True
+    """If False, don't collect the paths of updated properties; merge() returns an empty list"""
+
+    def rules(self) -> _Rules:
+        """allowed_fields, or if it's None ignored_fields, as a prefix trie."""
+        if self.allowed_fields is not None:
+            trie = _compile_fields(self.allowed_fields, True)
+        elif self.ignored_fields is not None:
+            trie = _compile_fields(self.ignored_fields, False)
+        else:
+            return True
+        return trie.allow if trie.matched else trie
+
+
+def _change_field(left_value: Any, right_value: Any, options: MergeOptions) -> bool:
+    # If overwrite is True, we'll always update the left value.
+    if options.overwrite and options.overwrite_none:
+        return True
+
+    elif options.overwrite and not options.overwrite_none and right_value is not None:
+        return True
 
+    # Otherwise, we'll only update the left value if it's None.
+    else:
+        return left_value is None and right_value is not None
 
-def _can_update(path: tuple[str, ...], left_value: Any, right_value: Any, options: MergeOptions) -> bool:
+
+def _can_update(  # pyright: ignore[reportUnusedFunction]
+    path: tuple[str, ...], left_value: Any, right_value: Any, options: MergeOptions
+) -> bool:
     """Helper function to decide if a value should be updated.
 
     Below are truth tables showing the logic of this function.
@@ -70,55 +167,81 @@ def _can_update(path: tuple[str, ...], left_value: Any, right_value: Any, option
 
     """
 
-    update: Optional[bool] = None
+    rules = options.rules()
+    for name in path:
+        rules = _enter(rules, name)
 
-    def change_field():
-        # If overwrite is True, we'll always update the left value.
-        if options.overwrite and options.overwrite_none:
-            return True
+    return _permits(rules) and _change_field(left_value, right_value, options)
 
-        elif options.overwrite and not options.overwrite_none and right_value is not None:
-            return True
 
-        # Otherwise, we'll only update the left value if it's None.
-        else:
-            return left_value is None and right_value is not None
-
-    # Narrow the update to specific white-listed fields if
-    # allowed_fields is set.
-    if options.allowed_fields is not None:
-        update = False
-
-        for allow in options.allowed_fields:
-            if isinstance(allow, tuple):
-                if path[: len(allow)] == allow:
-                    update = change_field()
-            else:
-                if path[0] == allow:
-                    update = change_field()
-
-            if update:
-                break
-
-    # Skip black-listed fields if ignored_fields is set.
-    elif options.ignored_fields is not None:
-        for deny in options.ignored_fields:
-            if isinstance(deny, tuple):
-                if path[: len(deny)] == deny:
-                    update = False
-                    break
-            else:
-                if path[0] == deny:
-                    update = False
-                    break
-
-    if update is None:
-        update = change_field()
-
-    return update
+MergeResult = list[tuple[str, ...]]
 
+# The fields of a left operand's class that a right operand's class has, in
+# order, each with whether it may hold a dict, list or DefinitionPart (as
+# opposed to only scalars), and whether merging it may merge a list (see
+# _may_merge_list()).
+_FieldTable = tuple[tuple[str, bool, bool], ...]
+
+_tables: dict[tuple[type, type], _FieldTable] = {}
 
-MergeResult = list[tuple[str, ...]]
+
+def _may_nest(hint: Any) -> bool:
+    """True if a field with this type hint may hold a dict, list or DefinitionPart."""
+    if hint is Any:
+        return True
+
+    origin = get_origin(hint)
+    if origin is Union or origin is UnionType:
+        return any(_may_nest(arg) for arg in get_args(hint))
+    if origin is dict or origin is list:
+        return True
+
+    return isinstance(hint, type) and issubclass(hint, (DefinitionPart, dict, list))
+
+
+def _may_merge_list(hint: Any, seen: frozenset[type] = frozenset()) -> bool:
+    """True if merging a field with this type hint may merge a list, either
+    the field itself or a field of a DefinitionPart under it. Lists are merged
+    whatever the allowed and ignored fields are, so only fields for which this
+    is False can be skipped when the rules reject them."""
+    if hint is Any or hint is list or hint is dict:
+        return True
+
+    origin = get_origin(hint)
+    if origin is Union or origin is UnionType:
+        return any(_may_merge_list(arg, seen) for arg in get_args(hint))
+    if origin is list:
+        return True
+    if origin is dict:
+        args = get_args(hint)
+        return len(args) != 2 or _may_merge_list(args[1], seen)
+
+    if isinstance(hint, type) and issubclass(hint, DefinitionPart):
+        if hint in seen:
+            return False
+        return any(_may_merge_list(h, seen | {hint}) for h in get_type_hints(hint).values())
+
+    return False
+
+
+def _build_table(left: DefinitionPart, right: DefinitionPart) -> _FieldTable:
+    return tuple(
+        (name, _may_nest(hint), _may_merge_list(hint))
+        for name, hint in get_type_hints(left).items()
+        if hasattr(right, name)
+    )
+
+
+def _fields(left: DefinitionPart, right: DefinitionPart) -> _FieldTable:
+    """The field table for merging right into left. get_type_hints() is slow
+    and gives the same answer for every instance of a class, so tables are
+    built once per pair of classes."""
+    key = (type(left), type(right))
+    table = _tables.get(key)
+    if table is None:
+        table = _build_table(left, right)
+        _tables[key] = table
+    return table
 
 
 def merge(
@@ -128,14 +251,12 @@ def merge(
     *,
     allowed_fields: Optional[FieldList] = None,
     ignored_fields: Optional[FieldList] = None,
+    track: Optional[bool] = None,
     options: Optional[MergeOptions] = None,
     trail: tuple[str, ...] = tuple(),
 ) -> MergeResult:
     """Merge the right definition into the left definition."""
 
-    # This will be a list of all paths of properties that were updated.
-    results: MergeResult = []
-
     if options is None:
         options = MergeOptions()
 
@@ -146,71 +267,109 @@ def merge(
         options.allowed_fields = allowed_fields
     if ignored_fields is not None:
         options.ignored_fields = ignored_fields
+    if track is not None:
+        options.track = track
+
+    rules = options.rules()
+    for name in trail:
+        rules = _enter(rules, name)
+
+    # This will be a list of all paths of properties that were updated.
+    results: MergeResult = []
+    _merge(left, right, options, trail, rules, results)
+    return results
+
+
+def _merge(
+    left: DefinitionPart,
+    right: DefinitionPart,
+    options: MergeOptions,
+    trail: tuple[str, ...],
+    rules: _Rules,
+    results: MergeResult,
+) -> None:
+    """merge(), with the field rules already walked along trail. Appends the
+    paths it updates to results."""
+    track = options.track
 
     # Now for the money: iterate over all attributes in the left definition and
-    # update where necessary.
-    for attr, _ in get_type_hints(left).items():
-        # If the attribute isn't in the right operand, there's nothing to do.
-        if hasattr(right, attr):
-            path = trail + (attr,)
-
-            left_value = getattr(left, attr)
-            right_value = getattr(right, attr)
-            if options.copy:
-                right_value = deepcopy(right_value)
-            simple = True
-
-            # Recursively merge dictionaries
-            ################################
-            #
-            if isinstance(left_value, dict) and isinstance(right_value, dict):
-                left_value = cast(dict[Any, Any], left_value)
-                right_value = cast(dict[Any, Any], right_value)
-
-                if len(right_value) > 0:
-                    simple = False
-
-                    for key, value in right_value.items():
-                        next_path = path + (key,)
-                        if key not in left_value:
-                            if options.add_dict_items and _can_update(next_path, None, value, options):
-                                left_value[key] = value
-                                results.append(next_path)
-                        elif isinstance(left_value[key], DefinitionPart) and isinstance(value, DefinitionPart):
-                            results += merge(left_value[key], value, options=options, trail=next_path)
-                        # elif isinstance(left_value[key], list) and isinstance(value, list):
-                        #    left_value[key] = list(set(left_value[key] + value))
-                        #    results.append(next_path)
-                        elif _can_update(path, left_value[key], right_value[key], options):
-                            left_value[key] = value
-                            results.append(next_path)
-
-            elif isinstance(left_value, list) and isinstance(right_value, list) and options.merge_lists:
+    # update where necessary. Attributes that aren't in the right operand are
+    # left out of the field table, as there's nothing to do for them.
+    for attr, nested, lists in _fields(left, right):
+        attr_rules = _enter(rules, attr)
+        if attr_rules is False and not lists:
+            # Nothing at or under this field may be updated
+            continue
+
+        path = trail + (attr,)
+
+        left_value = getattr(left, attr)
+        right_value = getattr(right, attr)
+        simple = True
+
+        # Fields that only hold scalars skip straight to the merge below
+        if not nested:
+            pass
+
+        # Recursively merge dictionaries
+        ################################
+        #
+        elif isinstance(left_value, dict) and isinstance(right_value, dict):
+            left_value = cast(dict[Any, Any], left_value)
+            right_value = cast(dict[Any, Any], right_value)
+
+            if len(right_value) > 0:
                 simple = False
-                # TODO check to see if these can be cast to list[str] - are there any other types of lists in the JSON definitions?
-                left_value = cast(list[Any], left_value)
-                right_value = cast(list[Any], right_value)
-                setattr(left, attr, list(set(left_value + right_value)))
-                results.append(path)
 
-            # Merge DefinitionPart objects (OCSF complex types)
-            ###################################################
-            # If both values are DefinitionPart objects, we'll recursively merge
-            # them using the same options this was invoked with.
-            #
-            elif isinstance(left_value, DefinitionPart) and isinstance(right_value, DefinitionPart):
-                simple = False
-                results += merge(left_value, right_value, options=options, trail=path)
-
-            # Merge everything else
-            #######################
-            # For scalar values, lists, non-DefinitionPart dictionaries and
-            # objects (OCSF complex types), or cases where one side is a
-            # DefinitionPart and the other is None, merge the values according
-            # to the options.
-            #
-            if simple and _can_update(path, left_value, right_value, options):
-                setattr(left, attr, right_value)
+                for key, value in right_value.items():
+                    if key not in left_value:
+                        if (
+                            options.add_dict_items
+                            and _permits(_enter(attr_rules, key))
+                            and _change_field(None, value, options)
+                        ):
+                            left_value[key] = deepcopy(value) if options.copy else value
+                            if track:
+                                results.append(path + (key,))
+                    elif isinstance(left_value[key], DefinitionPart) and isinstance(value, DefinitionPart):
+                        _merge(left_value[key], value, options, path + (key,), _enter(attr_rules, key), results)
+                    # elif isinstance(left_value[key], list) and isinstance(value, list):
+                    #    left_value[key] = list(set(left_value[key] + value))
+                    #    results.append(next_path)
+                    elif _permits(attr_rules) and _change_field(left_value[key], value, options):
+                        left_value[key] = deepcopy(value) if options.copy else value
+                        if track:
+                            results.append(path + (key,))
+
+        elif isinstance(left_value, list) and isinstance(right_value, list) and options.merge_lists:
+            simple = False
+            # TODO check to see if these can be cast to list[str] - are there any other types of lists in the JSON definitions?
+            left_value = cast(list[Any], left_value)
+            right_value = cast(list[Any], right_value)
+            setattr(left, attr, list(set(left_value + right_value)))
+            if track:
                 results.append(path)
 
-    return results
+        # Merge DefinitionPart objects (OCSF complex types)
+        ###################################################
+        # If both values are DefinitionPart objects, we'll recursively merge
+        # them using the same options this was invoked with.
+        #
+        elif isinstance(left_value, DefinitionPart) and isinstance(right_value, DefinitionPart):
+            simple = False
+            _merge(left_value, right_value, options, path, attr_rules, results)
+
+        # Merge everything else
+        #######################
+        # For scalar values, lists, non-DefinitionPart dictionaries and
+        # objects (OCSF complex types), or cases where one side is a
+        # DefinitionPart and the other is None, merge the values according
+        # to the options.
+        #
+        if simple and _permits(attr_rules) and _change_field(left_value, right_value, options):
+            # Scalars are immutable, so only other values need to be copied
+            # (isinstance() checks above leave right_value partially unknown)
+            value = cast(Any, right_value)
+            setattr(left, attr, deepcopy(value) if options.copy and nested else value)
+            if track:
+                results.append(path)
@@ -0,0 +1,146 @@
+"""Apply a compilation plan with several worker processes.
+
+Within a phase most operations modify different files, and only read shared
+files like dictionary.json and categories.json. Operations on a file have to
+wait for the operations on their prerequisite (if it is modified in the same
+phase), so Compilation.order() splits each phase into levels: the files in a
+level depend only on files in earlier levels and can be compiled at the same
+time.
+
+For each level, workers are forked from the compiling process so that they see
+the ProtoSchema as it is when the level starts. Each worker applies the
+operations for a share of the level's files and sends back the files it
+modified, which are copied into the ProtoSchema in plan order. If two workers
+modified the same file, or one worker read a file that another modified, their
+results are discarded and the level is applied serially instead.
+
+Results are identical to applying the plan serially.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_all_start_methods, get_context
+from typing import Optional
+
+from ocsf.repository import DefinitionFile, RepoPath
+
+from .merge import MergeResult
+from .planners.planner import Operation
+from .protoschema import ProtoSchema
+
+# Levels with fewer operations than this are applied serially, as forking and
+# copying files back costs more than it saves.
+MIN_PARALLEL_OPS = 32
+
+# The state of the compilation when a level's workers are forked
+_forked: Optional[tuple[ProtoSchema, list[Operation]]] = None
+
+_ChunkOutput = tuple[list[tuple[int, MergeResult]], list[tuple[int, RepoPath, DefinitionFile]], set[RepoPath]]
+
+
+def can_fork() -> bool:
+    """True if worker processes can be forked on this platform."""
+    return "fork" in get_all_start_methods()
+
+
+def _chunks(level: list[Operation], jobs: int) -> list[list[int]]:
+    """Split a level into at most jobs chunks of similar size. All of the
+    operations on a file are in the same chunk."""
+    targets: dict[RepoPath, list[int]] = {}
+    for i, op in enumerate(level):
+        target = op.target
+        if target not in targets:
+            targets[target] = []
+        targets[target].append(i)
+
+    size = -(-len(level) // jobs)
+    chunks: list[list[int]] = [[]]
+    for indices in targets.values():
+        if len(chunks[-1]) >= size:
+            chunks.append([])
+        chunks[-1].extend(indices)
+
+    return [sorted(chunk) for chunk in chunks]
+
+
+def _apply_chunk(chunk: list[int]) -> _ChunkOutput:
+    assert _forked is not None
+    proto, ops = _forked
+
+    results: list[tuple[int, MergeResult]] = []
+    first: list[tuple[int, RepoPath]] = []
+
+    proto.start_journal()
+    for i in chunk:
+        results.append((i, ops[i].apply(proto)))
+        journal = proto.journal()
+        first.extend((i, path) for path in journal[len(first) :])
+    reads = proto.reads()
+    proto.stop_journal()
+
+    return results, [(i, path, proto.read(path)) for i, path in first], reads
+
+
+def _apply_serial(proto: ProtoSchema, level: list[Operation]) -> list[MergeResult]:
+    results: list[MergeResult] = []
+    for op in level:
+        proto.writer = op
+        results.append(op.apply(proto))
+    proto.writer = None
+    return results
+
+
+def _apply_level(proto: ProtoSchema, level: list[Operation], jobs: int) -> list[MergeResult]:
+    chunks = _chunks(level, jobs)
+    if len(level) < MIN_PARALLEL_OPS or len(chunks) < 2:
+        return _apply_serial(proto, level)
+
+    global _forked
+    _forked = (proto, level)
+    try:
+        with ProcessPoolExecutor(len(chunks), mp_context=get_context("fork")) as pool:
+            outputs = list(pool.map(_apply_chunk, chunks))
+    finally:
+        _forked = None
+
+    owners: dict[RepoPath, int] = {}
+    for n, (_, written, _) in enumerate(outputs):
+        for _, path, _ in written:
+            if owners.setdefault(path, n) != n:
+                # Two workers modified the same file, so neither result can be used
+                return _apply_serial(proto, level)
+
+    for n, (_, _, reads) in enumerate(outputs):
+        for path in reads:
+            if owners.get(path, n) != n:
+                # A worker read a file another worker modified, so it may have
+                # seen the file before or after the change, unlike in the plan
+                return _apply_serial(proto, level)
+
+    results: list[MergeResult] = [[] for _ in level]
+    files: list[tuple[int, RepoPath, DefinitionFile]] = []
+    for chunk_results, written, _ in outputs:
+        for i, result in chunk_results:
+            results[i] = result
+        files.extend(written)
+
+    # Copy files back in the order they were first modified in the plan, so
+    # that files created while compiling are in the same order as they would
+    # be if compiled serially.
+    for i, path, file in sorted(files, key=lambda entry: entry[0]):
+        proto.writer = level[i]
+        proto[path] = file
+    proto.writer = None
+
+    return results
+
+
+def apply_parallel(proto: ProtoSchema, levels: list[list[Operation]], jobs: int) -> list[list[MergeResult]]:
+    """Apply levels of operations to proto, in order, using up to jobs worker
+    processes for each level.
+
+    Returns the result of each operation, in the same shape as levels.
+    """
+    if jobs <= 1 or not can_fork():
+        return [_apply_serial(proto, level) for level in levels]
+
+    return [_apply_level(proto, level, jobs) for level in levels]
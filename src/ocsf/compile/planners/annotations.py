@@ -24,7 +24,9 @@ class AnnotationOp(Operation):
         for name, attr in target.data.attributes.items():
             if isinstance(attr, AttrDefn):
                 for result in merge(
-                    attr, target.data.annotations, options=MergeOptions(overwrite=True, overwrite_none=False)
+                    attr,
+                    target.data.annotations,
+                    options=MergeOptions(overwrite=True, overwrite_none=False, track=schema.track),
                 ):
                     results.append(("attributes", name) + result)
 
@@ -32,6 +34,8 @@ class AnnotationOp(Operation):
 
 
 class AnnotationPlanner(Planner):
+    kinds = DefnWithAnnotations
+
     def analyze(self, input: DefinitionFile) -> Analysis:
         if input.data is not None and isinstance(input.data, DefnWithAnnotations):
             return AnnotationOp(target=input.path)
@@ -29,16 +29,19 @@ class DateTimeOp(Operation):
 
             for name, attr in append.items():
                 data.attributes[name] = attr
-                results.append(("attributes", name))
+                if schema.track:
+                    results.append(("attributes", name))
 
         return results
 
 
 class DateTimePlanner(Planner):
+    kinds = DefnWithAttrs
+
     def analyze(self, input: DefinitionFile) -> Analysis:
         # TODO check that datetime profile is enabled
         if self._options.profiles is None or "datetime" in self._options.profiles:
-            data = self._schema[input.path].data
+            data = self._schema.read(input.path).data
             if isinstance(data, DefnWithAttrs):
                 return DateTimeOp(input.path)
 
@@ -20,7 +20,7 @@ class DictionaryOp(Operation):
             return []
 
         assert self.prerequisite is not None
-        prereq = schema[self.prerequisite]
+        prereq = schema.read(self.prerequisite)
         assert prereq.data is not None
         assert isinstance(prereq.data, DictionaryDefn)
         if prereq.data.attributes is None:
@@ -37,7 +37,7 @@ class DictionaryOp(Operation):
             if isinstance(value, AttrDefn) and key in prereq.data.attributes:
                 right = prereq.data.attributes[key]
                 assert isinstance(right, AttrDefn)
-                rs = merge(value, right)
+                rs = merge(value, right, track=schema.track)
                 for r in rs:
                     results.append(("attributes", key) + r)
 
@@ -48,6 +48,8 @@ class DictionaryOp(Operation):
 
 
 class DictionaryPlanner(Planner):
+    kinds = DefnWithAttrs
+
     def analyze(self, input: DefinitionFile) -> Analysis:
         if input.data is not None:
             if isinstance(input.data, DefnWithAttrs):
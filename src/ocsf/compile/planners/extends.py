@@ -31,14 +31,10 @@ def _find_base(repo: Repository, subject: str, relative_to: RepoPath) -> RepoPat
         idx = rel_path.parts.index(RepoPaths.EVENTS.value)
     prefix = as_path(*rel_path.parts[: idx + 1])
 
-    for file in repo.files():
-        if file.path.startswith(prefix):
-            subj_path = PurePath(file.path)
-            if subj_path.stem == subject:
-                return file.path
-            elif isinstance(file.data, ObjectDefn) or isinstance(file.data, EventDefn):
-                if file.data.name is not None and file.data.name == subject:
-                    return file.path
+    candidates = repo.find_stem(subject) + repo.find(subject, ObjectDefn) + repo.find(subject, EventDefn)
+    for path in repo.ordered(set(candidates)):
+        if path.startswith(prefix):
+            return path
 
     if extension(relative_to) is not None:
         return _find_base(repo, subject, extensionless(relative_to))
@@ -56,13 +52,15 @@ class ExtendsOp(Operation):
         assert target.data is not None
 
         assert self.prerequisite is not None
-        prereq = schema[self.prerequisite]
+        prereq = schema.read(self.prerequisite)
         assert prereq.data is not None
 
-        return merge(target.data, prereq.data)
+        return merge(target.data, prereq.data, track=schema.track)
 
 
 class ExtendsPlanner(Planner):
+    kinds = (ObjectDefn, EventDefn)
+
     def analyze(self, input: DefinitionFile) -> Analysis:
         if input.data is not None:
             if isinstance(input.data, ObjectDefn) or isinstance(input.data, EventDefn):
@@ -1,6 +1,6 @@
 from copy import deepcopy
 from dataclasses import dataclass
-from typing import Optional
+from typing import Any, Iterable, Optional
 
 from ..protoschema import ProtoSchema
 from ..options import CompilationOptions
@@ -19,6 +19,7 @@ from ocsf.repository import (
     ExtensionDefn,
     DefnWithAttrs,
     AttrDefn,
+    RepoPath,
 )
 
 
@@ -41,16 +42,18 @@ class ExtensionModifyOp(Operation):
         effected = schema[self.target]
         assert effected.data is not None
 
-        source = schema[self.prerequisite]
+        source = schema.read(self.prerequisite)
         assert source.data is not None
 
-        return merge(effected.data, source.data)
+        return merge(effected.data, source.data, track=schema.track)
 
     def __str__(self):
         return f"Extension modifies {self.target} <- {self.prerequisite}"
 
 
 class ExtensionMergePlanner(ExtensionPlanner):
+    prefixes = (RepoPaths.EXTENSIONS.value,)
+
     def analyze(self, input: DefinitionFile) -> Analysis:
         # We forcibly initialize this in __init__; this assertion is for the
         # type checker's benefit.
@@ -71,7 +74,7 @@ class ExtensionCopyOp(Operation):
     def apply(self, schema: ProtoSchema) -> MergeResult:
         assert self.prerequisite is not None
 
-        source = schema[self.prerequisite]
+        source = schema.read(self.prerequisite)
         assert source.data is not None
 
         if not isinstance(source.data, DefnWithExtn):
@@ -84,13 +87,15 @@ class ExtensionCopyOp(Operation):
 
         # Here we merge just so that we have a MergeResult. This is slightly
         # inefficient but effective.
-        return merge(dest.data, source.data, overwrite=True)
+        return merge(dest.data, source.data, overwrite=True, track=schema.track)
 
     def __str__(self):
         return f"Extension creates {self.target} <- {self.prerequisite}"
 
 
 class ExtensionCopyPlanner(ExtensionPlanner):
+    prefixes = (RepoPaths.EXTENSIONS.value,)
+
     def analyze(self, input: DefinitionFile) -> Analysis:
         # We forcibly initialize this in __init__; this assertion is for the
         # type checker's benefit.
@@ -108,6 +113,8 @@ class ExtensionCopyPlanner(ExtensionPlanner):
 
 @dataclass(eq=True, frozen=True)
 class MarkExtensionOp(Operation):
+    writes_prerequisite = True
+
     def apply(self, schema: ProtoSchema) -> MergeResult:
         assert self.prerequisite is not None
 
@@ -120,12 +127,12 @@ class MarkExtensionOp(Operation):
         # Look up the source extension name from extension.json (because it may not match the directory)
         extn_dir = extension(self.prerequisite)
         assert extn_dir is not None
-        extn = schema[as_path(RepoPaths.EXTENSIONS, extn_dir, SpecialFiles.EXTENSION)]
+        extn = schema.read(as_path(RepoPaths.EXTENSIONS, extn_dir, SpecialFiles.EXTENSION))
         assert isinstance(extn.data, ExtensionDefn)
         assert extn.data.name is not None
         source.data.src_extension = extn.data.name
 
-        return [("src_extension",)]
+        return [("src_extension",)] if schema.track else []
 
     def __str__(self):
         return f"Extension creates {self.target} <- {self.prerequisite}"
@@ -136,6 +143,8 @@ class MarkExtensionPlanner(ExtensionPlanner):
     extension that introduced it to the schema.
     """
 
+    prefixes = (RepoPaths.EXTENSIONS.value,)
+
     def analyze(self, input: DefinitionFile) -> Analysis:
         assert self._options.extensions is not None
 
@@ -164,7 +173,7 @@ class PrefixKeyOp(Operation):
         if source.data.src_extension is not None:
             assert source.data.name is not None
             source.data.key = "/".join((source.data.src_extension, source.data.name))
-            return [("name",)]
+            return [("name",)] if schema.track else []
 
         return []
 
@@ -188,7 +197,10 @@ class _ExtensionTypeMap:
             return
 
         for path in self._schema.repo.paths():
-            file = self._schema[path]
+            # PrefixKeyOp may prefix a key in the same level as the map is
+            # built, but the map is the same either way, so these reads don't
+            # have to keep parallel workers apart
+            file = self._schema.read(path, journal=False)
             extn = extension(file.path)
             if extn is not None and extn in self._extensions:
                 if (
@@ -252,7 +264,8 @@ class PrefixTypeOp(Operation):
             for name, attr in source.data.attributes.items():
                 if isinstance(attr, AttrDefn) and attr.type is not None and attr.type in self.map:
                     attr.type = self.map[attr.type]
-                    results.append(("attributes", name, "type"))
+                    if schema.track:
+                        results.append(("attributes", name, "type"))
 
         return results
 
@@ -279,3 +292,14 @@ class ExtensionPrefixPlanner(ExtensionPlanner):
             ops.append(PrefixTypeOp(input.path, map=self._map))
 
         return ops
+
+    def fingerprint(self) -> Any:
+        return {name: self._map[name] for name in self._map}
+
+    def shared_paths(self) -> Iterable[RepoPath]:
+        # The map is built from the extensions' files after MarkExtensionOp
+        if self._options.prefix_extensions is False:
+            return []
+
+        assert self._options.extensions is not None
+        return [path for path in self._schema.repo.paths() if extension(path) in self._options.extensions]
@@ -30,11 +30,11 @@ class IncludeOp(Operation):
         assert target.data is not None
 
         assert self.prerequisite is not None
-        prereq = schema[self.prerequisite]
+        prereq = schema.read(self.prerequisite)
         assert prereq.data is not None
 
         allowed: FieldList | None = ["attributes"] if self.in_attrs else None
-        return merge(target.data, prereq.data, allowed_fields=allowed)
+        return merge(target.data, prereq.data, allowed_fields=allowed, track=schema.track)
 
 
 def _find_dependency(repo: Repository, subject: str, relative_to: Optional[RepoPath] = None) -> RepoPath | None:
@@ -71,6 +71,8 @@ def _find_dependency(repo: Repository, subject: str, relative_to: Optional[RepoP
 
 
 class IncludePlanner(Planner):
+    kinds = DefnWithAttrs
+
     def analyze(self, input: DefinitionFile) -> Analysis:
         if input.data is not None:
             found: list[Operation] = []
@@ -81,7 +83,10 @@ class IncludePlanner(Planner):
                     else:
                         includes = input.data.include_
 
-                    input.data.include_ = None
+                    # Drop the directive from the compiled file, not the repository's copy
+                    compiled = self._schema[input.path].data
+                    assert isinstance(compiled, DefnWithInclude)
+                    compiled.include_ = None
 
                     for include in includes:
                         location = _find_dependency(self._schema.repo, include, input.path)
@@ -102,6 +107,8 @@ class IncludePlanner(Planner):
                         if location is not None:
                             found.append(IncludeOp(input.path, location, in_attrs=True))
 
-                    del input.data.attributes["include_"]
+                    compiled = self._schema[input.path].data
+                    assert isinstance(compiled, DefnWithAttrs) and compiled.attributes is not None
+                    del compiled.attributes["include_"]
 
             return found
@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Optional
+from typing import Any, Optional
 
 from ..protoschema import ProtoSchema
 from ..merge import MergeResult
@@ -71,14 +71,17 @@ class ObjectTypeOp(Operation):
                         else:
                             raise ValueError(f"Unknown object type {attr.type}")
 
-                        results.append(("attributes", name, "type"))
-                        results.append(("attributes", name, "object_type"))
-                        results.append(("attributes", name, "object_name"))
+                        if schema.track:
+                            results.append(("attributes", name, "type"))
+                            results.append(("attributes", name, "object_type"))
+                            results.append(("attributes", name, "object_name"))
 
         return results
 
 
 class ObjectTypePlanner(Planner):
+    kinds = DefnWithAttrs
+
     def __init__(self, schema: ProtoSchema, options: CompilationOptions):
         super().__init__(schema, options)
         self._types = _Types(schema)
@@ -90,3 +93,6 @@ class ObjectTypePlanner(Planner):
         if input.data is not None:
             if isinstance(input.data, DefnWithAttrs):
                 return ObjectTypeOp(input.path, types=self._types)
+
+    def fingerprint(self) -> Any:
+        return self._types.objects(), self._types.events()
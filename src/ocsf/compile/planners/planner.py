@@ -1,6 +1,7 @@
 from abc import ABC
 from dataclasses import dataclass
-from typing import Optional
+from types import UnionType
+from typing import Any, ClassVar, Iterable, Optional
 
 from ocsf.repository import DefinitionFile, RepoPath
 
@@ -14,6 +15,9 @@ class Operation(ABC):
     target: RepoPath
     prerequisite: Optional[RepoPath] = None
 
+    writes_prerequisite: ClassVar[bool] = False
+    """True if the operation modifies its prerequisite as well as its target."""
+
     def apply(self, schema: ProtoSchema) -> MergeResult:
         raise NotImplementedError()
 
@@ -22,9 +26,28 @@ Analysis = Operation | list[Operation] | None
 
 
 class Planner(ABC):
+    kinds: ClassVar[Optional[type | UnionType | tuple[type, ...]]] = None
+    """The kinds of definitions this planner analyzes (anything isinstance()
+    accepts), or None for all kinds."""
+
+    prefixes: ClassVar[Optional[tuple[str, ...]]] = None
+    """The path prefixes of files this planner analyzes, or None for all paths."""
+
     def __init__(self, schema: ProtoSchema, options: CompilationOptions):
         self._schema = schema
         self._options = options
 
     def analyze(self, input: DefinitionFile) -> Analysis:
         raise NotImplementedError()
+
+    def fingerprint(self) -> Any:
+        """A comparable summary of any state this planner's operations read
+        other than their target and prerequisite, or None if there is none.
+        Compilation.recompile() recompiles everything if it changes."""
+        return None
+
+    def shared_paths(self) -> Iterable[RepoPath]:
+        """The files whose compiled state this planner's operations read, other
+        than their target and prerequisite. Compilation.build_target() compiles
+        them along with the target."""
+        return ()
@@ -29,14 +29,15 @@ class ExcludeProfileAttrsOp(Operation):
         if target.data.attributes is None:
             return result
 
-        profile = schema[self.prerequisite]
+        profile = schema.read(self.prerequisite)
         assert profile.data is not None
         assert isinstance(profile.data, ProfileDefn)
 
         if profile.data.attributes is not None:
             for attr in profile.data.attributes:
                 if attr in target.data.attributes:
-                    result.append(("attributes", attr))
+                    if schema.track:
+                        result.append(("attributes", attr))
                     del target.data.attributes[attr]
 
         return result
@@ -64,7 +65,8 @@ class MarkProfileOp(Operation):
 
         for name, attr in target.data.attributes.items():
             if isinstance(attr, AttrDefn):
-                result.append(("attributes", name, "profile"))
+                if schema.track:
+                    result.append(("attributes", name, "profile"))
                 attr.profile = target.data.name
 
         return result
@@ -101,6 +103,8 @@ def _find_profile(schema: ProtoSchema, profile_ref: str, relative_to: str) -> st
 
 
 class ExcludeProfileAttrsPlanner(Planner):
+    kinds = (ObjectDefn, EventDefn)
+
     def __init__(self, schema: ProtoSchema, options: CompilationOptions):
         if options.profiles is None:
             options.profiles = list(schema.repo.profiles())
@@ -128,6 +132,8 @@ class ExcludeProfileAttrsPlanner(Planner):
 
 
 class MarkProfilePlanner(ExcludeProfileAttrsPlanner):
+    kinds = ProfileDefn
+
     def analyze(self, input: DefinitionFile) -> Analysis:
         assert self._options.profiles is not None
 
@@ -27,7 +27,7 @@ class SetCategoryOp(Operation):
 
         category = path[path.index(RepoPaths.EVENTS.value) + 1]
 
-        categories = schema[SpecialFiles.CATEGORIES].data
+        categories = schema.read(SpecialFiles.CATEGORIES).data
         assert isinstance(categories, CategoriesDefn)
         if not isinstance(categories.attributes, dict):
             raise ValueError(f"categories.json file is missing attributes")
@@ -37,10 +37,12 @@ class SetCategoryOp(Operation):
             return []
 
         target.data.category = category
-        return [("category",)]
+        return [("category",)] if schema.track else []
 
 
 class SetCategoryPlanner(Planner):
+    kinds = EventDefn
+
     def analyze(self, input: DefinitionFile) -> Analysis:
         if input.data is not None and isinstance(input.data, EventDefn) and input.data.category is None:
             return SetCategoryOp(target=input.path, prerequisite=SpecialFiles.CATEGORIES)
@@ -18,16 +18,10 @@ from ocsf.repository import (
 
 
 def _find_extn_path(schema: ProtoSchema, target: str) -> str | None:
-    for extn_dir in schema.repo.extensions():
-        if extn_dir == target:
-            return extn_dir
+    if schema.repo.has_extension(target):
+        return target
 
-        extn = schema[as_path(RepoPaths.EXTENSIONS, extn_dir, SpecialFiles.EXTENSION)]
-        assert isinstance(extn.data, ExtensionDefn)
-        if extn.data.name == target:
-            return extn_dir
-
-    return None
+    return schema.repo.find_extension(target)
 
 
 @dataclass(eq=True, frozen=True)
@@ -49,7 +43,7 @@ class UidOp(Operation):
             if extn_dir is None:
                 raise ValueError(f"Extension {defn.src_extension} not found for {self.target}")
 
-            extn = schema[as_path(RepoPaths.EXTENSIONS, extn_dir, SpecialFiles.EXTENSION)]
+            extn = schema.read(as_path(RepoPaths.EXTENSIONS, extn_dir, SpecialFiles.EXTENSION))
             assert isinstance(extn.data, ExtensionDefn)
             if extn.data.uid is not None:
                 extn_uid = extn.data.uid
@@ -57,7 +51,7 @@ class UidOp(Operation):
         # Find the category UID and build the category_uid enum
         cat_uid = 0
         if defn.category is not None:
-            cats = schema[as_path(SpecialFiles.CATEGORIES)].data
+            cats = schema.read(as_path(SpecialFiles.CATEGORIES)).data
             assert isinstance(cats, CategoriesDefn)
             if cats.attributes is None:
                 return []
@@ -129,6 +123,7 @@ class UidOp(Operation):
             enums,
             overwrite=True,
             allowed_fields=[("uid", ), ("attributes", "category_uid"), ("attributes", "class_uid"), ("attributes", "type_uid")],
+            track=schema.track,
         )
 
     def __str__(self):
@@ -136,6 +131,8 @@ class UidOp(Operation):
 
 
 class UidPlanner(Planner):
+    kinds = EventDefn
+
     def analyze(self, input: DefinitionFile) -> Analysis:
         if isinstance(input.data, EventDefn):
             return UidOp(input.path, SpecialFiles.CATEGORIES)
@@ -26,7 +26,8 @@ class IdSiblingOp(Operation):
                 assert isinstance(data.attributes["category_name"], AttrDefn)
                 assert data.attributes["category_name"].description is not None
                 data.attributes["category_name"].description = data.attributes["category_name"].description[:-1] + f": <code>{cat.caption}</code>."
-                results.append(("attributes", "category_name", "description"))
+                if schema.track:
+                    results.append(("attributes", "category_name", "description"))
 
             if "class_uid" in data.attributes and "class_name" in data.attributes:
                 assert isinstance(data.attributes["class_uid"], AttrDefn)
@@ -36,7 +37,8 @@ class IdSiblingOp(Operation):
                 assert isinstance(data.attributes["class_name"], AttrDefn)
                 assert data.attributes["class_name"].description is not None
                 data.attributes["class_name"].description = data.attributes["class_name"].description[:-1] + f": <code>{cls.caption}</code>."
-                results.append(("attributes", "class_name", "description"))
+                if schema.track:
+                    results.append(("attributes", "class_name", "description"))
 
         return results
 
@@ -44,8 +46,10 @@ class IdSiblingOp(Operation):
 
 
 class IdSiblingPlanner(Planner):
+    kinds = EventDefn
+
     def analyze(self, input: DefinitionFile) -> Analysis:
-        data = self._schema[input.path].data
+        data = self._schema.read(input.path).data
         if isinstance(data, EventDefn):
             return IdSiblingOp(input.path)
 
@@ -0,0 +1,132 @@
+"""Measure where the time (and memory) of a compilation goes.
+
+A Profiler passed to a Compilation records the wall time and number of calls
+of each step (analyze, order, compile, schema), each phase of compile(), each
+planner's analyze(), and each kind of operation's apply(). If tracemalloc is
+tracing, the net bytes allocated by each are recorded too; a Profiler created
+with allocations=True starts and stops tracemalloc when used as a context
+manager.
+
+Phases and operations are only measured when the plan is applied serially;
+with worker processes (see ocsf.compile.parallel) only the compile step is.
+
+Example:
+```python
+profiler = Profiler(allocations=True)
+with profiler:
+    Compilation(repo, profiler=profiler).build()
+print(profiler.report().summary())
+```
+"""
+
+import time
+import tracemalloc
+
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+
+@dataclass
+class ProfileEntry:
+    """The measurements of one thing, like a planner's analyze()."""
+
+    category: str
+    """What was measured: "step", "phase", "analyze" (by planner) or "apply" (by operation)."""
+    name: str
+    calls: int = 0
+    seconds: float = 0.0
+    """Total wall time, including anything measured within it."""
+    allocated: Optional[int] = None
+    """Net bytes allocated (and not freed), if tracemalloc was tracing."""
+
+
+@dataclass
+class ProfileReport:
+    entries: list[ProfileEntry] = field(default_factory=list[ProfileEntry])
+
+    def category(self, category: str) -> list[ProfileEntry]:
+        """The entries in a category, slowest first."""
+        return sorted((e for e in self.entries if e.category == category), key=lambda e: e.seconds, reverse=True)
+
+    def get(self, category: str, name: str) -> Optional[ProfileEntry]:
+        for entry in self.entries:
+            if entry.category == category and entry.name == name:
+                return entry
+        return None
+
+    def summary(self) -> str:
+        """A table of the entries in each category, slowest first."""
+        allocations = any(entry.allocated is not None for entry in self.entries)
+        header = f"{'':<32} {'calls':>8} {'total ms':>10} {'per call µs':>12}"
+        if allocations:
+            header += f" {'alloc KiB':>10}"
+
+        lines: list[str] = []
+        for category in dict.fromkeys(entry.category for entry in self.entries):
+            if len(lines) > 0:
+                lines.append("")
+            lines.append(f"{category:<32}" + header[32:])
+            for entry in self.category(category):
+                line = (
+                    f"  {entry.name:<30} {entry.calls:>8} {entry.seconds * 1000:>10.1f}"
+                    f" {entry.seconds * 1e6 / max(entry.calls, 1):>12.1f}"
+                )
+                if allocations:
+                    line += f" {entry.allocated / 1024:>10.1f}" if entry.allocated is not None else f" {'':>10}"
+                lines.append(line)
+
+        return "\n".join(lines)
+
+
+class _Measurement:
+    def __init__(self, entry: ProfileEntry):
+        self._entry = entry
+        self._start = 0.0
+        self._memory: Optional[int] = None
+
+    def __enter__(self) -> None:
+        self._memory = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+        self._start = time.perf_counter()
+
+    def __exit__(self, *_: Any) -> None:
+        entry = self._entry
+        entry.seconds += time.perf_counter() - self._start
+        entry.calls += 1
+        if self._memory is not None and tracemalloc.is_tracing():
+            entry.allocated = (entry.allocated or 0) + tracemalloc.get_traced_memory()[0] - self._memory
+
+
+class Profiler:
+    def __init__(self, allocations: bool = False):
+        """Args:
+        allocations: If True, trace allocations with tracemalloc while the
+            profiler is used as a context manager. This slows everything down
+            considerably, so compare times from profiles without it.
+        """
+        self._allocations = allocations
+        self._started = False
+        self._entries: dict[tuple[str, str], ProfileEntry] = {}
+
+    def __enter__(self) -> "Profiler":
+        if self._allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started = True
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        if self._started:
+            tracemalloc.stop()
+            self._started = False
+
+    def measure(self, category: str, name: str) -> _Measurement:
+        """A context manager that adds a call, its time and its allocations to
+        the entry for (category, name)."""
+        entry = self._entries.get((category, name))
+        if entry is None:
+            entry = ProfileEntry(category, name)
+            self._entries[(category, name)] = entry
+        return _Measurement(entry)
+
+    def report(self) -> ProfileReport:
+        """The measurements so far, in the order they were first recorded."""
+        return ProfileReport(list(self._entries.values()))
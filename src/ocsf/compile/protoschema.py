@@ -1,11 +1,17 @@
-import dacite
-
 from copy import deepcopy
-from dataclasses import asdict
-from pathlib import PurePath
-from typing import Any, cast
+from dataclasses import fields
+from typing import Any, Callable, Iterable, Iterator, Optional, cast
 
-from ocsf.schema import OcsfSchema, OcsfObject, OcsfEvent, OcsfType, OcsfProfile, OcsfExtension
+from ocsf.schema import (
+    OcsfSchema,
+    OcsfObject,
+    OcsfEvent,
+    OcsfType,
+    OcsfProfile,
+    OcsfExtension,
+    OcsfModel,
+    OcsfVersion,
+)
 from ocsf.repository import (
     Repository,
     ObjectDefn,
@@ -18,44 +24,152 @@ from ocsf.repository import (
     AnyDefinition,
     VersionDefn,
     DefinitionFile,
+    DefinitionPart,
     RepoPath,
     RepoPaths,
     as_path,
     extension,
 )
 
+from .convert import to_model, to_json_dict
+
+
+# (path, section, key) -> previously converted model or None
+Reuse = Callable[[RepoPath, str, str], Optional[OcsfModel]]
+
+
+def clone(value: Any) -> Any:
+    """Copy a definition (or a DefinitionFile) and everything in it.
 
-def _remove_nones(data: dict[str, Any]) -> None:
-    rm: list[str] = []
-    for k, v in data.items():
-        if v is None:
-            rm.append(k)
-        elif isinstance(v, dict):
-            v = cast(dict[str, Any], v)
-            # No need to update data[k] b/c v is a reference to data[k]
-            _remove_nones(v)
+    This is a much cheaper deepcopy for the trees of dataclasses, dicts, lists,
+    and scalars that make up definitions, which never share references.
+    Anything else, like the classes held by a LazyDefinitionFile, is shared.
+    """
+    if isinstance(value, dict):
+        return {k: clone(v) for k, v in cast(dict[Any, Any], value).items()}
 
-    for k in rm:
-        del data[k]
+    if isinstance(value, list):
+        return [clone(v) for v in cast(list[Any], value)]
+
+    if isinstance(value, DefinitionPart):
+        copy = object.__new__(type(value))
+        vars(copy).update({k: clone(v) for k, v in vars(value).items()})
+        return copy
+
+    if isinstance(value, DefinitionFile):
+        # Lazily read files are loaded and copied as a plain DefinitionFile
+        return DefinitionFile(value.path, raw_data=value.raw_data, data=clone(value.data))
+
+    return value
 
 
 class ProtoSchema:
+    """The working state of a compilation.
+
+    Files are copied from the repository on write: `read()` returns the
+    repository's file until something asks for a mutable copy with
+    `schema[path]`, so files that are only ever read are never copied.
+    """
+
     def __init__(self, repo: Repository):
         self.repo = repo
         self._files: dict[RepoPath, DefinitionFile] = {}
+        # Paths of files that were added by operations rather than copied from
+        # the repository, and the writer that created each of them
+        self._created: dict[RepoPath, Any] = {}
+        self.writer: Any = None
+        """The operation being applied, if any. It is recorded as the creator of
+        any files added to the schema. See creator()."""
+        self.track = True
+        """If False, operations don't collect the fields they change and return
+        an empty MergeResult. See Compilation.compile()."""
+        # Paths handed out for modification since start_journal(), if journaling
+        self._journal: Optional[dict[RepoPath, None]] = None
+        # Paths read (or looked up) without copying since start_journal()
+        self._reads: Optional[set[RepoPath]] = None
 
     def __getitem__(self, path: RepoPath) -> DefinitionFile:
+        """Get a mutable copy of a file, copying it from the repository on first access."""
+        if self._journal is not None:
+            self._journal[path] = None
         if path not in self._files:
             if path in self.repo:
-                self._files[path] = deepcopy(self.repo[path])
+                self._files[path] = clone(self.repo[path])
             else:
                 raise KeyError(f"File {path} not found in repository")
         return self._files[path]
 
+    def __contains__(self, path: RepoPath) -> bool:
+        if self._reads is not None:
+            self._reads.add(path)
+        return path in self._files or path in self.repo
+
+    def read(self, path: RepoPath, journal: bool = True) -> DefinitionFile:
+        """Get a file without copying it. The result must not be modified.
+
+        If journal is False, the read isn't recorded by start_journal(). That's
+        only safe if what the caller takes from the file doesn't depend on
+        changes made to it by other operations in the same level.
+        """
+        if journal and self._reads is not None:
+            self._reads.add(path)
+        if path in self._files:
+            return self._files[path]
+        if path in self.repo:
+            return self.repo[path]
+        raise KeyError(f"File {path} not found in repository")
+
+    def is_copied(self, path: RepoPath) -> bool:
+        """True if a file has been copied (or created) for modification."""
+        return path in self._files
+
+    def created(self) -> list[RepoPath]:
+        """The paths of files created while compiling, in the order they were created."""
+        return list(self._created)
+
+    def creator(self, path: RepoPath) -> Any:
+        """The writer that was set when the file at path was created, if any."""
+        return self._created.get(path)
+
+    def sort_created(self, key: Callable[[RepoPath], Any]) -> None:
+        """Reorder the files created while compiling by key(path), which changes
+        the order of paths() (and of the compiled schema)."""
+        self._created = {path: self._created[path] for path in sorted(self._created, key=key)}
+
+    def paths(self) -> Iterable[RepoPath]:
+        """All paths in the schema: those in the repository followed by those created while compiling."""
+        yield from self.repo.paths()
+        yield from self._created
+
+    def start_journal(self) -> None:
+        """Start recording the paths of files that are (or may be) modified,
+        and of files that are read."""
+        self._journal = {}
+        self._reads = set()
+
+    def journal(self) -> list[RepoPath]:
+        """The paths recorded since start_journal(), in the order they were first written."""
+        return list(self._journal) if self._journal is not None else []
+
+    def stop_journal(self) -> list[RepoPath]:
+        """Stop recording and return the recorded paths."""
+        paths = self.journal()
+        self._journal = None
+        self._reads = None
+        return paths
+
+    def reads(self) -> set[RepoPath]:
+        """The paths read with read() or looked up with `in` since start_journal()."""
+        return set(self._reads) if self._reads is not None else set()
+
     def __setitem__(self, path: RepoPath, file: DefinitionFile) -> None:
         # value = deepcopy(value)
+        if self._journal is not None:
+            self._journal[path] = None
         file.path = path
         self._files[path] = file
+        if path not in self.repo and path not in self._created:
+            self._created[path] = self.writer
 
     def object_path(self, name: str) -> RepoPath:
         return as_path(RepoPaths.OBJECTS.value, name, ".json")
@@ -63,22 +177,34 @@ class ProtoSchema:
     def event_path(self, name: str) -> RepoPath:
         default = as_path(RepoPaths.EVENTS.value, name, ".json")
         if default not in self.repo:
-            for file in self.repo.files():
-                if file.path.startswith(RepoPaths.EVENTS.value):
-                    if file.short_name() == name:
-                        return file.path
+            for path in self.repo.find_stem(name):
+                if path.startswith(RepoPaths.EVENTS.value):
+                    return path
         return default
 
     def profile_path(self, name: str) -> RepoPath:
         return as_path(RepoPaths.PROFILES.value, name, ".json")
 
-    def find_object(self, name: str) -> DefinitionFile:
+    def _find_defn(self, name: str, kind: type[ObjectDefn] | type[EventDefn], prefix: str) -> list[RepoPath]:
+        # A key may be prefixed with an extension name, but the name never is.
+        # Unnamed definitions are included because they may have inherited a
+        # name from elsewhere.
+        short = name.split("/")[-1]
+        candidates = self.repo.find(short, kind) + self.repo.find(None, kind) + list(self._created)
+
         found: list[str] = []
-        for file in self._files.values():
-            if file.path.startswith(RepoPaths.OBJECTS.value) and file.data is not None:
-                assert isinstance(file.data, ObjectDefn)
-                if file.data.get_key() == name or file.data.name == name:
-                    found.append(file.path)
+        for path in candidates:
+            if path.startswith(prefix):
+                file = self.read(path)
+                if file.data is not None:
+                    assert isinstance(file.data, kind)
+                    if file.data.get_key() == name or file.data.name == name:
+                        found.append(path)
+
+        return found
+
+    def find_object(self, name: str) -> DefinitionFile:
+        found = self._find_defn(name, ObjectDefn, RepoPaths.OBJECTS.value)
 
         if len(found) == 0:
             raise KeyError(f"Object {name} not found")
@@ -87,12 +213,7 @@ class ProtoSchema:
         return self.__getitem__(path)
 
     def find_event(self, name: str) -> DefinitionFile:
-        found: list[str] = []
-        for file in self._files.values():
-            if file.path.startswith(RepoPaths.EVENTS.value) and file.data is not None:
-                assert isinstance(file.data, EventDefn)
-                if file.data.get_key() == name or file.data.name == name:
-                    found.append(file.path)
+        found = self._find_defn(name, EventDefn, RepoPaths.EVENTS.value)
 
         if len(found) == 0:
             raise KeyError(f"Event {name} not found")
@@ -106,26 +227,19 @@ class ProtoSchema:
         if test in self.repo:
             return as_path(RepoPaths.EXTENSIONS.value, name)
         
-        for path in self.repo.paths():
-            file = self[path]
-            assert file.path is not None
-            parts = PurePath(file.path).parts
+        extn = self.repo.find_extension(name)
+        if extn is not None:
+            return as_path(RepoPaths.EXTENSIONS.value, extn)
 
-            match parts:
-                case (RepoPaths.EXTENSIONS.value, extn, SpecialFiles.EXTENSION):
-                    assert isinstance(file.data, ExtensionDefn)
-                    assert file.data.name is not None
-                    if file.data.name == name:
-                        return as_path(RepoPaths.EXTENSIONS.value, extn)
-                case _:
-                    pass
-        
         raise KeyError(f"Extension {name} not found")
 
-    def schema(self) -> OcsfSchema:
-        schema = OcsfSchema(version="0.0.0") # Version updated below
-
-        for file in self._files.values():
+    def sections(
+        self, paths: Optional[Iterable[RepoPath]] = None
+    ) -> Iterator[tuple[RepoPath, str, str, type[OcsfModel], Any]]:
+        """Yield (path, section, key, model type, definition) for each part of
+        the compiled schema, or just the parts that come from paths."""
+        for path in self.paths() if paths is None else paths:
+            file = self.read(path)
             try:
                 if file.path.startswith(RepoPaths.OBJECTS.value) and not extension(file.path):
                     assert file.data is not None
@@ -133,9 +247,7 @@ class ProtoSchema:
                     key = file.data.get_key()
                     assert key is not None
                     if not key.startswith("_"):
-                        data = asdict(file.data)
-                        _remove_nones(data)
-                        schema.objects[key] = dacite.from_dict(OcsfObject, data)
+                        yield path, "objects", key, OcsfObject, file.data
 
                 elif file.path.startswith(RepoPaths.EVENTS.value):
                     assert file.data is not None
@@ -143,30 +255,20 @@ class ProtoSchema:
                     if file.data.uid is not None or file.data.name == "base_event":
                         key = file.data.get_key()
                         assert key is not None
-                        data = asdict(file.data)
-                        _remove_nones(data)
-                        schema.classes[key] = dacite.from_dict(OcsfEvent, data)
+                        yield path, "classes", key, OcsfEvent, file.data
 
                 elif file.path.startswith(RepoPaths.PROFILES.value):
                     assert file.data is not None
                     assert isinstance(file.data, ProfileDefn)
-                    data = asdict(file.data)
-                    _remove_nones(data)
-                    if schema.profiles is None:
-                        schema.profiles = {}
                     key = file.data.get_key()
                     assert key is not None
-                    schema.profiles[key] = dacite.from_dict(OcsfProfile, data)
+                    yield path, "profiles", key, OcsfProfile, file.data
 
                 elif file.path.endswith(SpecialFiles.EXTENSION.value):
                     assert file.data is not None
                     assert isinstance(file.data, ExtensionDefn)
                     assert file.data.name is not None
-                    data = asdict(file.data)
-                    _remove_nones(data)
-                    if schema.extensions is None:
-                        schema.extensions = {}
-                    schema.extensions[file.data.name] = dacite.from_dict(OcsfExtension, data)
+                    yield path, "extensions", file.data.name, OcsfExtension, file.data
 
                 elif file.path == SpecialFiles.DICTIONARY:
                     assert file.data is not None
@@ -175,20 +277,64 @@ class ProtoSchema:
                     assert isinstance(file.data.types.attributes, dict)
                     for k, v in file.data.types.attributes.items():
                         if isinstance(v, TypeDefn):
-                            data = asdict(v)
-                            _remove_nones(data)
-                            schema.types[k] = dacite.from_dict(OcsfType, data)
+                            yield path, "types", k, OcsfType, v
 
                 elif file.path == SpecialFiles.VERSION:
                     assert file.data is not None
                     assert isinstance(file.data, VersionDefn)
                     assert file.data.version is not None
-                    schema.version = file.data.version
+                    yield path, "version", "version", OcsfVersion, file.data
 
             except Exception as e:
                 raise ValueError(f"Error processing {file.path}: {e}") from e
 
+    def _convert(
+        self, convert: Callable[[type[OcsfModel], Any], Any], reuse: Optional[Reuse] = None
+    ) -> dict[str, Any]:
+        sections: dict[str, Any] = {"version": "0.0.0", "classes": {}, "objects": {}, "types": {}}
+
+        for path, section, key, kind, defn in self.sections():
+            try:
+                if section == "version":
+                    sections["version"] = defn.version
+                else:
+                    if section not in sections:
+                        sections[section] = {}
+
+                    value = reuse(path, section, key) if reuse is not None else None
+                    sections[section][key] = value if value is not None else convert(kind, defn)
+
+            except Exception as e:
+                raise ValueError(f"Error processing {path}: {e}") from e
+
+        return sections
+
+    def schema(self, reuse: Optional[Reuse] = None) -> OcsfSchema:
+        """Convert the compiled definitions into an OcsfSchema.
+
+        Args:
+            reuse: A function of (path, section, key) that returns an already
+                converted model for that part of the schema, or None to convert
+                the definition.
+        """
+        schema = OcsfSchema(**self._convert(to_model, reuse))
+
         if "base" in schema.classes:
             schema.base_event = schema.classes["base"]
 
         return schema
+
+    def schema_dict(self) -> dict[str, Any]:
+        """Convert the compiled definitions directly into the JSON-ready
+        dictionary that ocsf.schema.to_dict would produce from schema()."""
+        sections = self._convert(to_json_dict)
+
+        # Match the field order of OcsfSchema
+        schema: dict[str, Any] = {}
+        for field in fields(OcsfSchema):
+            schema[field.name] = sections.get(field.name, None)
+
+        if "base" in schema["classes"]:
+            schema["base_event"] = deepcopy(schema["classes"]["base"])
+
+        return schema
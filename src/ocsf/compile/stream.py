@@ -0,0 +1,88 @@
+"""Stream a compiled schema to a file or socket as JSON.
+
+The output is identical to `ocsf.schema.to_json(compilation.build())`, but
+definitions are converted and written one at a time, so the compiled schema
+is never held in memory as an OcsfSchema or as one large dictionary.
+
+Example:
+```python
+with open("schema.json", "w") as f:
+    write_schema(compilation.proto, f)
+
+with socket.makefile("w") as f:
+    write_schema(compilation.proto, f)
+```
+"""
+
+import json
+
+from dataclasses import fields
+from typing import Any, Protocol
+
+from ocsf.schema import OcsfModel, OcsfSchema
+
+from .convert import to_json_dict
+from .protoschema import ProtoSchema
+
+
+class Writable(Protocol):
+    def write(self, s: str, /) -> Any: ...
+
+
+def write_schema(proto: ProtoSchema, out: Writable) -> None:
+    """Write the compiled schema in proto to out as JSON."""
+
+    # Collect references to the definitions in each section first. The JSON
+    # layout groups them by section and later definitions replace earlier ones
+    # with the same key (but keep their position), as they would in a dict.
+    version = "0.0.0"
+    entries: dict[str, dict[str, tuple[str, type[OcsfModel], Any]]] = {}
+
+    for path, section, key, kind, defn in proto.sections():
+        if section == "version":
+            version = defn.version
+        else:
+            if section not in entries:
+                entries[section] = {}
+            entries[section][key] = (path, kind, defn)
+
+    base_event = "null"
+
+    out.write("{")
+    for i, field in enumerate(fields(OcsfSchema)):
+        if i > 0:
+            out.write(", ")
+        out.write(json.dumps(field.name))
+        out.write(": ")
+
+        if field.name == "version":
+            out.write(json.dumps(version))
+            continue
+
+        if field.name == "base_event":
+            out.write(base_event)
+            continue
+
+        if field.name not in entries:
+            # Optional sections are null when empty, required ones are {}
+            out.write("{}" if field.name in ("classes", "objects", "types") else "null")
+            continue
+
+        out.write("{")
+        for j, (key, (path, kind, defn)) in enumerate(entries[field.name].items()):
+            try:
+                value = json.dumps(to_json_dict(kind, defn))
+            except Exception as e:
+                raise ValueError(f"Error processing {path}: {e}") from e
+
+            if field.name == "classes" and key == "base":
+                base_event = value
+
+            if j > 0:
+                out.write(", ")
+            out.write(json.dumps(key))
+            out.write(": ")
+            out.write(value)
+        out.write("}")
+
+    out.write("}")
@@ -0,0 +1,245 @@
+"""Compile several variants of a schema at once, sharing the work they have in
+common.
+
+Variants are compilations of the same repository with different
+CompilationOptions, like all profiles, no profiles, or no extensions. Most of
+the work of compiling (includes, extends, dictionary merges) doesn't depend on
+the options; the options mostly decide which operations there are.
+
+Each variant is analyzed and ordered on its own. Every operation in a plan is
+then given a key of its inputs: the operation itself and the history of its
+target and prerequisite, that is, the keys of the operations that modified them
+before it. Operations with the same key in two variants start from the same
+files, so they have the same effect.
+
+The first variant is compiled in full, keeping copies of its files where the
+other variants diverge from it. Each of the other variants then applies only
+the operations the first didn't have, starting from those copies. Files that
+never diverge are copied from the first variant once it is finished. The first
+variant should be the one with the most in common with the others, like the one
+with every profile and extension enabled.
+
+Some inputs aren't part of the key:
+
+ - Operations that use state shared by their planner's operations (see
+   Planner.fingerprint()) are always applied, after the files the planner reads
+   for that state (see Planner.shared_paths()) are brought up to date.
+ - extension.json and categories.json, which some operations read without
+   naming them as their prerequisite, are brought up to date before any
+   operation is applied.
+
+The results are identical to compiling each variant on its own.
+
+Example:
+```python
+everything, core = compile_variants(repo, [CompilationOptions(), CompilationOptions(extensions=[])])
+schema = core.build()
+```
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+from ocsf.repository import DefinitionFile, Repository, RepoPath, SpecialFiles
+
+from .cache import digest_parts
+from .compiler import Compilation, CompilationMutations, CompilationPlan
+from .incremental import op_key, stateful
+from .merge import MergeResult
+from .options import CompilationOptions
+from .planners.planner import Operation
+from .protoschema import clone
+
+
+def _modified(op: Operation) -> list[RepoPath]:
+    """The paths that op may modify."""
+    if op.writes_prerequisite and op.prerequisite is not None:
+        return [op.target, op.prerequisite]
+    return [op.target]
+
+
+def _keys(plan: CompilationPlan, variant: int) -> list[str]:
+    """The key of the inputs of each operation in a variant's plan."""
+    history: dict[RepoPath, str] = {}
+    keys: list[str] = []
+
+    for op in plan:
+        target = history.get(op.target, op.target)
+        prerequisite = history.get(op.prerequisite, op.prerequisite) if op.prerequisite is not None else ""
+        # Shared state isn't part of the key, so these operations are never shared
+        salt = str(variant) if stateful(op) else ""
+
+        key = digest_parts(repr(op_key(op)), target, prerequisite, salt)
+        keys.append(key)
+        for path in _modified(op):
+            history[path] = digest_parts(key, path)
+
+    return keys
+
+
+@dataclass
+class _Schedule:
+    shared: list[Optional[int]]
+    """For each operation in the variant's plan, the index of the same
+    operation in the first variant's plan, or None if it has to be applied."""
+    installs: dict[int, list[tuple[RepoPath, int]]]
+    """Before applying the nth operation (or at the end, for n = len(plan)),
+    copy these paths from the first variant as they were after its jth
+    operation."""
+
+
+def _schedule(
+    plan: CompilationPlan, keys: list[str], first: dict[str, int], hidden: list[RepoPath], shared_paths: list[RepoPath]
+) -> _Schedule:
+    shared: list[Optional[int]] = []
+    installs: dict[int, list[tuple[RepoPath, int]]] = {}
+
+    # Files modified by shared operations since they were last brought up to date
+    pending: dict[RepoPath, int] = {}
+
+    def flush(n: int, paths: list[RepoPath]) -> None:
+        for path in paths:
+            if path in pending:
+                if n not in installs:
+                    installs[n] = []
+                installs[n].append((path, pending.pop(path)))
+
+    for n, op in enumerate(plan):
+        j = first.get(keys[n])
+        shared.append(j)
+
+        if j is not None:
+            for path in _modified(op):
+                pending[path] = j
+            continue
+
+        flush(n, hidden)
+        if stateful(op):
+            flush(n, shared_paths)
+        flush(n, _modified(op))
+        if op.prerequisite is not None:
+            flush(n, [op.prerequisite])
+
+    flush(len(plan), list(pending))
+    return _Schedule(shared, installs)
+
+
+def compile_variants(repo: Repository, variants: list[CompilationOptions]) -> list[Compilation]:
+    """Compile each variant of the repository, sharing the work they have in
+    common. Returns a compiled Compilation for each variant, in order.
+    """
+    compilations = [Compilation(repo, options) for options in variants]
+    if len(compilations) == 0:
+        return []
+
+    plans: list[CompilationPlan] = []
+    keys: list[list[str]] = []
+    for n, compilation in enumerate(compilations):
+        compilation.analyze()
+        plans.append(compilation.order())
+        keys.append(_keys(plans[-1], n))
+
+    first = {key: j for j, key in enumerate(keys[0])}
+
+    # The last operation of the first variant that modifies each file
+    last: dict[RepoPath, int] = {}
+    for j, op in enumerate(plans[0]):
+        for path in _modified(op):
+            last[path] = j
+
+    hidden = [path for path in repo.paths() if path.endswith(SpecialFiles.EXTENSION.value)]
+    if SpecialFiles.CATEGORIES.value in repo:
+        hidden.append(SpecialFiles.CATEGORIES.value)
+
+    schedules: list[_Schedule] = []
+    for n in range(1, len(compilations)):
+        schedules.append(_schedule(plans[n], keys[n], first, hidden, compilations[n].shared_paths()))
+
+    # Copies of files that the other variants need from the middle of the first
+    # variant's compilation. Those needed from its end are taken afterwards.
+    wanted: set[tuple[int, RepoPath]] = set()
+    for schedule in schedules:
+        for installs in schedule.installs.values():
+            wanted.update((j, path) for path, j in installs if last[path] != j)
+
+    base = compilations[0]
+    proto = base.proto
+    results: list[MergeResult] = []
+    snapshots: dict[tuple[int, RepoPath], Optional[DefinitionFile]] = {}
+    for j, op in enumerate(plans[0]):
+        proto.writer = op
+        results.append(op.apply(proto))
+        for path in _modified(op):
+            if (j, path) in wanted:
+                snapshots[(j, path)] = clone(proto.read(path)) if path in proto else None
+    proto.writer = None
+
+    mutations: CompilationMutations = {}
+    for op, result in zip(plans[0], results):
+        if op.target not in mutations:
+            mutations[op.target] = []
+        mutations[op.target].append((op, result))
+    base.adopt_mutations(mutations)
+
+    # The index of the operation that created each created file
+    index = {id(op): j for j, op in enumerate(plans[0])}
+    creators = {path: index.get(id(proto.creator(path))) for path in proto.created()}
+
+    for compilation, plan, schedule in zip(compilations[1:], plans[1:], schedules):
+        _apply_variant(compilation, plan, schedule, base, results, snapshots, last, creators)
+
+    return compilations
+
+
+def _apply_variant(
+    compilation: Compilation,
+    plan: CompilationPlan,
+    schedule: _Schedule,
+    base: Compilation,
+    results: list[MergeResult],
+    snapshots: dict[tuple[int, RepoPath], Optional[DefinitionFile]],
+    last: dict[RepoPath, int],
+    creators: dict[RepoPath, Optional[int]],
+) -> None:
+    proto = compilation.proto
+
+    # The operation in this plan that matches each of the first variant's operations
+    matching = {j: plan[n] for n, j in enumerate(schedule.shared) if j is not None}
+
+    def install(n: int) -> None:
+        for path, j in schedule.installs.get(n, ()):
+            if last[path] == j:
+                source = base.proto.read(path) if path in base.proto else None
+            else:
+                source = snapshots[(j, path)]
+
+            if source is not None:
+                # Created files are credited to the operation that created them
+                creator = creators.get(path)
+                proto.writer = matching.get(creator) if creator is not None else None
+                proto[path] = clone(source)
+                proto.writer = None
+
+    mutations: CompilationMutations = {}
+    for n, op in enumerate(plan):
+        install(n)
+
+        j = schedule.shared[n]
+        if j is None:
+            proto.writer = op
+            result = op.apply(proto)
+            proto.writer = None
+        else:
+            result = results[j]
+
+        if op.target not in mutations:
+            mutations[op.target] = []
+        mutations[op.target].append((op, result))
+
+    install(len(plan))
+
+    # Put created files in the order this plan would have created them
+    position = {id(op): n for n, op in enumerate(plan)}
+    proto.sort_created(lambda path: position.get(id(proto.creator(path)), len(plan)))
+
+    compilation.adopt_mutations(mutations)
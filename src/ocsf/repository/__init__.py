@@ -40,8 +40,9 @@ from .helpers import (
     categoryless,
     path_defn_t,
 )
-from .repository import Repository, DefinitionFile
-from .reader import read_repo
+from .repository import Repository, DefinitionFile, LazyDefinitionFile
+from .reader import read_repo, read_repo_async, scan_repo
+from .decoder import DecodeError, decode, decoder
 
 __all__ = [
     "AnyDefinition",
@@ -52,6 +53,7 @@ __all__ = [
     "DefinitionFile",
     "DefinitionPart",
     "DefinitionT",
+    "DecodeError",
     "DefnWithAnnotations",
     "DefnWithAttrs",
     "DefnWithInclude",
@@ -65,6 +67,7 @@ __all__ = [
     "ExtensionDefn",
     "IncludeDefn",
     "IncludeTarget",
+    "LazyDefinitionFile",
     "ObjectDefn",
     "Pathlike",
     "ProfileDefn",
@@ -79,10 +82,14 @@ __all__ = [
     "as_path",
     "category",
     "categoryless",
+    "decode",
+    "decoder",
     "extension",
     "extensionless",
     "path_defn_t",
     "read_repo",
+    "read_repo_async",
     "sanitize_path",
+    "scan_repo",
     "short_name",
 ]
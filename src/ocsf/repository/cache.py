@@ -0,0 +1,105 @@
+"""A persistent cache of decoded definition files.
+
+The cache stores decoded DefinitionFiles for a repository in a single pickle
+file. Each entry is keyed by the source file's path and validated against its
+mtime and size; if those have changed, the file's content hash is compared
+before the entry is discarded, so touching or re-checking out a file doesn't
+force it to be decoded again.
+"""
+
+import hashlib
+import os
+import pickle
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from .helpers import Pathlike
+from .repository import DefinitionFile
+
+# Bump this when the layout of the cache or the definition dataclasses change.
+_CACHE_VERSION = 1
+
+
+@dataclass
+class _CacheEntry:
+    mtime_ns: int
+    size: int
+    digest: str
+    file: DefinitionFile
+
+
+def _digest(source: str) -> str:
+    with open(source, "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+class RepoCache:
+    def __init__(self, cache_dir: Pathlike, root: Pathlike, preserve_raw_data: bool = False):
+        key = hashlib.sha256(os.path.abspath(root).encode()).hexdigest()[:16]
+        suffix = "-raw" if preserve_raw_data else ""
+        self._path = Path(cache_dir, f"ocsf-repo-{key}{suffix}.pickle")
+        self._entries: dict[str, _CacheEntry] = {}
+        self._seen: set[str] = set()
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self._path, "rb") as file:
+                version, entries = pickle.load(file)
+        except Exception:
+            # Missing, corrupt, or incompatible caches are treated as empty.
+            return
+
+        if version == _CACHE_VERSION:
+            self._entries = entries
+
+    def get(self, source: str) -> Optional[DefinitionFile]:
+        """Get the cached definition for a source file if it hasn't changed."""
+        self._seen.add(source)
+        entry = self._entries.get(source)
+
+        if entry is not None:
+            stat = os.stat(source)
+            if stat.st_mtime_ns != entry.mtime_ns or stat.st_size != entry.size:
+                if _digest(source) != entry.digest:
+                    entry = None
+                else:
+                    entry.mtime_ns = stat.st_mtime_ns
+                    entry.size = stat.st_size
+                    self._dirty = True
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return entry.file
+
+    def put(self, source: str, file: DefinitionFile) -> None:
+        """Add or replace the cached definition for a source file."""
+        stat = os.stat(source)
+        self._seen.add(source)
+        self._entries[source] = _CacheEntry(stat.st_mtime_ns, stat.st_size, _digest(source), file)
+        self._dirty = True
+
+    def save(self) -> None:
+        """Write the cache to disk, dropping entries for files that weren't seen."""
+        stale = [source for source in self._entries if source not in self._seen]
+        for source in stale:
+            del self._entries[source]
+
+        if not self._dirty and len(stale) == 0:
+            return
+
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self._path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "wb") as file:
+            pickle.dump((_CACHE_VERSION, self._entries), file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self._path)
+        self._dirty = False
@@ -0,0 +1,188 @@
+"""Decode parsed JSON into definition dataclasses.
+
+This is a replacement for `dacite.from_dict` specialized for the definition
+dataclasses in this package. Rather than reflecting over type hints for every
+value, a decoder is built once for each dataclass and cached. Decoders accept
+data straight from `json.loads`, including the OCSF `$include` and
+`@deprecated` keys, so there is no need to run `keys_to_names` first.
+
+Example:
+```python
+defn = decode(ObjectDefn, json.loads(raw_data))
+```
+"""
+
+from dataclasses import fields, is_dataclass
+from types import NoneType, UnionType
+from typing import TYPE_CHECKING, Any, Callable, Union, TypeVar, cast, get_args, get_origin, get_type_hints
+
+from .definitions import DefinitionPart
+
+if TYPE_CHECKING:
+    from _typeshed import DataclassInstance
+
+# Certain OCSF properties have special characters in their names. This mirrors
+# the transforms in ocsf.schema.keys_to_names.
+_KEY_TRANSFORMS = {
+    "@deprecated": "deprecated",
+    "$include": "include_",
+}
+
+_NAME_TRANSFORMS = {v: k for k, v in _KEY_TRANSFORMS.items()}
+
+PartT = TypeVar("PartT", bound=DefinitionPart)
+Decoder = Callable[[Any], Any]
+
+
+class DecodeError(ValueError):
+    """Raised when data doesn't match the type of the definition it's decoded into."""
+
+
+_decoders: dict[type, Decoder] = {}
+
+
+def _passthrough(value: Any) -> Any:
+    return value
+
+
+def _scalar(kind: type) -> Decoder:
+    def decode_scalar(value: Any) -> Any:
+        if not isinstance(value, kind):
+            raise DecodeError(f"Expected {kind.__name__}, got {type(value).__name__}: {value!r}")
+        return value
+
+    return decode_scalar
+
+
+def _optional(inner: Decoder) -> Decoder:
+    def decode_optional(value: Any) -> Any:
+        if value is None:
+            return None
+        return inner(value)
+
+    return decode_optional
+
+
+def _union(options: list[Decoder]) -> Decoder:
+    # Like dacite, try each member of the union in declaration order and use
+    # the first one that matches.
+    def decode_union(value: Any) -> Any:
+        for option in options:
+            try:
+                return option(value)
+            except DecodeError:
+                pass
+        raise DecodeError(f"Value doesn't match any type in union: {value!r}")
+
+    return decode_union
+
+
+def _list(inner: Decoder) -> Decoder:
+    def decode_list(value: Any) -> Any:
+        if not isinstance(value, list):
+            raise DecodeError(f"Expected list, got {type(value).__name__}: {value!r}")
+        return [inner(item) for item in cast(list[Any], value)]
+
+    return decode_list
+
+
+def _dict(inner: Decoder) -> Decoder:
+    def decode_dict(value: Any) -> Any:
+        if not isinstance(value, dict):
+            raise DecodeError(f"Expected dict, got {type(value).__name__}: {value!r}")
+
+        result: dict[str, Any] = {}
+        renamed: list[tuple[str, Any]] = []
+        for k, v in cast(dict[str, Any], value).items():
+            if k in _KEY_TRANSFORMS:
+                # keys_to_names moves transformed keys to the end of the dict
+                renamed.append((_KEY_TRANSFORMS[k], v))
+            else:
+                result[k] = inner(v)
+
+        for k, v in renamed:
+            result[k] = inner(v)
+
+        return result
+
+    return decode_dict
+
+
+def _build(hint: Any) -> Decoder:
+    if hint is Any:
+        return _passthrough
+
+    if isinstance(hint, type) and is_dataclass(hint):
+        return decoder(cast(type[DefinitionPart], hint))
+
+    origin = get_origin(hint)
+
+    if origin is Union or origin is UnionType:
+        args = get_args(hint)
+        members = [arg for arg in args if arg is not NoneType]
+        if len(members) == 1:
+            inner = _build(members[0])
+        else:
+            inner = _union([_build(arg) for arg in members])
+
+        if len(members) < len(args):
+            return _optional(inner)
+        return inner
+
+    if origin is list:
+        (item,) = get_args(hint)
+        return _list(_build(item))
+
+    if origin is dict:
+        _, value = get_args(hint)
+        return _dict(_build(value))
+
+    if isinstance(hint, type):
+        return _scalar(hint)
+
+    raise TypeError(f"Unsupported type hint in definition: {hint}")
+
+
+def _build_dataclass(kind: type[PartT]) -> Callable[[Any], PartT]:
+    hints = get_type_hints(kind)
+    table: dict[str, tuple[str, Decoder]] = {}
+
+    # The decoder is registered before its fields are built so that
+    # self-referential definitions resolve to it.
+    def decode_dataclass(value: Any) -> PartT:
+        if not isinstance(value, dict):
+            raise DecodeError(f"Expected dict for {kind.__name__}, got {type(value).__name__}: {value!r}")
+
+        kwargs: dict[str, Any] = {}
+        for k, v in cast(dict[str, Any], value).items():
+            entry = table.get(k)
+            if entry is not None:
+                name, decode_field = entry
+                try:
+                    kwargs[name] = decode_field(v)
+                except DecodeError as e:
+                    raise DecodeError(f"{kind.__name__}.{name}: {e}") from e
+
+        return kind(**kwargs)
+
+    _decoders[kind] = decode_dataclass
+
+    for field in fields(cast("type[DataclassInstance]", kind)):
+        entry = (field.name, _build(hints[field.name]))
+        table[field.name] = entry
+        if field.name in _NAME_TRANSFORMS:
+            table[_NAME_TRANSFORMS[field.name]] = entry
+
+    return decode_dataclass
+
+
+def decoder(kind: type[PartT]) -> Callable[[Any], PartT]:
+    """Get the (cached) decoder for a definition dataclass."""
+    if kind not in _decoders:
+        return _build_dataclass(kind)
+    return cast(Callable[[Any], PartT], _decoders[kind])
+
+
+def decode(kind: type[PartT], data: dict[str, Any]) -> PartT:
+    """Decode a dictionary parsed from JSON into a definition dataclass."""
+    return decoder(kind)(data)
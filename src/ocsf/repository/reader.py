@@ -1,11 +1,16 @@
+import asyncio
 import json
-import dacite
+import os
 
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
 from pathlib import Path
-from .repository import Repository, DefinitionFile
-from .helpers import REPO_PATHS, RepoPaths, Pathlike, sanitize_path, path_defn_t
+from typing import Optional
 
-from ocsf.schema import keys_to_names
+from .repository import Repository, DefinitionFile, LazyDefinitionFile
+from .helpers import REPO_PATHS, RepoPaths, Pathlike, sanitize_path, path_defn_t
+from .decoder import decode
+from .cache import RepoCache
 
 
 def _to_defn(path: Pathlike, raw_data: str, preserve_raw_data: bool) -> DefinitionFile:
@@ -17,31 +22,165 @@ def _to_defn(path: Pathlike, raw_data: str, preserve_raw_data: bool) -> Definiti
     if preserve_raw_data:
         defn.raw_data = raw_data
 
-    data = json.loads(raw_data)
-    defn.data = dacite.from_dict(kind, keys_to_names(data))
+    defn.data = decode(kind, json.loads(raw_data))
 
     return defn
 
 
-def _walk_path(path: Path, repo: Repository, preserve_raw_data: bool) -> None:
-    for entry in path.iterdir():
-        if entry.is_file() and entry.suffix == ".json":
-            with open(entry) as file:
-                defn = _to_defn(entry, file.read(), preserve_raw_data)
-                repo[sanitize_path(entry)] = defn
+def _read_file(path: str) -> str:
+    with open(path) as file:
+        return file.read()
+
+
+def _scan_path(path: str, found: list[str]) -> list[str]:
+    """Collect the paths of definition files under path, depth first in directory order."""
+    with os.scandir(path) as it:
+        entries = list(it)
+
+    for entry in entries:
+        if entry.is_file() and os.path.splitext(entry.name)[1] == ".json":
+            found.append(entry.path)
+
+        elif entry.is_dir():
+            parts = Path(entry.path).parts
+            if entry.name in REPO_PATHS or Path(path).name in REPO_PATHS or RepoPaths.EVENTS.value in parts:
+                _scan_path(entry.path, found)
+
+    return found
+
+
+def scan_repo(path: Pathlike) -> list[str]:
+    """The paths of the definition files in a repository directory, in the
+    order read_repo() reads them."""
+    return _scan_path(os.fspath(path), [])
+
+
+def _load_batch(files: list[str], preserve_raw_data: bool) -> list[DefinitionFile]:
+    return [_to_defn(file, _read_file(file), preserve_raw_data) for file in files]
+
+
+def _load_files(
+    files: list[str], preserve_raw_data: bool, jobs: Optional[int], executor: Optional[Executor]
+) -> list[DefinitionFile]:
+    if (jobs is None or jobs <= 1) and executor is None:
+        return _load_batch(files, preserve_raw_data)
+
+    workers = jobs if jobs is not None and jobs > 1 else None
+
+    with ThreadPoolExecutor(workers) as io_pool:
+        raw = list(io_pool.map(_read_file, files))
+
+    chunksize = max(1, len(files) // ((workers or os.cpu_count() or 1) * 4))
+
+    if executor is None:
+        with ProcessPoolExecutor(workers) as cpu_pool:
+            return list(cpu_pool.map(_to_defn, files, raw, repeat(preserve_raw_data), chunksize=chunksize))
+    else:
+        return list(executor.map(_to_defn, files, raw, repeat(preserve_raw_data), chunksize=chunksize))
+
+
+def read_repo(
+    path: Pathlike,
+    preserve_raw_data: bool = False,
+    jobs: Optional[int] = None,
+    executor: Optional[Executor] = None,
+    lazy: bool = False,
+    cache_dir: Optional[Pathlike] = None,
+) -> Repository:
+    """Load a directory of schema definition files into a Repository.
 
-        elif entry.is_dir() and (
-            entry.name in REPO_PATHS or entry.parent.name in REPO_PATHS or RepoPaths.EVENTS.value in entry.parts
-        ):
-            _walk_path(entry, repo, preserve_raw_data)
+    Args:
+        path: The root directory of the schema repository.
+        preserve_raw_data: If True, keep the raw JSON text of each file in
+            DefinitionFile.raw_data.
+        jobs: The number of workers to use. Files are read with a thread pool
+            and decoded with a process pool. Defaults to loading serially.
+        executor: An executor to use to decode files instead of creating a
+            process pool. Files are still read with a thread pool of `jobs`
+            workers.
+        lazy: If True, don't read or decode files until their data is first
+            accessed. See LazyDefinitionFile. Ignores jobs and executor.
+        cache_dir: A directory in which to cache decoded files between runs.
+            Only files that have changed since they were cached are decoded.
+            See RepoCache.
 
+    The contents of the Repository are identical (and in the same order)
+    regardless of the number of workers or the state of the cache.
+    """
+    if lazy and cache_dir is not None:
+        raise ValueError("A repository can't be read lazily and from a cache at the same time.")
 
-def read_repo(path: Pathlike, preserve_raw_data: bool = False) -> Repository:
-    """Load a directory of schema definition files into a Repository."""
     repo = Repository()
 
-    if not isinstance(path, Path):
-        path = Path(path)
-    _walk_path(path, repo, preserve_raw_data)
+    files = scan_repo(path)
+
+    if lazy:
+        for file in files:
+            defn = LazyDefinitionFile(sanitize_path(file), file, path_defn_t(file), preserve_raw_data)
+            repo[defn.path] = defn
+
+        return repo
+
+    if cache_dir is None:
+        for defn in _load_files(files, preserve_raw_data, jobs, executor):
+            repo[defn.path] = defn
+
+        return repo
+
+    cache = RepoCache(cache_dir, path, preserve_raw_data)
+
+    found: dict[str, DefinitionFile] = {}
+    for file in files:
+        cached = cache.get(file)
+        if cached is not None:
+            found[file] = cached
+
+    changed = [file for file in files if file not in found]
+    for file, defn in zip(changed, _load_files(changed, preserve_raw_data, jobs, executor)):
+        cache.put(file, defn)
+        found[file] = defn
+
+    cache.save()
+
+    for file in files:
+        repo[found[file].path] = found[file]
+
+    return repo
+
+
+async def read_repo_async(
+    path: Pathlike,
+    preserve_raw_data: bool = False,
+    executor: Optional[Executor] = None,
+    batch_size: int = 64,
+) -> Repository:
+    """Load a directory of schema definition files into a Repository, like
+    read_repo(), without blocking the event loop.
+
+    Args:
+        path: The root directory of the schema repository.
+        preserve_raw_data: If True, keep the raw JSON text of each file in
+            DefinitionFile.raw_data.
+        executor: The executor to scan the directory and read and decode
+            files in. Defaults to the event loop's default executor. A
+            ProcessPoolExecutor decodes files in parallel.
+        batch_size: The number of files read and decoded by each call to
+            the executor.
+
+    Cancelling stops any batches that haven't started. The contents of the
+    Repository are the same as read_repo() would return.
+    """
+    loop = asyncio.get_running_loop()
+    files = await loop.run_in_executor(executor, scan_repo, path)
+
+    batches = [files[i : i + batch_size] for i in range(0, len(files), batch_size)]
+    loaded = await asyncio.gather(
+        *(loop.run_in_executor(executor, _load_batch, batch, preserve_raw_data) for batch in batches)
+    )
+
+    repo = Repository()
+    for batch in loaded:
+        for defn in batch:
+            repo[defn.path] = defn
 
     return repo
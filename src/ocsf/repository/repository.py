@@ -1,9 +1,12 @@
+import json
+
 from dataclasses import dataclass
 from pathlib import PurePath
-from typing import Optional, Iterable
+from typing import Any, Optional, Iterable
 
-from .helpers import RepoPath, RepoPaths
-from .definitions import AnyDefinition, ProfileDefn
+from .helpers import RepoPath, RepoPaths, SpecialFiles, as_path, category, extension
+from .definitions import AnyDefinition, ExtensionDefn, ProfileDefn
+from .decoder import decode
 
 
 @dataclass
@@ -16,17 +19,191 @@ class DefinitionFile:
         return PurePath(self.path).stem
 
 
+class LazyDefinitionFile(DefinitionFile):
+    """A DefinitionFile that reads and decodes its source file the first time
+    its data (or raw_data) is accessed.
+
+    The path, short_name, and anything else that doesn't look at the contents
+    of the file are available without parsing it.
+    """
+
+    def __init__(self, path: RepoPath, source: str, kind: type[AnyDefinition], preserve_raw_data: bool = False) -> None:
+        # The dataclass __init__ would assign data and raw_data through their
+        # setters, so the fields are set here instead
+        self.path = path
+        self._source = source
+        self._kind = kind
+        self._preserve_raw_data = preserve_raw_data
+        self._raw_data: Optional[str] = None
+        self._data: Optional[AnyDefinition] = None
+        self._loaded = False
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+
+        with open(self._source) as file:
+            raw_data = file.read()
+
+        if self._preserve_raw_data and self._raw_data is None:
+            self._raw_data = raw_data
+
+        self._data = decode(self._kind, json.loads(raw_data))
+        self._loaded = True
+
+    def __eq__(self, other: object) -> bool:
+        # Compare equal to an eagerly loaded DefinitionFile with the same contents.
+        if not isinstance(other, DefinitionFile):
+            return NotImplemented
+        return (self.path, self.raw_data, self.data) == (other.path, other.raw_data, other.data)
+
+    @property
+    def loaded(self) -> bool:
+        """True if the source file has been read and decoded."""
+        return self._loaded
+
+    @property
+    def data(self) -> Optional[AnyDefinition]:
+        self._load()
+        return self._data
+
+    @data.setter
+    def data(self, value: Optional[AnyDefinition]) -> None:  # pyright: ignore[reportIncompatibleVariableOverride]
+        # Assigning data directly replaces whatever is in the source file.
+        self._data = value
+        self._loaded = True
+
+    @property
+    def raw_data(self) -> Optional[str]:
+        self._load()
+        return self._raw_data
+
+    @raw_data.setter
+    def raw_data(self, value: Optional[str]) -> None:  # pyright: ignore[reportIncompatibleVariableOverride]
+        self._raw_data = value
+
+
+# An insertion-ordered set of paths
+_PathSet = dict[RepoPath, None]
+
+
+def _index_add(index: dict[Any, _PathSet], key: Any, path: RepoPath) -> None:
+    if key not in index:
+        index[key] = {}
+    index[key][path] = None
+
+
+def _index_remove(index: dict[Any, _PathSet], key: Any, path: RepoPath) -> None:
+    if key in index:
+        index[key].pop(path, None)
+        if len(index[key]) == 0:
+            del index[key]
+
+
 class Repository:
+    """A collection of definition files keyed by their repository path.
+
+    The repository maintains secondary indexes so that common lookups don't
+    require a scan of every file:
+
+    - stem -> paths, see find_stem()
+    - category -> event paths, see category_events()
+    - extension directory -> paths, see extensions()
+    - (definition kind, name) -> paths, see find()
+    - extension name -> extension directory, see find_extension()
+
+    The first three are derived from paths and are always maintained. The
+    last two require decoding files, so they are built the first time they
+    are used (to avoid defeating lazy loading) and maintained afterward.
+    Indexes reflect a file's data when it was added; reassign a file after
+    changing its name.
+    """
+
     def __init__(self, contents: Optional[dict[RepoPath, DefinitionFile]] = None):
         if contents is not None:
             self._contents = contents
         else:
             self._contents: dict[RepoPath, DefinitionFile] = {}
 
+        self._order: dict[RepoPath, int] = {}
+        self._counter = 0
+        self._stems: dict[str, _PathSet] = {}
+        self._categories: dict[str, _PathSet] = {}
+        self._extn_dirs: dict[str, _PathSet] = {}
+        self._names: Optional[dict[tuple[type, Optional[str]], _PathSet]] = None
+        self._extn_names: Optional[dict[str, str]] = None
+
+        for path in self._contents:
+            self._index(path)
+
+    def _index(self, path: RepoPath) -> None:
+        if path not in self._order:
+            self._order[path] = self._counter
+            self._counter += 1
+
+        _index_add(self._stems, PurePath(path).stem, path)
+
+        cat = category(path)
+        if cat is not None:
+            _index_add(self._categories, cat, path)
+
+        extn = extension(path)
+        if extn is not None:
+            _index_add(self._extn_dirs, extn, path)
+
+        if self._names is not None:
+            self._index_data(path)
+
+    def _index_data(self, path: RepoPath) -> None:
+        assert self._names is not None
+        assert self._extn_names is not None
+
+        data = self._contents[path].data
+        if data is None:
+            return
+
+        name = getattr(data, "name", None)
+        _index_add(self._names, (type(data), name), path)
+
+        if isinstance(data, ExtensionDefn) and name is not None:
+            extn = extension(path)
+            assert extn is not None
+            self._extn_names[name] = extn
+
+    def _unindex(self, path: RepoPath) -> None:
+        _index_remove(self._stems, PurePath(path).stem, path)
+
+        cat = category(path)
+        if cat is not None:
+            _index_remove(self._categories, cat, path)
+
+        extn = extension(path)
+        if extn is not None:
+            _index_remove(self._extn_dirs, extn, path)
+
+        if self._names is not None:
+            assert self._extn_names is not None
+            data = self._contents[path].data
+            if data is not None:
+                name = getattr(data, "name", None)
+                _index_remove(self._names, (type(data), name), path)
+                if isinstance(data, ExtensionDefn) and name is not None:
+                    self._extn_names.pop(name, None)
+
+    def _build_names(self) -> None:
+        if self._names is None:
+            self._names = {}
+            self._extn_names = {}
+            for path in self._contents:
+                self._index_data(path)
+
     def __getitem__(self, path: RepoPath) -> DefinitionFile:
         return self._contents[path]
 
     def __delitem__(self, path: RepoPath) -> None:
+        if path in self._contents:
+            self._unindex(path)
+            del self._order[path]
         del self._contents[path]
 
     def __contains__(self, path: RepoPath) -> bool:
@@ -36,8 +213,56 @@ class Repository:
         return len(self._contents)
 
     def __setitem__(self, path: RepoPath, file: DefinitionFile) -> None:
+        if path in self._contents:
+            self._unindex(path)
         file.path = path
         self._contents[path] = file
+        self._index(path)
+
+    def ordered(self, paths: Iterable[RepoPath]) -> list[RepoPath]:
+        """Sort paths in the order they were added to the repository."""
+        return sorted(paths, key=self._order.__getitem__)
+
+    def find(self, name: Optional[str], kind: Optional[type[AnyDefinition]] = None) -> list[RepoPath]:
+        """Find the paths of definitions with the given name, optionally
+        limited to a kind of definition. A name of None finds unnamed
+        definitions."""
+        self._build_names()
+        assert self._names is not None
+
+        if kind is not None:
+            return list(self._names.get((kind, name), {}))
+
+        found: list[RepoPath] = []
+        for (_, n), paths in self._names.items():
+            if n == name:
+                found += paths
+        return self.ordered(found)
+
+    def find_stem(self, stem: str) -> list[RepoPath]:
+        """Find the paths of files with the given stem (filename without the
+        .json suffix)."""
+        return list(self._stems.get(stem, {}))
+
+    def category_events(self, category: str) -> list[RepoPath]:
+        """Find the paths of event files in a category directory."""
+        return list(self._categories.get(category, {}))
+
+    def find_extension(self, name: str) -> Optional[str]:
+        """Find the directory of an extension by its name in extension.json."""
+        self._build_names()
+        assert self._extn_names is not None
+        return self._extn_names.get(name)
+
+    def extension_info(self, extn_dir: str) -> tuple[Optional[str], Optional[int]]:
+        """The name and uid of the extension in a directory."""
+        path = as_path(RepoPaths.EXTENSIONS.value, extn_dir, SpecialFiles.EXTENSION.value)
+        if path not in self._contents:
+            raise KeyError(f"Extension {extn_dir} not found")
+
+        data = self._contents[path].data
+        assert isinstance(data, ExtensionDefn)
+        return data.name, data.uid
 
     def files(self) -> Iterable[DefinitionFile]:
         yield from self._contents.values()
@@ -46,11 +271,11 @@ class Repository:
         yield from self._contents.keys()
 
     def extensions(self) -> Iterable[str]:
-        extns: set[str] = set()
-        for path in self._contents:
-            if path.startswith(RepoPaths.EXTENSIONS.value):
-                extns.add(PurePath(path).parts[1])
-        yield from extns
+        yield from list(self._extn_dirs)
+
+    def has_extension(self, extn_dir: str) -> bool:
+        """True if the repository contains files in the extension directory."""
+        return extn_dir in self._extn_dirs
 
     def profiles(self) -> Iterable[str]:
         # TODO include profiles from extensions
@@ -0,0 +1,461 @@
+"""Generate synthetic schema repositories of any size.
+
+The bundled schema is small enough to hide behavior that only shows up at
+scale. A synthetic repository has the same shape as a real one: a dictionary
+with data types, categories, a base event with a class for each category,
+objects and event classes in deep `extends` chains, include files and profiles
+that are `$include`d by many definitions, and extensions with their own
+dictionaries, objects, events and profiles. Every reference resolves, so it
+compiles like the real thing.
+
+SyntheticOptions() is about the size of the bundled schema, and
+SyntheticOptions().scaled(10) is ten times larger. The same options (and seed)
+always produce the same repository.
+
+Example:
+```python
+repo = generate_repo(SyntheticOptions().scaled(10))
+write_repo("/tmp/ocsf-10x", SyntheticOptions().scaled(10))
+```
+"""
+
+import json
+import os
+import random
+
+from dataclasses import dataclass, replace
+from pathlib import PurePath
+from typing import Any
+
+from .helpers import Pathlike, RepoPath, RepoPaths, SpecialFiles, as_path, path_defn_t
+from .decoder import decode
+from .repository import DefinitionFile, Repository
+
+# Class UIDs are extension * 100000 + category * 1000 + class, so each must fit
+# in its place.
+_MAX_CATEGORIES = 99
+_MAX_CLASSES = 999
+
+_TYPES = ["string_t", "integer_t", "long_t", "boolean_t", "timestamp_t"]
+
+
+@dataclass
+class SyntheticOptions:
+    """The size and shape of a synthetic repository. Counts of extension
+    definitions are per extension."""
+
+    objects: int = 110
+    events: int = 60
+    """Event classes, not counting base_event and a class for each category."""
+    categories: int = 6
+    attributes: int = 580
+    """Dictionary attributes, not counting those that refer to objects."""
+    includes: int = 3
+    profiles: int = 8
+    extensions: int = 2
+    extension_objects: int = 3
+    extension_events: int = 3
+    extension_profiles: int = 1
+    attributes_per_defn: int = 8
+    """The attributes defined by each object, event, include and profile."""
+    extends_depth: int = 4
+    """The length of the chains of objects and events that extend each other."""
+    include_fanout: int = 3
+    """The include files and profiles $included by each event class."""
+    seed: int = 0
+
+    def scaled(self, factor: float) -> "SyntheticOptions":
+        """These options with factor times as many definitions. The shape of
+        each definition (its attributes, includes and extends chain) is
+        unchanged."""
+
+        def scale(n: int) -> int:
+            return max(1, round(n * factor))
+
+        return replace(
+            self,
+            objects=scale(self.objects),
+            events=scale(self.events),
+            categories=min(_MAX_CATEGORIES, scale(self.categories)),
+            attributes=scale(self.attributes),
+            includes=scale(self.includes),
+            profiles=scale(self.profiles),
+            extensions=scale(self.extensions),
+        )
+
+
+class _Generator:
+    def __init__(self, options: SyntheticOptions):
+        if options.categories < 1 or options.categories > _MAX_CATEGORIES:
+            raise ValueError(f"Between 1 and {_MAX_CATEGORIES} categories are supported, not {options.categories}")
+        if options.events > options.categories * _MAX_CLASSES:
+            raise ValueError(f"At most {_MAX_CLASSES} event classes per category are supported")
+        if options.extension_events > _MAX_CLASSES:
+            raise ValueError(f"At most {_MAX_CLASSES} event classes per extension are supported")
+
+        self._options = options
+        self._random = random.Random(options.seed)
+        self._attrs = [f"attr_{i}" for i in range(options.attributes)]
+        self._objects = [f"object_{i}" for i in range(options.objects)]
+        self._files: dict[RepoPath, dict[str, Any]] = {}
+
+    def _add(self, data: dict[str, Any], *parts: str) -> None:
+        self._files[as_path(*parts)] = data
+
+    def _sample(self, population: list[str], k: int) -> list[str]:
+        return self._random.sample(population, min(k, len(population)))
+
+    def _attributes(self, attrs: list[str], requirement: str = "optional") -> dict[str, Any]:
+        return {name: {"requirement": requirement} for name in attrs}
+
+    def _defn_attributes(self, objects: list[str]) -> dict[str, Any]:
+        """The attributes of an object or event: some from the dictionary and a
+        reference to another object."""
+        attrs = self._sample(self._attrs, self._options.attributes_per_defn)
+        if len(objects) > 0:
+            attrs.append(self._random.choice(objects))
+        return self._attributes(attrs, "recommended")
+
+    def _dictionary(self) -> dict[str, Any]:
+        attributes: dict[str, Any] = {
+            "activity_id": {
+                "caption": "Activity ID",
+                "description": "The normalized identifier of the activity.",
+                "enum": {"0": {"caption": "Unknown"}, "99": {"caption": "Other"}},
+                "sibling": "activity_name",
+                "type": "integer_t",
+            },
+            "activity_name": {"caption": "Activity", "description": "The activity name.", "type": "string_t"},
+            "category_name": {"caption": "Category", "description": "The category name.", "type": "string_t"},
+            "category_uid": {
+                "caption": "Category ID",
+                "description": "The category unique identifier.",
+                "sibling": "category_name",
+                "type": "integer_t",
+            },
+            "class_name": {"caption": "Class", "description": "The class name.", "type": "string_t"},
+            "class_uid": {
+                "caption": "Class ID",
+                "description": "The class unique identifier.",
+                "sibling": "class_name",
+                "type": "integer_t",
+            },
+            "time": {"caption": "Event Time", "description": "The time of the event.", "type": "timestamp_t"},
+            "type_name": {"caption": "Type Name", "description": "The event type name.", "type": "string_t"},
+            "type_uid": {
+                "caption": "Type ID",
+                "description": "The event type identifier.",
+                "sibling": "type_name",
+                "type": "long_t",
+            },
+        }
+
+        for i, name in enumerate(self._attrs):
+            attributes[name] = {
+                "caption": f"Attribute {i}",
+                "description": f"Synthetic attribute {i}.",
+                "type": _TYPES[i % len(_TYPES)],
+            }
+        for name in self._objects:
+            attributes[name] = {"caption": name.title(), "description": f"A {name}.", "type": name}
+
+        return {
+            "caption": "Attribute Dictionary",
+            "description": "The attributes of a synthetic schema.",
+            "name": "dictionary",
+            "attributes": attributes,
+            "types": {
+                "caption": "Data Types",
+                "description": "The data types of a synthetic schema.",
+                "attributes": {
+                    "boolean_t": {"caption": "Boolean", "description": "Boolean value.", "values": [False, True]},
+                    "integer_t": {"caption": "Integer", "description": "Signed integer value."},
+                    "long_t": {"caption": "Long", "description": "8-byte long, signed integer value."},
+                    "string_t": {"caption": "String", "description": "UTF-8 encoded byte sequence."},
+                    "timestamp_t": {
+                        "caption": "Timestamp",
+                        "description": "The timestamp format is the number of milliseconds since the Epoch.",
+                        "type": "long_t",
+                        "type_name": "Long",
+                    },
+                    "datetime_t": {
+                        "caption": "Datetime",
+                        "description": "The Internet Date/Time format as defined in RFC-3339.",
+                        "type": "string_t",
+                        "type_name": "String",
+                    },
+                    "object_t": {"caption": "Object", "description": "An object."},
+                },
+            },
+        }
+
+    def _core(self) -> None:
+        options = self._options
+
+        self._add({"version": "1.0.0"}, SpecialFiles.VERSION.value)
+        self._add(self._dictionary(), SpecialFiles.DICTIONARY.value)
+
+        categories = [f"category_{c}" for c in range(options.categories)]
+        self._add(
+            {
+                "caption": "Categories",
+                "name": "category",
+                "description": "The categories of a synthetic schema.",
+                "attributes": {
+                    name: {"caption": name.title(), "description": f"Category {c}.", "uid": c + 1}
+                    for c, name in enumerate(categories)
+                },
+            },
+            SpecialFiles.CATEGORIES.value,
+        )
+
+        includes = [f"include_{i}" for i in range(options.includes)]
+        for name in includes:
+            self._add(
+                {
+                    "caption": name.title(),
+                    "description": f"The {name} attributes.",
+                    "annotations": {"group": "context"},
+                    "attributes": self._attributes(self._sample(self._attrs, options.attributes_per_defn)),
+                },
+                RepoPaths.INCLUDES.value,
+                f"{name}.json",
+            )
+
+        profiles = [f"profile_{i}" for i in range(options.profiles)]
+        for name in profiles:
+            self._add(
+                {
+                    "caption": name.title(),
+                    "description": f"The {name} attributes.",
+                    "meta": "profile",
+                    "name": name,
+                    "annotations": {"group": "primary"},
+                    "attributes": self._attributes(self._sample(self._attrs, options.attributes_per_defn)),
+                },
+                RepoPaths.PROFILES.value,
+                f"{name}.json",
+            )
+
+        # Objects extend the one before them, in chains of extends_depth
+        for i, name in enumerate(self._objects):
+            data: dict[str, Any] = {
+                "caption": name.title(),
+                "description": f"Synthetic object {i}.",
+                "name": name,
+            }
+            if i % options.extends_depth != 0:
+                data["extends"] = self._objects[i - 1]
+            data["attributes"] = self._defn_attributes(self._objects[:i])
+            if len(profiles) > 0 and i % 5 == 0:
+                profile = self._random.choice(profiles)
+                data["profiles"] = [profile]
+                data["attributes"]["$include"] = [as_path(RepoPaths.PROFILES.value, f"{profile}.json")]
+            self._add(data, RepoPaths.OBJECTS.value, f"{name}.json")
+
+        targets = [as_path(RepoPaths.INCLUDES.value, f"{name}.json") for name in includes]
+        targets += [as_path(RepoPaths.PROFILES.value, f"{name}.json") for name in profiles]
+
+        self._add(
+            {
+                "caption": "Base Event",
+                "category": "other",
+                "description": "The base event of a synthetic schema.",
+                "name": "base_event",
+                "attributes": {
+                    "activity_id": {"group": "classification", "requirement": "required"},
+                    "activity_name": {"group": "classification", "requirement": "optional"},
+                    "category_name": {"group": "classification", "requirement": "optional"},
+                    "category_uid": {"group": "classification", "requirement": "required"},
+                    "class_name": {"group": "classification", "requirement": "optional"},
+                    "class_uid": {"group": "classification", "requirement": "required"},
+                    "time": {"group": "occurrence", "requirement": "required"},
+                    "type_name": {"group": "classification", "requirement": "optional"},
+                    "type_uid": {"group": "classification", "requirement": "required"},
+                },
+            },
+            RepoPaths.EVENTS.value,
+            "base_event.json",
+        )
+
+        for c, category in enumerate(categories):
+            self._add(
+                {
+                    "caption": category.title(),
+                    "category": category,
+                    "description": f"The base class of category {c}.",
+                    "extends": "base_event",
+                    "name": category,
+                    "attributes": self._defn_attributes(self._objects),
+                },
+                RepoPaths.EVENTS.value,
+                category,
+                f"{category}.json",
+            )
+
+        # Events are dealt out to the categories, and extend the one before
+        # them in the same category in chains of extends_depth
+        previous: dict[str, str] = {}
+        for j in range(options.events):
+            category = categories[j % len(categories)]
+            uid = j // len(categories) + 1
+            name = f"event_{j}"
+
+            attributes = self._defn_attributes(self._objects)
+            attributes["activity_id"] = {
+                "enum": {"1": {"caption": "Create"}, "2": {"caption": "Read"}, "3": {"caption": "Update"}}
+            }
+            included = self._sample(targets, options.include_fanout)
+            if len(included) > 0:
+                attributes["$include"] = included
+
+            data = {
+                "caption": name.title(),
+                "category": category,
+                "description": f"Synthetic event class {j}.",
+                "extends": previous[category] if (uid - 1) % options.extends_depth != 0 else category,
+                "name": name,
+                "uid": uid,
+                "attributes": attributes,
+            }
+            used = [PurePath(path).stem for path in included if path.startswith(RepoPaths.PROFILES.value)]
+            if len(used) > 0:
+                data["profiles"] = used
+
+            previous[category] = name
+            self._add(data, RepoPaths.EVENTS.value, category, f"{name}.json")
+
+    def _extension(self, k: int) -> None:
+        options = self._options
+        extn = f"extension_{k}"
+        root = as_path(RepoPaths.EXTENSIONS.value, extn)
+
+        self._add(
+            {
+                "caption": extn.title(),
+                "description": f"Synthetic extension {k}.",
+                "name": extn,
+                "uid": k + 1,
+                "version": "1.0.0",
+            },
+            root,
+            SpecialFiles.EXTENSION.value,
+        )
+
+        attrs = [f"{extn}_attr_{i}" for i in range(options.attributes_per_defn)]
+        objects = [f"{extn}_object_{i}" for i in range(options.extension_objects)]
+        attributes: dict[str, Any] = {}
+        for i, name in enumerate(attrs):
+            attributes[name] = {
+                "caption": f"Extension {k} Attribute {i}",
+                "description": f"Synthetic attribute {i} of extension {k}.",
+                "type": _TYPES[i % len(_TYPES)],
+            }
+        for name in objects:
+            attributes[name] = {"caption": name.title(), "description": f"A {name}.", "type": name}
+        self._add(
+            {
+                "caption": "Attribute Dictionary",
+                "description": f"The attributes of extension {k}.",
+                "name": "dictionary",
+                "attributes": attributes,
+            },
+            root,
+            SpecialFiles.DICTIONARY.value,
+        )
+
+        profiles = [f"{extn}_profile_{i}" for i in range(options.extension_profiles)]
+        for name in profiles:
+            self._add(
+                {
+                    "caption": name.title(),
+                    "description": f"The {name} attributes.",
+                    "meta": "profile",
+                    "name": name,
+                    "attributes": self._attributes(attrs),
+                },
+                root,
+                RepoPaths.PROFILES.value,
+                f"{name}.json",
+            )
+
+        # New objects, extending core objects
+        for i, name in enumerate(objects):
+            data: dict[str, Any] = {
+                "caption": name.title(),
+                "description": f"Synthetic object {i} of extension {k}.",
+                "name": name,
+                "attributes": self._attributes(self._sample(attrs, options.attributes_per_defn // 2)),
+            }
+            if len(self._objects) > 0:
+                data["extends"] = self._random.choice(self._objects)
+            self._add(data, root, RepoPaths.OBJECTS.value, f"{name}.json")
+
+        # A patch of a core object, adding the extension's profiles
+        if len(self._objects) > 0 and len(profiles) > 0:
+            patched = self._objects[k % len(self._objects)]
+            self._add(
+                {
+                    "caption": patched.title(),
+                    "description": f"Extends {patched} with the attributes of extension {k}.",
+                    "extends": patched,
+                    "profiles": [f"{extn}/{name}" for name in profiles],
+                    "attributes": {
+                        "$include": [as_path(RepoPaths.PROFILES.value, f"{name}.json") for name in profiles]
+                    },
+                },
+                root,
+                RepoPaths.OBJECTS.value,
+                f"{patched}.json",
+            )
+
+        # New event classes, extending core event classes
+        core = [f"category_{c}" for c in range(options.categories)]
+        core += [f"event_{j}" for j in range(options.events)]
+        for j in range(options.extension_events):
+            name = f"{extn}_event_{j}"
+            attributes = self._attributes(self._sample(attrs, options.attributes_per_defn // 2), "recommended")
+            if len(objects) > 0:
+                attributes[self._random.choice(objects)] = {"requirement": "recommended"}
+            self._add(
+                {
+                    "caption": name.title(),
+                    "description": f"Synthetic event class {j} of extension {k}.",
+                    "extends": self._random.choice(core),
+                    "name": name,
+                    "uid": j + 1,
+                    "attributes": attributes,
+                },
+                root,
+                RepoPaths.EVENTS.value,
+                f"{name}.json",
+            )
+
+    def generate(self) -> dict[RepoPath, dict[str, Any]]:
+        self._core()
+        for k in range(self._options.extensions):
+            self._extension(k)
+        return self._files
+
+
+def generate_files(options: SyntheticOptions = SyntheticOptions()) -> dict[RepoPath, dict[str, Any]]:
+    """Generate the JSON contents of each file of a synthetic repository, by path."""
+    return _Generator(options).generate()
+
+
+def generate_repo(options: SyntheticOptions = SyntheticOptions()) -> Repository:
+    """Generate a synthetic repository in memory."""
+    repo = Repository()
+    for path, data in generate_files(options).items():
+        repo[path] = DefinitionFile(path, data=decode(path_defn_t(path), data))
+    return repo
+
+
+def write_repo(path: Pathlike, options: SyntheticOptions = SyntheticOptions()) -> None:
+    """Write a synthetic repository to a directory, which can be read with
+    read_repo()."""
+    for file, data in generate_files(options).items():
+        target = os.path.join(path, file)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, "w") as f:
+            json.dump(data, f, indent=2)
@@ -0,0 +1,86 @@
+import os
+import time
+
+from copy import deepcopy
+from pathlib import Path
+
+from ocsf.schema import to_json
+from ocsf.repository import read_repo, AttrDefn, DefnWithAttrs
+from ocsf.compile.cache import CacheEntry, CompileCache
+from ocsf.compile.compiler import Compilation
+from ocsf.compile.options import CompilationOptions
+
+
+def test_cached_build(tmp_path: Path):
+    repo = read_repo(os.environ["REPO_PATH"])
+    expected = to_json(Compilation(repo).build())
+
+    first = Compilation(repo, cache_dir=tmp_path)
+    assert to_json(first.build()) == expected
+
+    second = Compilation(repo, cache_dir=tmp_path)
+    assert to_json(second.build()) == expected
+    assert second.recompiled == set()
+    assert second._cache is not None and second._cache.misses == 0
+
+
+def test_cached_build_changed(tmp_path: Path):
+    repo = read_repo(os.environ["REPO_PATH"])
+    Compilation(repo, cache_dir=tmp_path).build()
+
+    file = deepcopy(repo["objects/device.json"])
+    assert isinstance(file.data, DefnWithAttrs) and file.data.attributes is not None
+    hostname = file.data.attributes["hostname"]
+    assert isinstance(hostname, AttrDefn)
+    hostname.caption = "Edited"
+    repo["objects/device.json"] = file
+
+    compilation = Compilation(repo, cache_dir=tmp_path)
+    schema = compilation.build()
+
+    assert to_json(schema) == to_json(Compilation(repo).build())
+    assert schema.objects["device"].attributes["hostname"].caption == "Edited"
+
+    # Only the file and the files that depend on it were compiled
+    assert compilation.recompiled is not None
+    assert "objects/device.json" in compilation.recompiled
+    assert "objects/user.json" not in compilation.recompiled
+
+
+def test_cached_build_options(tmp_path: Path):
+    repo = read_repo(os.environ["REPO_PATH"])
+    Compilation(repo, cache_dir=tmp_path).build()
+
+    # Different options don't share entries
+    compilation = Compilation(repo, CompilationOptions(prefix_extensions=False), cache_dir=tmp_path)
+    compilation.build()
+    assert compilation._cache is not None and compilation._cache.hits == 0
+
+
+def test_prune(tmp_path: Path):
+    entry = CacheEntry(file=None, creator=None, results=[], models={}, fingerprints="")
+    CompileCache(tmp_path / "sized").put("a", entry)
+    size = CompileCache(tmp_path / "sized").size()
+
+    # Room for two entries
+    cache = CompileCache(tmp_path, max_bytes=size * 2)
+    cache.put("a", entry)
+
+    # b is the least recently used
+    cache.put("b", entry)
+    os.utime(tmp_path / "b.pickle", ns=(0, 0))
+    os.utime(tmp_path / "a.pickle", ns=(time.time_ns(), time.time_ns()))
+    cache.put("c", entry)
+
+    assert cache.prune() == 1
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+
+
+def test_corrupt_entry(tmp_path: Path):
+    cache = CompileCache(tmp_path)
+    (tmp_path / "a.pickle").write_bytes(b"not a pickle")
+
+    assert cache.get("a") is None
+    assert cache.misses == 1
@@ -65,3 +65,18 @@ def test_overwrite_none():
     assert _can_update(("a",), 2, 1, MergeOptions(overwrite=True, overwrite_none=False))
     assert not _can_update(("a",), 1, None, MergeOptions(overwrite=False, overwrite_none=True))
     assert not _can_update(("a",), 2, 1, MergeOptions(overwrite=False, overwrite_none=True))
+
+
+def test_overlapping_rules():
+    options = MergeOptions(allowed_fields=[("attrs", "a", "type"), "attrs", ("other", "a")])
+    assert _can_update(("attrs",), None, 1, options)
+    assert _can_update(("attrs", "b", "type"), None, 1, options)
+    assert _can_update(("other", "a", "type"), None, 1, options)
+    assert not _can_update(("other",), None, 1, options)
+    assert not _can_update(("other", "b"), None, 1, options)
+
+    options = MergeOptions(ignored_fields=[("attrs", "a"), ("attrs", "a", "type")])
+    assert _can_update(("attrs",), None, 1, options)
+    assert _can_update(("attrs", "b"), None, 1, options)
+    assert not _can_update(("attrs", "a"), None, 1, options)
+    assert not _can_update(("attrs", "a", "type"), None, 1, options)
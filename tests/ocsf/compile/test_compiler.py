@@ -1,8 +1,13 @@
+import asyncio
 import os
 
-from ocsf.repository import read_repo, Repository
+import pytest
+
+from ocsf.schema import to_json
+
+from ocsf.repository import read_repo, Repository, ProfileDefn
 from ocsf.compile.planners.planner import Operation
-from ocsf.compile.compiler import Compilation, CompilationOperations
+from ocsf.compile.compiler import Compilation, CompilationOperations, CycleError, FileOperations
 
 
 class OpTest1(Operation): ...
@@ -11,6 +16,10 @@ class OpTest1(Operation): ...
 class OpTest2(Operation): ...
 
 
+class WritingOp(Operation):
+    writes_prerequisite = True
+
+
 def get_compiler():
     return Compilation(read_repo(os.environ["REPO_PATH"]))
 
@@ -66,3 +75,183 @@ def test_order_live():
 
     # No duplicate ops
     assert len(order) == len(set(order))
+
+
+def test_analyze_stats():
+    compiler = get_compiler()
+    assert compiler.stats is None
+
+    analysis = compiler.analyze()
+    stats = compiler.stats
+    assert stats is not None
+
+    # One entry per planner
+    assert len(stats) == sum(len(phase) for phase in compiler._planners)
+
+    # Every operation is counted against the planner that returned it
+    for n, phase in enumerate(analysis):
+        assert sum(len(ops) for ops in phase.values()) == sum(s.operations for s in stats if s.phase == n)
+
+    files = list(compiler._repo.files())
+    for stat in stats:
+        assert stat.offered + stat.skipped == len(files)
+
+    by_name = {stat.planner: stat for stat in stats}
+    assert by_name["UidPlanner"].skipped > 0
+    assert by_name["MarkProfilePlanner"].offered == len([f for f in files if isinstance(f.data, ProfileDefn)])
+    assert by_name["MarkExtensionPlanner"].offered == len([f for f in files if f.path.startswith("extensions/")])
+
+
+def test_order_levels():
+    ops: CompilationOperations = [
+        {
+            "c": [OpTest1(target="c", prerequisite="a")],
+            "b": [OpTest1(target="b", prerequisite="a")],
+            "a": [OpTest1(target="a", prerequisite=None)],
+            "d": [OpTest1(target="d", prerequisite="c")],
+            "e": [OpTest1(target="e", prerequisite="dictionary.json")],
+        },
+        {
+            "dictionary.json": [OpTest2(target="dictionary.json", prerequisite="dictionary.json")],
+            "a": [OpTest2(target="a", prerequisite="dictionary.json")],
+        },
+    ]
+
+    compiler = Compilation(repo=Repository())
+    compiler.order(ops)
+
+    assert compiler.cycles == []
+    assert compiler.levels is not None
+    assert [[op.target for op in level] for level in compiler.levels] == [
+        ["a", "e"],
+        ["c", "b"],
+        ["d"],
+        ["dictionary.json"],
+        ["a"],
+    ]
+
+
+def test_order_writes_prerequisite():
+    ops: CompilationOperations = [
+        {
+            # "a" writes "extn", which "b" reads after it in the plan and "c" reads before it
+            "c": [OpTest1(target="c", prerequisite="extn")],
+            "a": [WritingOp(target="a", prerequisite="extn")],
+            "b": [OpTest1(target="b", prerequisite="extn")],
+        }
+    ]
+
+    compiler = Compilation(repo=Repository())
+    compiler.order(ops)
+
+    assert compiler.levels is not None
+    assert [[op.target for op in level] for level in compiler.levels] == [["c", "a"], ["b"]]
+
+
+def test_order_deep():
+    # Long chains of prerequisites don't hit the recursion limit
+    depth = 5000
+    phase: FileOperations = {str(i): [OpTest1(target=str(i), prerequisite=str(i + 1))] for i in range(depth)}
+    phase[str(depth)] = [OpTest1(target=str(depth))]
+
+    compiler = Compilation(repo=Repository())
+    order = compiler.order([phase])
+
+    assert [op.target for op in order] == [str(i) for i in range(depth, -1, -1)]
+    assert compiler.levels is not None
+    assert len(compiler.levels) == depth + 1
+
+
+def test_order_cycle():
+    ops: CompilationOperations = [
+        {
+            "a": [OpTest1(target="a", prerequisite="b")],
+            "b": [OpTest1(target="b", prerequisite="c")],
+            "c": [OpTest1(target="c", prerequisite="a")],
+            "d": [OpTest1(target="d")],
+        }
+    ]
+
+    compiler = Compilation(repo=Repository())
+    with pytest.raises(CycleError) as e:
+        compiler.order(ops)
+
+    assert e.value.cycles == [["a", "b", "c", "a"]]
+    assert "a -> b -> c -> a" in str(e.value)
+
+    order = compiler.order(ops, allow_cycles=True)
+    assert [op.target for op in order] == ["c", "b", "a", "d"]
+    assert compiler.cycles == [["a", "b", "c", "a"]]
+
+    # Operations in a cycle can't be applied in parallel
+    assert compiler.levels is not None
+    assert [[op.target for op in level] for level in compiler.levels] == [["c"], ["b"], ["a"], ["d"]]
+
+
+def test_build_target():
+    repo = read_repo(os.environ["REPO_PATH"])
+    schema = Compilation(repo).build()
+
+    assert Compilation(repo).build_target("events/iam/authentication.json") == schema.classes["authentication"]
+    assert Compilation(repo).build_target("authentication") == schema.classes["authentication"]
+    assert Compilation(repo).build_target("process") == schema.objects["process"]
+
+    key = "win/registry_key_query"
+    assert Compilation(repo).build_target(key) == schema.classes[key]
+
+    with pytest.raises(KeyError):
+        Compilation(repo).build_target("not_a_class")
+
+
+def test_build_untracked():
+    repo = read_repo(os.environ["REPO_PATH"])
+
+    tracked = Compilation(repo)
+    mutations = tracked.compile()
+    assert any(len(result) > 0 for ops in mutations.values() for _, result in ops)
+
+    # build() doesn't collect what changed unless compile() was called first
+    untracked = Compilation(repo)
+    assert untracked.build() == tracked.build()
+    assert untracked._mutations is not None
+    assert all(len(result) == 0 for ops in untracked._mutations.values() for _, result in ops)
+
+
+def test_build_lazy():
+    eager = Compilation(read_repo(os.environ["REPO_PATH"])).build()
+    assert to_json(Compilation(read_repo(os.environ["REPO_PATH"], lazy=True)).build()) == to_json(eager)
+
+
+def test_abuild():
+    repo = read_repo(os.environ["REPO_PATH"])
+    expected = to_json(Compilation(repo).build())
+
+    async def build() -> None:
+        compilation = Compilation(repo)
+        # Concurrent builds share one build
+        first, second = await asyncio.gather(compilation.abuild(), compilation.abuild())
+        assert first is second
+        assert first is compilation.build()
+        assert to_json(first) == expected
+
+    asyncio.run(build())
+
+
+def test_abuild_cancel():
+    repo = read_repo(os.environ["REPO_PATH"])
+
+    async def build() -> None:
+        compilation = Compilation(repo)
+        proto = compilation.proto
+        task = asyncio.ensure_future(compilation.abuild())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        # The compilation is left as it was, and can still be built
+        assert compilation.proto is proto
+        assert not any(proto.is_copied(path) for path in repo.paths())
+        assert to_json(await compilation.abuild()) == to_json(Compilation(repo).build())
+
+    asyncio.run(build())
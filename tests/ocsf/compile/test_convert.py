@@ -0,0 +1,103 @@
+import os
+import pytest
+import dacite
+
+from dataclasses import asdict
+from typing import Any, cast
+
+from ocsf.schema import OcsfObject, OcsfProfile, to_dict
+from ocsf.repository import read_repo, ObjectDefn, ProfileDefn, AttrDefn, EnumMemberDefn, DeprecationInfoDefn
+from ocsf.compile.compiler import Compilation
+from ocsf.compile.convert import to_model, to_json_dict
+
+
+def _remove_nones(data: dict[str, Any]) -> None:
+    rm: list[str] = []
+    for k, v in data.items():
+        if v is None:
+            rm.append(k)
+        elif isinstance(v, dict):
+            v = cast(dict[str, Any], v)
+            # No need to update data[k] b/c v is a reference to data[k]
+            _remove_nones(v)
+
+    for k in rm:
+        del data[k]
+
+
+def test_remove_nones():
+    d = {
+        "a": 1,
+        "b": None,
+        "c": {
+            "d": 2,
+            "e": None,
+            "f": {
+                "g": 3,
+                "h": None,
+            },
+        },
+    }
+    _remove_nones(d)
+
+    assert "b" not in d
+    assert "a" in d
+    assert "c" in d
+    assert isinstance(d["c"], dict)
+    assert "e" not in d["c"]
+    assert "d" in d["c"]
+    assert "f" in d["c"]
+    assert isinstance(d["c"]["f"], dict)
+    assert "g" in d["c"]["f"]
+    assert "h" not in d["c"]["f"]
+
+
+def get_object():
+    return ObjectDefn(
+        caption="Thing",
+        name="thing",
+        attributes={
+            "a": AttrDefn(caption="A", type="string_t", enum={"1": EnumMemberDefn(caption="One")}),
+            "b": AttrDefn(caption="B", type="integer_t", requirement="required", is_array=True),
+        },
+        profiles=["host"],
+        deprecated=DeprecationInfoDefn(message="Don't", since="1.0.0"),
+        src_extension="win",
+    )
+
+
+def test_to_model():
+    defn = get_object()
+    data = asdict(defn)
+    _remove_nones(data)
+
+    assert to_model(OcsfObject, defn) == dacite.from_dict(OcsfObject, data)
+
+
+def test_to_model_copies():
+    defn = get_object()
+    obj = to_model(OcsfObject, defn)
+    assert defn.profiles is not None
+    defn.profiles.append("other")
+    assert obj.profiles == ["host"]
+
+
+def test_to_model_missing():
+    with pytest.raises(ValueError):
+        to_model(OcsfObject, ObjectDefn(name="thing"))
+
+
+def test_to_model_annotations():
+    defn = ProfileDefn(caption="Prof", name="prof", annotations=AttrDefn(group="context"))
+    profile = to_model(OcsfProfile, defn)
+    assert profile.annotations == {"group": "context"}
+
+
+def test_to_json_dict():
+    defn = get_object()
+    assert to_json_dict(OcsfObject, defn) == asdict(to_model(OcsfObject, defn))
+
+
+def test_schema_dict():
+    compiler = Compilation(read_repo(os.environ["REPO_PATH"]))
+    assert compiler.build_dict() == to_dict(compiler.build())
@@ -0,0 +1,99 @@
+import json
+import os
+import shutil
+import threading
+import urllib.error
+import urllib.request
+
+from pathlib import Path
+
+from ocsf.schema import to_json
+from ocsf.repository import read_repo
+from ocsf.compile.compiler import Compilation
+from ocsf.compile.daemon import CompileDaemon
+
+
+def _get(url: str, etag: str | None = None) -> tuple[int, bytes, str | None]:
+    request = urllib.request.Request(url)
+    if etag is not None:
+        request.add_header("If-None-Match", etag)
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, response.read(), response.headers.get("ETag")
+    except urllib.error.HTTPError as e:
+        return e.code, e.read(), e.headers.get("ETag")
+
+
+def test_daemon(tmp_path: Path):
+    root = tmp_path / "schema"
+    shutil.copytree(os.environ["REPO_PATH"], root)
+
+    daemon = CompileDaemon(root)
+    assert daemon.check()
+    assert not daemon.check()
+
+    server = daemon.server()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = "http://%s:%d" % server.server_address[:2]
+
+    try:
+        status, body, etag = _get(url + "/schema")
+        assert status == 200
+        assert body.decode() == to_json(Compilation(read_repo(root)).build())
+
+        assert _get(url + "/schema", etag)[0] == 304
+        assert etag is not None
+        assert _get(url + "/schema", f'"other", W/{etag}')[0] == 304
+        assert _get(url + "/schema", "*")[0] == 304
+        # A tag containing the ETag isn't the ETag
+        assert _get(url + "/schema", etag[:-1] + 'x"' + etag)[0] == 200
+
+        status, body, process_etag = _get(url + "/objects/process")
+        assert status == 200
+        assert json.loads(body)["name"] == "process"
+        assert _get(url + "/classes/win/registry_key_query")[0] == 200
+        assert _get(url + "/classes/nothing")[0] == 404
+
+        # Edit a file, and the schema is recompiled
+        device = root / "objects" / "device.json"
+        data = json.loads(device.read_text())
+        data["attributes"]["hostname"]["caption"] = "Edited Hostname"
+        device.write_text(json.dumps(data))
+
+        assert daemon.check()
+
+        status, body, new_etag = _get(url + "/schema", etag)
+        assert status == 200 and new_etag != etag
+        status, body, _ = _get(url + "/objects/device")
+        assert json.loads(body)["attributes"]["hostname"]["caption"] == "Edited Hostname"
+
+        # Parts that didn't change keep their ETag
+        assert _get(url + "/objects/process", process_etag)[0] == 304
+
+        status, body, _ = _get(url + "/status")
+        assert json.loads(body)["generation"] == 2
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_daemon_error(tmp_path: Path):
+    root = tmp_path / "schema"
+    shutil.copytree(os.environ["REPO_PATH"], root)
+
+    daemon = CompileDaemon(root)
+    daemon.check()
+    snapshot = daemon.snapshot
+
+    # A half-written file keeps the last schema, and is read again once it's fixed
+    device = root / "objects" / "device.json"
+    text = device.read_text()
+    device.write_text(text[:100])
+    assert not daemon.check()
+    assert daemon.error is not None
+    assert daemon.snapshot is snapshot
+
+    device.write_text(text + "\n")
+    assert daemon.check()
+    assert daemon.error is None
+    assert daemon.snapshot is not None and daemon.snapshot.generation == 2
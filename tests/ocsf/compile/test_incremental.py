@@ -0,0 +1,232 @@
+import os
+import random
+
+from copy import deepcopy
+from typing import Callable, Optional
+
+import pytest
+
+from ocsf.schema import to_json
+from ocsf.repository import (
+    read_repo,
+    Repository,
+    DefinitionFile,
+    RepoPath,
+    AttrDefn,
+    ObjectDefn,
+    EventDefn,
+    ProfileDefn,
+    DictionaryDefn,
+    ExtensionDefn,
+    DefnWithAttrs,
+)
+from ocsf.compile.compiler import Compilation
+from ocsf.compile.incremental import affected, closure
+from ocsf.compile.planners.planner import Operation
+
+
+class OpTest(Operation): ...
+
+
+class WritesPrereqOp(Operation):
+    writes_prerequisite = True
+
+
+def test_affected():
+    old = [
+        {
+            "b": [OpTest(target="b", prerequisite="a")],
+            "c": [OpTest(target="c", prerequisite="b")],
+            "e": [OpTest(target="e", prerequisite="x")],
+        }
+    ]
+    new = [
+        {
+            "b": [OpTest(target="b", prerequisite="a")],
+            "c": [OpTest(target="c", prerequisite="b")],
+            "e": [OpTest(target="e", prerequisite="y")],
+        }
+    ]
+
+    assert affected(old, old, ["a"], []) == {"a", "b", "c"}
+    assert affected(old, old, ["c"], []) == {"c"}
+    assert affected(old, new, [], []) == {"e"}
+
+
+def test_affected_writes_prerequisite():
+    ops = [{"dest": [WritesPrereqOp(target="dest", prerequisite="src")]}]
+
+    assert affected(ops, ops, ["dest"], []) == {"dest", "src"}
+    assert affected(ops, ops, ["src"], []) == {"dest", "src"}
+
+
+def test_affected_extension():
+    paths = ["extensions/x/extension.json", "extensions/x/objects/a.json", "extensions/y/objects/b.json"]
+    assert affected([{}], [{}], ["extensions/x/extension.json"], paths) == {
+        "extensions/x/extension.json",
+        "extensions/x/objects/a.json",
+    }
+
+
+def test_closure():
+    ops = [
+        {
+            "b": [OpTest(target="b", prerequisite="a")],
+            "a": [OpTest(target="a", prerequisite="categories.json")],
+            "c": [OpTest(target="c", prerequisite="b")],
+        },
+        {"c": [OpTest(target="c", prerequisite="dictionary.json")], "dictionary.json": [OpTest("dictionary.json")]},
+    ]
+
+    # categories.json is only read, so it doesn't need to be compiled
+    assert closure(ops, ["c"]) == {"a", "b", "c", "dictionary.json"}
+    assert closure(ops, ["a"]) == {"a"}
+
+
+def _compiled(repo: Repository) -> str:
+    return to_json(Compilation(repo).build())
+
+
+def _replace(repo: Repository, path: RepoPath, edit: Callable[[DefinitionFile], None]) -> None:
+    file = deepcopy(repo[path])
+    edit(file)
+    repo[path] = file
+
+
+def _attrs(file: DefinitionFile) -> dict[str, AttrDefn]:
+    assert isinstance(file.data, DefnWithAttrs) and file.data.attributes is not None
+    return {k: v for k, v in file.data.attributes.items() if isinstance(v, AttrDefn)}
+
+
+def _pick(rng: random.Random, repo: Repository, kind: type, prefix: str = "") -> Optional[RepoPath]:
+    paths = [
+        f.path
+        for f in repo.files()
+        if isinstance(f.data, kind) and f.path.startswith(prefix) and len(_attrs(f)) > 0 and f.path != "dictionary.json"
+    ]
+    return rng.choice(sorted(paths)) if len(paths) > 0 else None
+
+
+def _edit_caption(rng: random.Random, repo: Repository, n: int) -> list[RepoPath]:
+    path = _pick(rng, repo, rng.choice([ObjectDefn, EventDefn, ProfileDefn]))
+    assert path is not None
+    name = rng.choice(sorted(_attrs(repo[path])))
+    _replace(repo, path, lambda f: setattr(_attrs(f)[name], "caption", f"Edited {n}"))
+    return [path]
+
+
+def _edit_dictionary(rng: random.Random, repo: Repository, n: int) -> list[RepoPath]:
+    name = rng.choice(sorted(_attrs(repo["dictionary.json"])))
+    _replace(repo, "dictionary.json", lambda f: setattr(_attrs(f)[name], "description", f"Edited {n}"))
+    return ["dictionary.json"]
+
+
+def _add_attribute(rng: random.Random, repo: Repository, n: int) -> list[RepoPath]:
+    path = _pick(rng, repo, rng.choice([ObjectDefn, EventDefn]))
+    assert path is not None
+    name = rng.choice(sorted(_attrs(repo["dictionary.json"])))
+
+    def edit(file: DefinitionFile):
+        assert isinstance(file.data, DefnWithAttrs) and file.data.attributes is not None
+        file.data.attributes[name] = AttrDefn(requirement="optional")
+
+    _replace(repo, path, edit)
+    return [path]
+
+
+def _edit_extension(rng: random.Random, repo: Repository, n: int) -> list[RepoPath]:
+    path = _pick(rng, repo, ObjectDefn, "extensions/")
+    assert path is not None
+    name = rng.choice(sorted(_attrs(repo[path])))
+    _replace(repo, path, lambda f: setattr(_attrs(f)[name], "description", f"Edited {n}"))
+    return [path]
+
+
+def _new_object(rng: random.Random, repo: Repository, n: int) -> list[RepoPath]:
+    path = f"objects/new_object_{n}.json"
+    names = rng.sample(sorted(_attrs(repo["dictionary.json"])), 3)
+    attrs: dict[str, AttrDefn | str | list[str]] = {name: AttrDefn(requirement="optional") for name in names}
+    repo[path] = DefinitionFile(
+        path, data=ObjectDefn(name=f"new_object_{n}", caption=f"New {n}", extends="object", attributes=attrs)
+    )
+    return [path]
+
+
+def _remove_event(rng: random.Random, repo: Repository, n: int) -> list[RepoPath]:
+    # Only remove classes that no other class extends
+    extended = {f.data.extends for f in repo.files() if isinstance(f.data, EventDefn)}
+    paths = [
+        f.path
+        for f in repo.files()
+        if isinstance(f.data, EventDefn) and f.data.name not in extended and f.path.startswith("events/")
+    ]
+    path = rng.choice(sorted(paths))
+    del repo[path]
+    return [path]
+
+
+EDITS = [_edit_caption, _edit_dictionary, _add_attribute, _edit_extension, _new_object, _remove_event]
+
+
+@pytest.mark.parametrize("seed", [1, 2])
+def test_recompile_random_edits(seed: int):
+    rng = random.Random(seed)
+    repo = read_repo(os.environ["REPO_PATH"])
+    compilation = Compilation(repo)
+    compilation.build()
+
+    for n in range(3):
+        changed: list[RepoPath] = []
+        for _ in range(rng.randint(1, 2)):
+            changed += rng.choice(EDITS)(rng, repo, seed * 100 + n)
+
+        assert to_json(compilation.recompile(changed)) == _compiled(repo)
+
+
+def test_recompile_only_affected():
+    repo = read_repo(os.environ["REPO_PATH"])
+    compilation = Compilation(repo)
+    before = compilation.build()
+
+    _replace(repo, "objects/device.json", lambda f: setattr(_attrs(f)["hostname"], "caption", "Edited"))
+    after = compilation.recompile(["objects/device.json"])
+
+    assert to_json(after) == _compiled(repo)
+    assert after.objects["device"].attributes["hostname"].caption == "Edited"
+
+    # Only the file and the files that extend it were compiled again
+    assert compilation.recompiled is not None
+    assert "objects/device.json" in compilation.recompiled
+    assert "objects/user.json" not in compilation.recompiled
+    assert after.objects["user"] is before.objects["user"]
+
+
+def test_recompile_extension_json():
+    repo = read_repo(os.environ["REPO_PATH"])
+    compilation = Compilation(repo)
+    compilation.build()
+
+    path = "extensions/windows/extension.json"
+
+    def edit(file: DefinitionFile):
+        assert isinstance(file.data, ExtensionDefn)
+        file.data.uid = 42
+
+    _replace(repo, path, edit)
+    after = compilation.recompile([path])
+
+    assert to_json(after) == _compiled(repo)
+    assert compilation.recompiled is not None
+    assert "extensions/windows/events/registry_key_query.json" in compilation.recompiled
+
+
+def test_recompile_before_build():
+    repo = read_repo(os.environ["REPO_PATH"])
+    compilation = Compilation(repo)
+
+    def edit(file: DefinitionFile):
+        assert isinstance(file.data, DictionaryDefn)
+        file.data.caption = "Edited"
+
+    _replace(repo, "dictionary.json", edit)
+    assert to_json(compilation.recompile(["dictionary.json"])) == _compiled(repo)
@@ -0,0 +1,62 @@
+import json
+import os
+
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from ocsf.schema import to_json
+from ocsf.repository import read_repo
+from ocsf.compile.__main__ import main
+from ocsf.compile.compiler import Compilation
+from ocsf.compile.options import CompilationOptions
+
+
+def test_build(tmp_path: Path):
+    output = tmp_path / "schema.json"
+    assert main(["build", os.environ["REPO_PATH"], "-o", str(output)]) == 0
+    assert output.read_text() == to_json(Compilation(read_repo(os.environ["REPO_PATH"])).build())
+
+
+def test_build_options(tmp_path: Path):
+    output = tmp_path / "schema.json"
+    assert main(["build", os.environ["REPO_PATH"], "-o", str(output), "--extensions", "--profiles", "host"]) == 0
+
+    options = CompilationOptions(extensions=[], profiles=["host"])
+    assert output.read_text() == to_json(Compilation(read_repo(os.environ["REPO_PATH"]), options).build())
+
+
+def test_build_target(tmp_path: Path, capsys: pytest.CaptureFixture[str]):
+    assert main(["build", os.environ["REPO_PATH"], "--target", "authentication", "--timings"]) == 0
+
+    out, err = capsys.readouterr()
+    assert json.loads(out)["name"] == "authentication"
+    assert "analyze" in err
+
+
+def test_build_errors(tmp_path: Path, capsys: pytest.CaptureFixture[str]):
+    output = tmp_path / "schema.json"
+
+    assert main(["build", str(tmp_path / "missing"), "-o", str(output)]) == 1
+    assert main(["build", os.environ["REPO_PATH"], "--target", "nothing", "-o", str(output)]) == 1
+    assert not output.exists()
+
+    _, err = capsys.readouterr()
+    assert "Object or event class nothing not found" in err
+
+
+def test_build_write_error(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    output = tmp_path / "schema.json"
+    output.write_text("previous")
+
+    def write(self: Compilation, out: Any) -> None:
+        out.write('{"partial": ')
+        raise ValueError("conversion failed")
+
+    monkeypatch.setattr(Compilation, "write", write)
+    assert main(["build", os.environ["REPO_PATH"], "-o", str(output)]) == 1
+
+    # The previous output is left alone, with no temporary file beside it
+    assert output.read_text() == "previous"
+    assert [path.name for path in tmp_path.iterdir()] == ["schema.json"]
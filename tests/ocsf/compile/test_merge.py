@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 from typing import Optional
 
-from ocsf.repository import DefinitionPart
+from ocsf.repository import DefinitionPart, AttrDefn, EnumMemberDefn, ObjectDefn
 from ocsf.compile.merge import merge, MergeOptions
 
 
@@ -191,3 +191,65 @@ def test_empty_left_dict():
     assert len(r) == 3
     assert left.attrs is not None
     assert "a" in left.attrs
+
+
+def test_untracked_merge():
+    left = AttrDefn(caption="Left")
+    right = AttrDefn(caption="Right", description="Right", enum={"1": EnumMemberDefn(caption="One")})
+
+    assert merge(left, right, track=False) == []
+    assert left.caption == "Left"
+    assert left.description == "Right"
+    assert left.enum is not None and left.enum["1"].caption == "One"
+
+
+def test_copy():
+    right = ComplexPart(
+        value=2,
+        other=SimplePart(value=3),
+        attrs={"a": SimplePart(value=4), "c": SimplePart(value=5)},
+    )
+
+    left = ComplexPart(value=1, attrs={"a": SimplePart(value=1)})
+    merge(left, right)
+    assert left.other == right.other and left.other is not right.other
+    assert left.attrs is not None and left.attrs["c"] == right.attrs["c"]
+    assert left.attrs["c"] is not right.attrs["c"]
+    left.attrs["c"].value = 6
+    assert right.attrs["c"].value == 5
+
+    left = ComplexPart(value=1)
+    merge(left, right, options=MergeOptions(copy=False))
+    assert left.other is right.other
+    assert left.attrs is right.attrs
+
+
+def test_ignored_subtree():
+    left = ComplexPart(value=1, other=SimplePart(), attrs={"a": SimplePart(), "l": ["x"]})
+    right = ComplexPart(
+        value=2,
+        other=SimplePart(value=3),
+        attrs={"a": SimplePart(value=4), "b": SimplePart(value=5), "l": ["y"]},
+    )
+    r = merge(left, right, ignored_fields=["attrs"])
+    assert r == [("other", "value")]
+    assert left.attrs == {"a": SimplePart(), "l": ["x"]}
+
+    r = merge(left, right, options=MergeOptions(allowed_fields=[("attrs", "a")]))
+    assert r == [("attrs", "a", "value")]
+    assert left.attrs == {"a": SimplePart(value=4), "l": ["x"]}
+
+
+def test_lists_merged_in_excluded_fields():
+    left = ObjectDefn(profiles=["a"])
+    r = merge(left, ObjectDefn(profiles=["b"]), allowed_fields=["attributes"])
+    assert r == [("profiles",)]
+    assert left.profiles is not None and sorted(left.profiles) == ["a", "b"]
+
+    left = ObjectDefn(attributes={"x": AttrDefn(profile=["a"])})
+    right = ObjectDefn(attributes={"x": AttrDefn(caption="X", profile=["b"])})
+    r = merge(left, right, ignored_fields=["attributes"])
+    assert r == [("attributes", "x", "profile")]
+    assert left.attributes is not None and isinstance(left.attributes["x"], AttrDefn)
+    assert left.attributes["x"].caption is None
+    assert sorted(left.attributes["x"].profile or []) == ["a", "b"]
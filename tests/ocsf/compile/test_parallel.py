@@ -0,0 +1,92 @@
+import os
+
+import pytest
+
+from ocsf.schema import to_json
+from ocsf.repository import read_repo, Repository, DefinitionFile, ObjectDefn
+from ocsf.compile import parallel
+from ocsf.compile.compiler import Compilation
+from ocsf.compile.merge import MergeResult
+from ocsf.compile.planners.planner import Operation
+from ocsf.compile.protoschema import ProtoSchema
+
+
+class CaptionOp(Operation):
+    """Append the target's name to the caption of the file at prerequisite."""
+
+    def apply(self, schema: ProtoSchema) -> MergeResult:
+        assert self.prerequisite is not None
+        data = schema[self.prerequisite].data
+        assert isinstance(data, ObjectDefn)
+        data.caption = (data.caption or "") + self.target
+        return [("caption",)]
+
+
+class ReadCaptionOp(Operation):
+    """Copy the caption of the file at prerequisite to the target."""
+
+    def apply(self, schema: ProtoSchema) -> MergeResult:
+        assert self.prerequisite is not None
+        source = schema.read(self.prerequisite).data
+        data = schema[self.target].data
+        assert isinstance(source, ObjectDefn) and isinstance(data, ObjectDefn)
+        data.caption = source.caption
+        return [("caption",)]
+
+
+@pytest.mark.skipif(not parallel.can_fork(), reason="requires fork")
+def test_compile_parallel(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(parallel, "MIN_PARALLEL_OPS", 2)
+
+    serial = Compilation(read_repo(os.environ["REPO_PATH"]))
+    concurrent = Compilation(read_repo(os.environ["REPO_PATH"]), jobs=3)
+
+    serial_mutations = serial.compile()
+    concurrent_mutations = concurrent.compile()
+    assert to_json(concurrent.build()) == to_json(serial.build())
+
+    assert list(concurrent_mutations.keys()) == list(serial_mutations.keys())
+    for path, mutations in serial_mutations.items():
+        assert [result for _, result in concurrent_mutations[path]] == [result for _, result in mutations]
+
+
+@pytest.mark.skipif(not parallel.can_fork(), reason="requires fork")
+def test_apply_parallel_conflict(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(parallel, "MIN_PARALLEL_OPS", 2)
+
+    repo = Repository()
+    repo["objects/shared.json"] = DefinitionFile("objects/shared.json", data=ObjectDefn(caption=""))
+    proto = ProtoSchema(repo)
+
+    # Each operation modifies the same file, which isn't the target of any of them
+    ops: list[Operation] = [CaptionOp(target=name, prerequisite="objects/shared.json") for name in "abcd"]
+    results = parallel.apply_parallel(proto, [ops], jobs=2)
+
+    assert results == [[[("caption",)]] * 4]
+    data = proto.read("objects/shared.json").data
+    assert isinstance(data, ObjectDefn)
+    assert data.caption == "abcd"
+
+
+@pytest.mark.skipif(not parallel.can_fork(), reason="requires fork")
+def test_apply_parallel_read_conflict(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(parallel, "MIN_PARALLEL_OPS", 2)
+
+    repo = Repository()
+    for name in ("a", "b", "c"):
+        repo[f"objects/{name}.json"] = DefinitionFile(f"objects/{name}.json", data=ObjectDefn(caption=""))
+    proto = ProtoSchema(repo)
+
+    # The second operation reads the file the first one writes, so the level
+    # has to be applied in order
+    ops: list[Operation] = [
+        CaptionOp(target="x", prerequisite="objects/a.json"),
+        ReadCaptionOp(target="objects/b.json", prerequisite="objects/a.json"),
+        ReadCaptionOp(target="objects/c.json", prerequisite="objects/a.json"),
+    ]
+    parallel.apply_parallel(proto, [ops], jobs=3)
+
+    for name in ("b", "c"):
+        data = proto.read(f"objects/{name}.json").data
+        assert isinstance(data, ObjectDefn)
+        assert data.caption == "x"
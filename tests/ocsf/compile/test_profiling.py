@@ -0,0 +1,45 @@
+import os
+import tracemalloc
+
+from ocsf.repository import read_repo
+from ocsf.compile.compiler import Compilation
+from ocsf.compile.planners.dictionary import DictionaryOp
+from ocsf.compile.profiling import Profiler
+
+
+def test_profile_build():
+    profiler = Profiler()
+    compilation = Compilation(read_repo(os.environ["REPO_PATH"]), profiler=profiler)
+    compilation.build()
+    report = profiler.report()
+
+    for step in ("analyze", "order", "compile", "schema"):
+        entry = report.get("step", step)
+        assert entry is not None and entry.calls == 1 and entry.seconds > 0
+
+    assert [e.name for e in report.entries if e.category == "phase"] == [f"phase {n}" for n in range(4)]
+
+    assert compilation._plan is not None
+    entry = report.get("apply", "DictionaryOp")
+    assert entry is not None
+    assert entry.calls == len([op for op in compilation._plan if isinstance(op, DictionaryOp)])
+    assert entry.allocated is None
+
+    assert compilation.stats is not None
+    for stat in compilation.stats:
+        entry = report.get("analyze", stat.planner)
+        assert (entry.calls if entry is not None else 0) == stat.offered
+
+    summary = report.summary()
+    assert "DictionaryOp" in summary and "IncludePlanner" in summary
+
+
+def test_profile_allocations():
+    profiler = Profiler(allocations=True)
+    with profiler:
+        Compilation(read_repo(os.environ["REPO_PATH"]), profiler=profiler).build()
+    assert not tracemalloc.is_tracing()
+
+    entry = profiler.report().get("step", "compile")
+    assert entry is not None and entry.allocated is not None
+    assert "alloc KiB" in profiler.report().summary()
@@ -0,0 +1,65 @@
+from ocsf.repository import Repository, DefinitionFile, ObjectDefn, AttrDefn
+from ocsf.compile.protoschema import ProtoSchema
+
+
+def get_repo():
+    repo = Repository()
+    repo["objects/thing.json"] = DefinitionFile(
+        "objects/thing.json", data=ObjectDefn(name="thing", attributes={"a": AttrDefn(caption="A")})
+    )
+    repo["objects/other.json"] = DefinitionFile("objects/other.json", data=ObjectDefn(name="other"))
+    return repo
+
+
+def test_read_does_not_copy():
+    repo = get_repo()
+    ps = ProtoSchema(repo)
+
+    assert ps.read("objects/thing.json") is repo["objects/thing.json"]
+    assert not ps.is_copied("objects/thing.json")
+
+
+def test_copy_on_write():
+    repo = get_repo()
+    ps = ProtoSchema(repo)
+
+    file = ps["objects/thing.json"]
+    assert ps.is_copied("objects/thing.json")
+    assert file is not repo["objects/thing.json"]
+    assert file == repo["objects/thing.json"]
+    assert ps.read("objects/thing.json") is file
+
+    assert isinstance(file.data, ObjectDefn) and file.data.attributes is not None
+    attr = file.data.attributes["a"]
+    assert isinstance(attr, AttrDefn)
+    attr.caption = "Changed"
+
+    original = repo["objects/thing.json"].data
+    assert isinstance(original, ObjectDefn) and original.attributes is not None
+    assert original.attributes["a"] == AttrDefn(caption="A")
+
+
+def test_paths():
+    ps = ProtoSchema(get_repo())
+    ps["objects/new.json"] = DefinitionFile("objects/new.json", data=ObjectDefn(name="new"))
+
+    assert list(ps.paths()) == ["objects/thing.json", "objects/other.json", "objects/new.json"]
+    assert "objects/new.json" in ps
+    assert ps.find_object("new").path == "objects/new.json"
+    assert ps.find_object("other").path == "objects/other.json"
+
+
+def test_journal():
+    ps = ProtoSchema(get_repo())
+    ps["objects/thing.json"]
+
+    ps.start_journal()
+    ps.read("objects/other.json")
+    ps["objects/new.json"] = DefinitionFile("objects/new.json", data=ObjectDefn(name="new"))
+    ps["objects/thing.json"]
+    ps["objects/new.json"]
+    assert ps.journal() == ["objects/new.json", "objects/thing.json"]
+
+    assert ps.stop_journal() == ["objects/new.json", "objects/thing.json"]
+    ps["objects/other.json"]
+    assert ps.journal() == []
@@ -0,0 +1,27 @@
+import io
+import os
+
+from ocsf.schema import to_json
+from ocsf.repository import read_repo, Repository, DefinitionFile, VersionDefn
+from ocsf.compile.compiler import Compilation
+from ocsf.compile.protoschema import ProtoSchema
+from ocsf.compile.stream import write_schema
+
+
+def test_write_schema():
+    compiler = Compilation(read_repo(os.environ["REPO_PATH"]))
+    out = io.StringIO()
+    compiler.write(out)
+
+    assert out.getvalue() == to_json(compiler.build())
+
+
+def test_write_empty_schema():
+    repo = Repository()
+    repo["version.json"] = DefinitionFile("version.json", data=VersionDefn(version="1.2.3"))
+    proto = ProtoSchema(repo)
+
+    out = io.StringIO()
+    write_schema(proto, out)
+
+    assert out.getvalue() == to_json(proto.schema())
@@ -0,0 +1,27 @@
+import os
+
+from ocsf.schema import to_json
+from ocsf.repository import read_repo
+from ocsf.compile.compiler import Compilation
+from ocsf.compile.options import CompilationOptions
+from ocsf.compile.variants import compile_variants
+
+
+def test_compile_variants():
+    repo = read_repo(os.environ["REPO_PATH"])
+    variants = [
+        CompilationOptions(),
+        CompilationOptions(profiles=[]),
+        CompilationOptions(extensions=[]),
+        CompilationOptions(extensions=["windows"], set_object_types=False),
+    ]
+
+    compilations = compile_variants(repo, variants)
+
+    assert len(compilations) == len(variants)
+    for options, compilation in zip(variants, compilations):
+        assert to_json(compilation.build()) == to_json(Compilation(repo, options).build())
+
+
+def test_compile_variants_empty():
+    assert compile_variants(read_repo(os.environ["REPO_PATH"]), []) == []
@@ -0,0 +1,70 @@
+import json
+import os
+import pytest
+import dacite
+
+from pathlib import Path
+
+from ocsf.schema import keys_to_names
+from ocsf.repository import (
+    AttrDefn,
+    DecodeError,
+    EnumMemberDefn,
+    EventDefn,
+    ObjectDefn,
+    DeprecationInfoDefn,
+    decode,
+    decoder,
+    path_defn_t,
+)
+
+
+def test_decoder_cached():
+    assert decoder(ObjectDefn) is decoder(ObjectDefn)
+
+
+def test_decode_unions():
+    data = {
+        "name": "thing",
+        "attributes": {
+            "$include": ["includes/a.json", "includes/b.json"],
+            "a": {"requirement": "required", "enum": {"1": {"caption": "One"}}},
+        },
+        "$include": "includes/c.json",
+        "@deprecated": {"message": "Use other_thing", "since": "1.1.0"},
+        "unknown_key": True,
+    }
+
+    defn = decode(ObjectDefn, data)
+    assert defn.name == "thing"
+    assert defn.include_ == "includes/c.json"
+    assert defn.deprecated == DeprecationInfoDefn(message="Use other_thing", since="1.1.0")
+    assert defn.attributes is not None
+    assert defn.attributes["include_"] == ["includes/a.json", "includes/b.json"]
+    assert defn.attributes["a"] == AttrDefn(requirement="required", enum={"1": EnumMemberDefn(caption="One")})
+
+    # Renamed keys are moved to the end, as with keys_to_names
+    assert list(defn.attributes.keys()) == ["a", "include_"]
+
+
+def test_decode_wrong_type():
+    with pytest.raises(DecodeError):
+        decode(EventDefn, {"uid": "one"})
+
+    with pytest.raises(DecodeError):
+        decode(EventDefn, {"attributes": {"a": 1}})
+
+
+def test_decode_versus_dacite():
+    root = Path(os.environ["REPO_PATH"])
+    for path in root.rglob("*.json"):
+        try:
+            kind = path_defn_t(path.relative_to(root))
+        except ValueError:
+            continue
+
+        with open(path) as file:
+            raw = file.read()
+
+        expected = dacite.from_dict(kind, keys_to_names(json.loads(raw)))
+        assert decode(kind, json.loads(raw)) == expected, f"Mismatch decoding {path}"
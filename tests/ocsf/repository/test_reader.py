@@ -0,0 +1,105 @@
+import asyncio
+import json
+import os
+import shutil
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from ocsf.repository import read_repo, read_repo_async, LazyDefinitionFile, ObjectDefn
+from ocsf.repository.cache import RepoCache
+
+
+def test_read_repo():
+    repo = read_repo(os.environ["REPO_PATH"])
+    assert "dictionary.json" in repo
+    assert "objects/databucket.json" in repo
+    assert "events/iam/authentication.json" in repo
+    assert "extensions/linux/extension.json" in repo
+
+
+def test_read_repo_jobs():
+    serial = read_repo(os.environ["REPO_PATH"], preserve_raw_data=True)
+    parallel = read_repo(os.environ["REPO_PATH"], preserve_raw_data=True, jobs=2)
+
+    assert list(serial.paths()) == list(parallel.paths())
+    for path in serial.paths():
+        assert serial[path] == parallel[path]
+
+
+def test_read_repo_executor():
+    serial = read_repo(os.environ["REPO_PATH"])
+
+    with ThreadPoolExecutor(2) as executor:
+        parallel = read_repo(os.environ["REPO_PATH"], executor=executor)
+
+    assert list(serial.paths()) == list(parallel.paths())
+    for path in serial.paths():
+        assert serial[path] == parallel[path]
+
+
+def test_read_repo_async():
+    serial = read_repo(os.environ["REPO_PATH"], preserve_raw_data=True)
+    loaded = asyncio.run(read_repo_async(os.environ["REPO_PATH"], preserve_raw_data=True, batch_size=10))
+
+    assert list(serial.paths()) == list(loaded.paths())
+    for path in serial.paths():
+        assert serial[path] == loaded[path]
+
+
+def test_read_repo_lazy():
+    eager = read_repo(os.environ["REPO_PATH"], preserve_raw_data=True)
+    lazy = read_repo(os.environ["REPO_PATH"], preserve_raw_data=True, lazy=True)
+
+    assert list(eager.paths()) == list(lazy.paths())
+    assert "dictionary.json" in lazy
+    assert len(eager) == len(lazy)
+
+    for file in lazy.files():
+        assert isinstance(file, LazyDefinitionFile)
+        assert not file.loaded
+
+    dictionary = lazy["dictionary.json"]
+    assert isinstance(dictionary, LazyDefinitionFile)
+    assert dictionary.short_name() == "dictionary"
+    assert not dictionary.loaded
+    assert dictionary.data == eager["dictionary.json"].data
+    assert dictionary.loaded
+    assert not lazy["categories.json"].loaded  # type: ignore
+
+    for path in eager.paths():
+        assert eager[path] == lazy[path]
+
+
+def test_read_repo_cache(tmp_path: Path):
+    root = tmp_path / "repo"
+    shutil.copytree(os.environ["REPO_PATH"], root)
+    cache_dir = tmp_path / "cache"
+
+    expected = read_repo(root)
+    cold = read_repo(root, cache_dir=cache_dir)
+    assert list(expected.paths()) == list(cold.paths())
+    assert len(list(cache_dir.iterdir())) == 1
+
+    warm = read_repo(root, cache_dir=cache_dir)
+    for path in expected.paths():
+        assert expected[path] == warm[path]
+
+    # Touching a file without changing it is still a hit
+    cache = RepoCache(cache_dir, root)
+    os.utime(root / "dictionary.json", ns=(0, 0))
+    assert cache.get(str(root / "dictionary.json")) is not None
+
+    # Changed files are decoded again
+    with open(root / "objects" / "databucket.json", "r+") as file:
+        data = json.load(file)
+        data["caption"] = "Changed"
+        file.seek(0)
+        file.truncate()
+        json.dump(data, file)
+
+    changed = read_repo(root, cache_dir=cache_dir)
+    databucket = changed["objects/databucket.json"].data
+    assert isinstance(databucket, ObjectDefn)
+    assert databucket.caption == "Changed"
+    assert changed["dictionary.json"] == expected["dictionary.json"]
@@ -0,0 +1,78 @@
+from ocsf.repository import Repository, DefinitionFile, ObjectDefn, EventDefn, ExtensionDefn
+
+
+def get_repo():
+    repo = Repository()
+    repo["objects/thing.json"] = DefinitionFile("objects/thing.json", data=ObjectDefn(name="thing"))
+    repo["objects/_entity.json"] = DefinitionFile("objects/_entity.json", data=ObjectDefn(name="entity"))
+    repo["events/network/network.json"] = DefinitionFile(
+        "events/network/network.json", data=EventDefn(name="network_activity")
+    )
+    repo["events/network/ssh.json"] = DefinitionFile("events/network/ssh.json", data=EventDefn(name="ssh"))
+    repo["extensions/win/extension.json"] = DefinitionFile(
+        "extensions/win/extension.json", data=ExtensionDefn(name="windows", uid=2)
+    )
+    repo["extensions/win/objects/thing.json"] = DefinitionFile(
+        "extensions/win/objects/thing.json", data=ObjectDefn(name="thing")
+    )
+    repo["extensions/win/events/network/cifs.json"] = DefinitionFile(
+        "extensions/win/events/network/cifs.json", data=EventDefn(name="cifs")
+    )
+    return repo
+
+
+def test_find():
+    repo = get_repo()
+    assert repo.find("thing", ObjectDefn) == ["objects/thing.json", "extensions/win/objects/thing.json"]
+    assert repo.find("thing", EventDefn) == []
+    assert repo.find("entity") == ["objects/_entity.json"]
+    assert repo.find("nope") == []
+
+
+def test_find_stem():
+    repo = get_repo()
+    assert repo.find_stem("thing") == ["objects/thing.json", "extensions/win/objects/thing.json"]
+    assert repo.find_stem("_entity") == ["objects/_entity.json"]
+
+
+def test_category_events():
+    repo = get_repo()
+    assert repo.category_events("network") == [
+        "events/network/network.json",
+        "events/network/ssh.json",
+        "extensions/win/events/network/cifs.json",
+    ]
+    assert repo.category_events("iam") == []
+
+
+def test_extensions():
+    repo = get_repo()
+    assert list(repo.extensions()) == ["win"]
+    assert repo.has_extension("win")
+    assert repo.find_extension("windows") == "win"
+    assert repo.find_extension("win") is None
+    assert repo.extension_info("win") == ("windows", 2)
+
+
+def test_index_updates():
+    repo = get_repo()
+    assert repo.find("thing", ObjectDefn) == ["objects/thing.json", "extensions/win/objects/thing.json"]
+
+    # Replacing a file keeps its position but updates its name
+    repo["objects/thing.json"] = DefinitionFile("objects/thing.json", data=ObjectDefn(name="other"))
+    assert repo.find("thing", ObjectDefn) == ["extensions/win/objects/thing.json"]
+    assert repo.find("other", ObjectDefn) == ["objects/thing.json"]
+    assert list(repo.paths())[0] == "objects/thing.json"
+
+    del repo["events/network/ssh.json"]
+    assert repo.category_events("network") == [
+        "events/network/network.json",
+        "extensions/win/events/network/cifs.json",
+    ]
+    assert repo.find_stem("ssh") == []
+
+    del repo["extensions/win/extension.json"]
+    del repo["extensions/win/objects/thing.json"]
+    del repo["extensions/win/events/network/cifs.json"]
+    assert list(repo.extensions()) == []
+    assert repo.find_extension("windows") is None
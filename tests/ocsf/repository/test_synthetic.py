@@ -0,0 +1,50 @@
+from pathlib import Path
+
+from ocsf.repository import read_repo, EventDefn, ObjectDefn
+from ocsf.repository.synthetic import SyntheticOptions, generate_repo, write_repo
+from ocsf.compile.compiler import Compilation
+
+
+def test_generate_repo():
+    options = SyntheticOptions(objects=20, events=12, categories=3, extensions=2)
+    repo = generate_repo(options)
+
+    objects = [path for path in repo.paths() if isinstance(repo[path].data, ObjectDefn)]
+    events = [path for path in repo.paths() if isinstance(repo[path].data, EventDefn)]
+    # Each extension has new objects and a patch of a core object
+    assert len(objects) == 20 + 2 * (options.extension_objects + 1)
+    # Plus base_event and a class for each category
+    assert len(events) == 12 + 2 * options.extension_events + 1 + 3
+    assert set(repo.extensions()) == {"extension_0", "extension_1"}
+
+    # The same options make the same repository
+    again = generate_repo(options)
+    assert list(repo.paths()) == list(again.paths())
+    assert all(repo[path] == again[path] for path in repo.paths())
+
+
+def test_write_repo(tmp_path: Path):
+    options = SyntheticOptions().scaled(0.2)
+    write_repo(tmp_path, options)
+
+    repo = generate_repo(options)
+    written = read_repo(tmp_path)
+    assert set(written.paths()) == set(repo.paths())
+    for path in repo.paths():
+        assert written[path].data == repo[path].data
+
+
+def test_compile_synthetic():
+    options = SyntheticOptions(objects=20, events=12, categories=3, extensions=2, extends_depth=3)
+    schema = Compilation(generate_repo(options)).build()
+
+    # Category classes have no uid, so like in the bundled schema they aren't classes of their own
+    assert len(schema.classes) == 12 + 2 * options.extension_events + 1
+    assert len(schema.objects) == 20 + 2 * options.extension_objects
+
+    # event_7 is the third class of category_1, so it extends the class before it
+    event = schema.classes["event_7"]
+    assert event.extends == "event_4"
+    assert event.uid == 2003
+    assert "class_uid" in event.attributes
+    assert "extension_0/extension_0_event_0" in schema.classes